@@ -2,13 +2,27 @@
 # -*- coding: utf-8 -*-
 """
 Angular → Django Wizard (UI refaite : scrolls, chemins en haut + auto-hide, JSON config)
-- GUI Tkinter, stdlib only
+- GUI Tkinter (wizard_gui.py, importé seulement au lancement du GUI), stdlib only
+- CLI headless: settings | urls | deploy | collectstatic | all (+ rollback, gc, backups)
 - Modes: Installation | Mise à jour
 - Edits idempotents: settings.py, urls.py (import re_path garanti, SPA fallback excluant static/media)
-- index.html: injecte {% load static %} + réécrit assets en {% static '...' %} (ne touche pas <meta> ni <base href="/">)
-- Copie assets dist/browser -> static/
-- Backups centralisés .bak par session: ../<projet>_backups/<timestamp>/
-- Diff preview + apply
+- index.html: injecte {% load static %} + réécrit assets en {% static '...' %} par épissure (src/href/poster/srcset/style url() et blocs <style>, ne touche pas <meta> ni <base href="/">)
+- Copie assets dist/browser -> static/ (mode Mise à jour : sync incrémental via manifest)
+- Précompression optionnelle .gz (+ .br si brotli) des assets texte, pool de processus
+- staticfiles.json pré-calculé depuis les noms hashés d'Angular + stockage Django qui s'y fie
+- Builds localisés : un index par locale (templates/<locale>/), assets partagés dédupliqués, routes /<locale>/
+- Chunks JS lazy résolus sous STATIC_URL (publicPath webpack, imports absolus) au lieu du fallback SPA
+- modulepreload du graphe de modules initial + middleware d'en-têtes Link (Early Hints)
+- Profil production : WhiteNoise, bundles hashés immuables (1 an), compression, index.html no-cache
+- Vue SPA en cache : index rendu une fois par déploiement, ETag fort et 304
+- Fallback SPA qui exclut les préfixes Django montés (api/, admin/...) et les fichiers : 404 rapide
+- Modèle du projet : DJANGO_SETTINGS_MODULE -> settings -> ROOT_URLCONF, sources parsées en cache (mtime)
+- Mode watch : miroir de ng build --watch par instantanés stat, delta seulement, latence journalisée
+- Catalogue de projets + déploiement batch parallèle (journaux et backups isolés, bilan)
+- Découverte du dist depuis angular.json / project.json (parcours élagué, cache par mtime)
+- Plan de déploiement (stat seule : nouveaux / modifiés / inchangés / orphelins, octets)
+- Backups centralisés par session: ../<projet>_backups/ (blobs adressés par contenu + index JSON, rétention sur demande)
+- Diff preview + apply (Myers en espace linéaire, visionneuse virtualisée, côte à côte)
 - JSON: charger/sauver chemins
 - Section chemins visible au début puis repliable (auto-hide après confirmation)
 
@@ -18,20 +32,58 @@ Auteur: ChatGPT
 import os
 import re
 import sys
+import ast
 import json
 import time
 import shutil
+import hashlib
+import ctypes
+import errno
+import zlib
+import lzma
+import gzip
+import multiprocessing
+import argparse
+import functools
+import threading
 import subprocess
-import difflib
+import posixpath
 from pathlib import Path
-from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+try:  # reflink (FICLONE) : Linux uniquement
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:  # optionnel : sorties .br en plus des .gz
+    import brotli
+except ImportError:
+    brotli = None
 
 # ---------- Persistance ----------
 DEFAULT_PROFILE = str(Path.home() / ".angular_django_wizard.json")
 
+# ---------- Journal fichier ----------
+DEFAULT_LOG_FILE = str(Path.home() / ".angular_django_wizard.log")
+LOG_FILE_MAX_BYTES = 2 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+def open_log_file(path=DEFAULT_LOG_FILE):
+    """Journal complet vers un fichier tournant ; retourne une fonction log(msg) thread-safe."""
+    import logging
+    import logging.handlers
+    logger = logging.getLogger(f"angular_django_wizard:{path}")
+    if not logger.handlers:
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES,
+                                                       backupCount=LOG_FILE_BACKUPS, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger.info
+
 # ---------- Utils ----------
 EXCLUDE_PREFIXES = ("http://", "https://", "//", "data:", "mailto:", "tel:")
 DJ_STATIC_TAG = "{% static '"
@@ -47,33 +99,733 @@ def write_text(p: Path, content: str):
     p.parent.mkdir(parents=True, exist_ok=True)
     p.write_text(content, encoding="utf-8")
 
-def backup_file(p: Path) -> Path | None:
-    """Fallback local (rarement utilisé)"""
-    if not p or not p.exists():
+# ---------- Backups (store adressé par contenu) ----------
+BACKUP_COMPRESSION = "zlib"     # "zlib" | "lzma" | None
+BACKUP_KEEP_SESSIONS = 20       # rétention : N dernières sessions...
+BACKUP_KEEP_DAYS = 30           # ...ou plus récentes que N jours
+
+class BackupStore:
+    """
+    Store de backups dédupliqué :
+      <root>/objects/ab/<sha256>[.z|.xz]   contenu, écrit une seule fois
+      <root>/sessions/<stamp>.json         index {chemin relatif au projet (absolu hors projet): {hash, size, mtime}}
+    La rétention (prune) ne s'applique que sur demande (menu Backups, `backups prune`).
+    """
+    SUFFIXES = {"zlib": ".z", "lzma": ".xz", None: ""}
+
+    def __init__(self, root: Path, compression=BACKUP_COMPRESSION):
+        self.root = Path(root)
+        self.compression = compression
+        self.objects = self.root / "objects"
+        self.sessions_dir = self.root / "sessions"
+        self._lock = threading.Lock()
+
+    # -- blobs --
+    def blob_path(self, digest: str) -> Path | None:
+        folder = self.objects / digest[:2]
+        for suffix in self.SUFFIXES.values():
+            cand = folder / (digest + suffix)
+            if cand.exists():
+                return cand
         return None
-    bak = p.with_suffix(p.suffix + f".bak_{nowstamp()}")
-    shutil.copy2(p, bak)
-    return bak
 
-def copytree_merge(src: Path, dst: Path, ignore_names=None):
-    src, dst = Path(src), Path(dst)
-    if not src.exists():
-        return
-    for root, dirs, files in os.walk(src):
-        rel = Path(root).relative_to(src)
-        if ignore_names and rel == Path("."):
-            dirs[:]  = [d for d in dirs  if d not in ignore_names]
-            files[:] = [f for f in files if f not in ignore_names]
-        target = dst / rel
-        target.mkdir(parents=True, exist_ok=True)
-        for f in files:
-            shutil.copy2(Path(root) / f, target / f)
+    def put(self, data: bytes) -> tuple[str, Path]:
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.blob_path(digest)
+        if existing:
+            return digest, existing
+        if self.compression == "zlib":
+            payload = zlib.compress(data, 6)
+        elif self.compression == "lzma":
+            payload = lzma.compress(data)
+        else:
+            payload = data
+        dest = self.objects / digest[:2] / (digest + self.SUFFIXES[self.compression])
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, dest)
+        return digest, dest
+
+    def read(self, digest: str) -> bytes:
+        p = self.blob_path(digest)
+        if not p:
+            raise RuntimeError(f"Blob manquant dans le store: {digest}")
+        data = p.read_bytes()
+        if p.suffix == ".z":
+            return zlib.decompress(data)
+        if p.suffix == ".xz":
+            return lzma.decompress(data)
+        return data
+
+    # -- sessions --
+    def session_path(self, session: str) -> Path:
+        return self.sessions_dir / f"{session}.json"
+
+    def sessions(self) -> list:
+        if not self.sessions_dir.exists():
+            return []
+        return sorted(p.stem for p in self.sessions_dir.glob("*.json"))
+
+    def load_session(self, session: str) -> dict:
+        p = self.session_path(session)
+        if not p.exists():
+            raise RuntimeError(f"Session de backup introuvable: {session}")
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    def add(self, session: str, rel: str | Path, file_path: Path) -> Path:
+        """Ajoute file_path à la session (index réécrit à chaque ajout, il est petit)."""
+        file_path = Path(file_path)
+        st = file_path.stat()
+        digest, blob = self.put(file_path.read_bytes())
+        with self._lock:
+            p = self.session_path(session)
+            index = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {"created": time.time(), "files": {}}
+            index["files"][Path(rel).as_posix()] = {"hash": digest, "size": st.st_size, "mtime": st.st_mtime}
+            save_manifest(p, index)
+        return blob
+
+    def restore(self, session: str, dest_root: Path, paths=None, before_write=None) -> list:
+        """
+        Reconstruit les fichiers d'une session sous dest_root (tous, ou seulement `paths`) ; un fichier
+        sauvegardé hors projet (chemin absolu dans l'index) retourne à son emplacement d'origine.
+        before_write(dest) est appelé avant d'écraser un fichier existant (ex: backup).
+        """
+        dest_root = Path(dest_root).resolve()
+        restored = []
+        for rel, meta in self.load_session(session)["files"].items():
+            if paths is not None and rel not in paths:
+                continue
+            if Path(rel).is_absolute():
+                dest = Path(rel)
+            else:
+                dest = (dest_root / rel).resolve()
+                if dest_root not in dest.parents:
+                    raise RuntimeError(f"Chemin hors projet refusé: {rel}")
+            data = self.read(meta["hash"])
+            if dest.exists():
+                if dest.read_bytes() == data:
+                    continue
+                if before_write:
+                    before_write(dest)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{dest.name}.restore.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, dest)
+            os.utime(dest, (meta["mtime"], meta["mtime"]))
+            restored.append(rel)
+        return restored
+
+    def prune(self, keep_last=BACKUP_KEEP_SESSIONS, keep_days=BACKUP_KEEP_DAYS) -> dict:
+        """
+        Rétention : une session est gardée si elle fait partie des keep_last dernières
+        OU a moins de keep_days jours (None désactive la règle). Les blobs qui ne sont
+        plus référencés par aucune session sont ensuite supprimés.
+        """
+        report = {"sessions": [], "blobs": 0, "bytes": 0}
+        names = self.sessions()
+        if keep_last is None and keep_days is None:
+            return report
+        recent = set(names[-keep_last:]) if keep_last else set()
+        cutoff = time.time() - keep_days * 86400 if keep_days is not None else None
+        for name in names:
+            if name in recent:
+                continue
+            p = self.session_path(name)
+            if cutoff is not None and p.stat().st_mtime >= cutoff:
+                continue
+            p.unlink()
+            report["sessions"].append(name)
+        if not report["sessions"]:
+            return report
+        referenced = set()
+        for name in self.sessions():
+            referenced.update(m["hash"] for m in self.load_session(name)["files"].values())
+        for blob in self.objects.glob("*/*"):
+            if blob.name.split(".", 1)[0] not in referenced:
+                report["bytes"] += blob.stat().st_size
+                blob.unlink()
+                report["blobs"] += 1
+        return report
+
+def project_backup_store(project_root: Path) -> BackupStore:
+    """Store centralisé du projet : <parent>/<projet>_backups/"""
+    proj_root = Path(project_root).resolve()
+    return BackupStore(proj_root.parent / f"{proj_root.name}_backups")
+
+def backup_into(store: BackupStore, project_root: Path, session: str, file_path: Path) -> Path | None:
+    """Sauvegarde file_path dans la session, indexé par son chemin relatif au projet (absolu hors projet)."""
+    if not file_path or not file_path.exists():
+        return None
+    path = Path(file_path).resolve()
+    try:
+        rel = path.relative_to(Path(project_root).resolve())
+    except ValueError:
+        rel = path
+    return store.add(session, rel, file_path)
+
+def backup_file(p: Path, session=None) -> Path | None:
+    """
+    Backup sans session GUI/CLI : store du projet (premier parent contenant manage.py,
+    sinon dossier du fichier), comme project_backup_store.
+    """
+    if not p or not p.exists():
+        return None
+    p = Path(p).resolve()
+    root = next((d for d in p.parents if (d / "manage.py").is_file()), p.parent)
+    return backup_into(project_backup_store(root), root, session or nowstamp(), p)
 
 def short(p: Path | str) -> str:
     p = str(p)
     home = str(Path.home())
     return p.replace(home, "~") if p.startswith(home) else p
 
+def human_bytes(n: int) -> str:
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if abs(n) < 1024 or unit == "Go":
+            return f"{n:.0f} {unit}" if unit == "o" else f"{n:.1f} {unit}"
+        n /= 1024
+
+# ---------- Moteur de copie ----------
+COPY_WORKERS = min(32, (os.cpu_count() or 4) * 2)
+COPY_BUFSIZE = 1024 * 1024
+FICLONE = 0x40049409  # ioctl Linux : clone CoW (btrfs, xfs, ...)
+
+def _kernel_copy(fsrc, fdst, size: int):
+    """
+    Copie du contenu par le chemin le plus court disponible :
+    reflink -> os.copy_file_range -> os.sendfile -> copie tamponnée.
+    """
+    in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+    if fcntl is not None and size:
+        try:
+            fcntl.ioctl(out_fd, FICLONE, in_fd)
+            return
+        except OSError:
+            pass
+    for primitive in ("copy_file_range", "sendfile"):
+        if not size or not hasattr(os, primitive):
+            continue
+        try:
+            offset = 0
+            while offset < size:
+                if primitive == "copy_file_range":
+                    n = os.copy_file_range(in_fd, out_fd, size - offset, offset, offset)
+                else:
+                    os.lseek(out_fd, offset, os.SEEK_SET)
+                    n = os.sendfile(out_fd, in_fd, offset, size - offset)
+                if not n:
+                    break
+                offset += n
+            if offset >= size:
+                return
+        except OSError:
+            pass
+        fdst.seek(0); fdst.truncate()
+    fsrc.seek(0)
+    shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+
+def copy_file_fast(src: Path, dst: Path, data: bytes | None = None) -> int:
+    """
+    Copie src -> dst (contenu + métadonnées comme shutil.copy2) via un fichier
+    temporaire renommé atomiquement : jamais de fichier à moitié écrit servi,
+    et un éventuel hardlink existant sur dst n'est pas modifié.
+    data : contenu à écrire à la place de celui de src (fichier transformé).
+    """
+    dst = Path(dst)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+            if data is not None:
+                size = fdst.write(data)
+            else:
+                size = os.fstat(fsrc.fileno()).st_size
+                _kernel_copy(fsrc, fdst, size)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return size
+
+def ensure_dirs(root: Path, rels):
+    """Crée en une passe tous les dossiers parents nécessaires aux chemins relatifs."""
+    parents = {os.path.dirname(r) for r in rels}
+    for d in sorted(parents):
+        os.makedirs(os.path.join(root, d), exist_ok=True)
+
+class OperationCancelled(Exception):
+    """Levée quand l'utilisateur annule une opération longue (copie, collectstatic)."""
+
+class _Progress:
+    """Compteurs partagés entre threads de copie -> callback(fichiers, octets)."""
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.files = self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, nbytes: int):
+        with self._lock:
+            self.files += 1
+            self.bytes += nbytes
+            files, total = self.files, self.bytes
+        if self.callback:
+            self.callback(files, total)
+
+def copy_files(src_root: Path, dst_root: Path, rels, workers=COPY_WORKERS, progress=None, cancel=None,
+               transform=None) -> int:
+    """
+    Copie parallèle (pool de threads borné) ; retourne le nombre d'octets copiés.
+    progress(fichiers, octets) après chaque fichier ; cancel (threading.Event) arrête
+    proprement : les copies en cours se terminent, les suivantes lèvent OperationCancelled.
+    transform : voir ChunkUrlRewriter — applies(rel), puis (rel, octets) -> octets | None.
+    """
+    rels = list(rels)
+    ensure_dirs(dst_root, rels)
+    counter = _Progress(progress)
+
+    def job(r):
+        if cancel is not None and cancel.is_set():
+            raise OperationCancelled()
+        data = None
+        if transform is not None and transform.applies(r):
+            data = transform(r, (Path(src_root) / r).read_bytes())
+        n = copy_file_fast(Path(src_root) / r, Path(dst_root) / r, data)
+        counter.add(n)
+        return n
+
+    if workers <= 1 or len(rels) <= 1:
+        return sum(map(job, rels))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return sum(ex.map(job, rels))
+
+def _link_replace(src: Path, dst: Path):
+    """dst devient un hardlink de src (remplacement atomique), copie si le lien est impossible."""
+    tmp = dst.with_name(f".{dst.name}.link.tmp")
+    try:
+        if tmp.exists():
+            tmp.unlink()
+        os.link(src, tmp)
+        os.replace(tmp, dst)
+    except OSError:
+        copy_file_fast(src, dst)
+
+def dedupe_copies(src_root: Path, rels, files: dict, transform=None) -> tuple[list, dict]:
+    """
+    Regroupe les fichiers de contenu identique (taille puis sha256, seulement en cas de
+    collision de taille) : retourne (à copier, {doublon: original}).
+    Les fichiers que transform peut réécrire (contenu propre à chaque locale) restent à part.
+    """
+    by_size = {}
+    unique, links = [], {}
+    for rel in rels:
+        if transform is not None and transform.applies(rel):
+            unique.append(rel)
+        else:
+            by_size.setdefault(files[rel].st_size, []).append(rel)
+    for group in by_size.values():
+        if len(group) == 1:
+            unique.extend(group)
+            continue
+        seen = {}
+        for rel in group:
+            digest = file_hash(Path(src_root) / rel)
+            if digest in seen:
+                links[rel] = seen[digest]
+            else:
+                seen[digest] = rel
+                unique.append(rel)
+    return unique, links
+
+def copy_deduped(src_root: Path, dst_root: Path, rels, files: dict, workers=COPY_WORKERS,
+                 progress=None, cancel=None, transform=None) -> int:
+    """copy_files, mais chaque contenu n'est copié qu'une fois : les doublons deviennent des hardlinks."""
+    unique, links = dedupe_copies(src_root, rels, files, transform)
+    copied = copy_files(src_root, dst_root, unique, workers=workers,
+                        progress=_totals_progress(progress, files, unique), cancel=cancel, transform=transform)
+    ensure_dirs(dst_root, links)
+    for rel, orig in links.items():
+        _link_replace(Path(dst_root) / orig, Path(dst_root) / rel)
+    return copied
+
+def copytree_merge(src: Path, dst: Path, ignore_names=None, workers=COPY_WORKERS) -> int:
+    src, dst = Path(src), Path(dst)
+    if not src.exists():
+        return 0
+    return copy_files(src, dst, scan_tree(src, ignore_names), workers=workers)
+
+# ---------- Sync incrémental (manifest) ----------
+MANIFEST_VERSION = 1
+HASH_CHUNK = 1024 * 1024
+GC_KEEP_GENERATIONS = 3     # générations de déploiement protégées par le GC
+MAX_GENERATIONS = 20        # historique conservé dans le manifest
+
+def file_hash(p: Path) -> str:
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def scan_tree(src: Path, ignore_names=None) -> dict:
+    """
+    Inventaire {chemin relatif posix: os.stat_result} via os.scandir.
+    ignore_names : chemins relatifs ignorés — un nom simple ne vise que la racine (comme copytree_merge).
+    """
+    src = Path(src)
+    out = {}
+    if not src.exists():
+        return out
+    stack = [(str(src), "")]
+    while stack:
+        folder, rel = stack.pop()
+        with os.scandir(folder) as it:
+            for e in it:
+                if ignore_names and f"{rel}{e.name}" in ignore_names:
+                    continue
+                if e.is_dir():
+                    stack.append((e.path, f"{rel}{e.name}/"))
+                elif e.is_file():
+                    out[f"{rel}{e.name}"] = e.stat()
+    return out
+
+def manifest_path_for(static_dir: Path) -> Path:
+    """Manifest rangé à côté de static/ (pas dedans : collectstatic ne doit pas le ramasser)."""
+    static_dir = Path(static_dir)
+    return static_dir.parent / f".{static_dir.name}.wizard-manifest.json"
+
+def load_manifest(p: Path) -> dict:
+    try:
+        data = json.loads(Path(p).read_text(encoding="utf-8"))
+        if data.get("version") == MANIFEST_VERSION and isinstance(data.get("files"), dict):
+            return data
+    except Exception:
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}, "generations": []}
+
+def save_manifest(p: Path, data: dict):
+    p = Path(p)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, p)
+
+def plan_sync(src: Path, dst: Path, manifest: dict, files: dict, full=False):
+    """
+    Compare les fichiers source au manifest.
+    - stat (taille + mtime) identique et cible présente -> inchangé, sans relire le fichier
+    - sinon hash du contenu : identique au manifest -> inchangé, différent -> à copier
+    full=True (mode Installation) : tout est à copier, le hash sera calculé plus tard si besoin.
+    Retourne (to_copy, unchanged, entries) où entries est la nouvelle table du manifest.
+    """
+    src, dst = Path(src), Path(dst)
+    known = manifest.get("files", {})
+    to_copy, unchanged, entries = [], [], {}
+    for rel, st in files.items():
+        entry = {"size": st.st_size, "mtime": st.st_mtime_ns, "hash": None}
+        old = None if full else known.get(rel)
+        if old and (dst / rel).exists():
+            if old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+                entries[rel] = old; unchanged.append(rel)
+                continue
+            entry["hash"] = file_hash(src / rel)
+            if old.get("hash") == entry["hash"]:
+                entries[rel] = entry; unchanged.append(rel)
+                continue
+        entries[rel] = entry
+        to_copy.append(rel)
+    return to_copy, unchanged, entries
+
+def _transform_changed(manifest: dict, transform) -> bool:
+    """Mémorise la clé de transformation dans le manifest ; True si elle a changé (recopie complète)."""
+    key = transform.key if transform is not None else ""
+    changed = manifest.get("transform", "") != key
+    manifest["transform"] = key
+    return changed
+
+def _totals_progress(progress, files: dict, to_copy):
+    """Adapte progress(fichiers, total fichiers, octets, total octets) au compteur de copy_files."""
+    if not progress:
+        return None
+    total_bytes = sum(files[r].st_size for r in to_copy)
+    progress(0, len(to_copy), 0, total_bytes)
+    return lambda n, b: progress(n, len(to_copy), b, total_bytes)
+
+def sync_tree(src: Path, dst: Path, ignore_names=None, full=False, manifest_path: Path | None = None,
+              workers=COPY_WORKERS, progress=None, cancel=None, dedupe=False, transform=None) -> dict:
+    """
+    Copie src -> dst en s'appuyant sur le manifest persistant (à côté de dst).
+    dedupe=True : contenus identiques copiés une seule fois (voir copy_deduped).
+    transform : réécriture à la copie (voir ChunkUrlRewriter) ; si sa clé change, tout est recopié.
+    Retourne {"copied", "skipped", "bytes"}.
+    """
+    src, dst = Path(src), Path(dst)
+    manifest_path = manifest_path or manifest_path_for(dst)
+    manifest = load_manifest(manifest_path)
+    changed = _transform_changed(manifest, transform)  # toujours : la clé doit être mémorisée, même en install
+    full = full or changed
+    files = scan_tree(src, ignore_names)
+    to_copy, unchanged, entries = plan_sync(src, dst, manifest, files, full=full)
+    if dedupe:
+        copied_bytes = copy_deduped(src, dst, to_copy, files, workers=workers, progress=progress, cancel=cancel,
+                                    transform=transform)
+    else:
+        copied_bytes = copy_files(src, dst, to_copy, workers=workers,
+                                  progress=_totals_progress(progress, files, to_copy), cancel=cancel,
+                                  transform=transform)
+    manifest["files"] = {**manifest.get("files", {}), **entries}
+    record_generation(manifest, files)
+    save_manifest(manifest_path, manifest)
+    return {"copied": len(to_copy), "skipped": len(unchanged), "bytes": copied_bytes}
+
+# ---------- GC générationnel ----------
+def record_generation(manifest: dict, files):
+    """
+    Mémorise la liste des fichiers produits par ce déploiement (une génération) ; un redéploiement
+    du même build n'en ajoute pas, sans quoi il pousserait la vraie génération précédente hors de keep.
+    """
+    gens = manifest.setdefault("generations", [])
+    files = sorted(files)
+    if gens and gens[-1]["files"] == files:
+        return
+    gens.append({"stamp": nowstamp(), "files": files})
+    del gens[:-MAX_GENERATIONS]
+
+def gc_static(static_dir: Path, keep=GC_KEEP_GENERATIONS, dry_run=True, manifest_path: Path | None = None) -> dict:
+    """
+    Supprime de static/ les fichiers produits par un déploiement antérieur et absents
+    des `keep` dernières générations (un client avec un vieil index.html en cache
+    continue donc de fonctionner). Les fichiers que le wizard n'a jamais copiés ne
+    sont jamais touchés. dry_run=True : rapport seul.
+    Retourne {"files": [...], "bytes", "deleted"}.
+    """
+    static_dir = Path(static_dir)
+    manifest_path = manifest_path or manifest_path_for(static_dir)
+    manifest = load_manifest(manifest_path)
+    gens = manifest.get("generations", [])
+    report = {"files": [], "bytes": 0, "deleted": 0}
+    if not gens:
+        return report
+    live = set()
+    for g in gens[-max(1, keep):]:
+        live.update(g["files"])
+    owned = manifest.get("files", {})
+    for rel in sorted(set(owned) - live):
+        # le fichier et ses éventuelles versions précompressées
+        for target in [static_dir / rel] + [static_dir / (rel + s) for s in PRECOMPRESS_SUFFIXES]:
+            try:
+                size = target.stat().st_size
+            except OSError:
+                continue
+            report["files"].append(target.relative_to(static_dir).as_posix())
+            report["bytes"] += size
+            if not dry_run:
+                target.unlink()
+                report["deleted"] += 1
+        if not dry_run:
+            _prune_empty_dirs((static_dir / rel).parent, static_dir)
+            owned.pop(rel, None)
+    if not dry_run:
+        save_manifest(manifest_path, manifest)
+    return report
+
+def _prune_empty_dirs(folder: Path, stop: Path):
+    while folder != stop and stop in folder.parents:
+        try:
+            folder.rmdir()
+        except OSError:
+            return
+        folder = folder.parent
+
+# ---------- Précompression (.gz / .br) ----------
+PRECOMPRESS_EXTENSIONS = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".txt"}
+PRECOMPRESS_SUFFIXES = (".gz", ".br")
+PRECOMPRESS_MIN_SIZE = 256   # en dessous, le gain ne compense pas l'en-tête
+
+_PRECOMPRESS_POOL = None
+_PRECOMPRESS_POOL_LOCK = threading.Lock()
+
+def _precompress_pool() -> ProcessPoolExecutor:
+    """
+    Pool de processus unique, créé à la première passe et partagé par tous les threads
+    (projets d'un batch, tâche du GUI). Démarré en 'spawn' : jamais de fork d'un processus
+    multi-thread, dont l'enfant hériterait de verrous tenus par d'autres threads.
+    """
+    global _PRECOMPRESS_POOL
+    with _PRECOMPRESS_POOL_LOCK:
+        if _PRECOMPRESS_POOL is None:
+            _PRECOMPRESS_POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 2,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+        return _PRECOMPRESS_POOL
+
+def _reset_precompress_pool():
+    global _PRECOMPRESS_POOL
+    with _PRECOMPRESS_POOL_LOCK:
+        _PRECOMPRESS_POOL = None
+
+def precompress_state_path(static_dir: Path) -> Path:
+    static_dir = Path(static_dir)
+    return static_dir.parent / f".{static_dir.name}.wizard-precompress.json"
+
+def _precompress_suffixes() -> tuple:
+    return PRECOMPRESS_SUFFIXES if brotli is not None else (".gz",)
+
+def _precompress_fresh(old: dict | None, suffixes, exists) -> bool:
+    """Sorties d'une passe précédente encore valables : chaque suffixe tenté (écrit, ou pas rentable), sorties présentes."""
+    tried = set(old.get("tried", old.get("outputs", ()))) if old else set()
+    return bool(old) and set(suffixes) <= tried and all(map(exists, old["outputs"]))
+
+def _precompress_one(job):
+    """
+    Exécuté dans un processus du pool : (chemin, état connu, suffixes) -> (hash, {suffixe: taille}).
+    Une sortie n'est écrite que si elle est plus petite que l'original ; sinon une éventuelle
+    sortie périmée est supprimée. Contenu inchangé et sorties à jour : (hash, None).
+    """
+    path, old, suffixes = job
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if old and old["hash"] == digest and _precompress_fresh(old, suffixes, lambda sfx: os.path.exists(path + sfx)):
+        return digest, None
+    outputs = {}
+    compressors = {".gz": lambda d: gzip.compress(d, compresslevel=9, mtime=0),
+                   ".br": lambda d: brotli.compress(d, quality=11)}
+    st = os.stat(path)
+    for sfx in suffixes:
+        out = path + sfx
+        payload = compressors[sfx](data)
+        if len(payload) < len(data):
+            tmp = f"{out}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(payload)
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp, out)
+            outputs[sfx] = len(payload)
+        elif os.path.exists(out):
+            os.unlink(out)
+    return digest, outputs
+
+def precompress_tree(root: Path, rels, state_path: Path, cancel=None) -> dict:
+    """
+    Produit des frères .gz (et .br si le module brotli est importable) pour les assets
+    texte de root, dans le pool de processus partagé, pour que WhiteNoise ou nginx `gzip_static`
+    les servent tels quels. Un fichier dont le contenu (hash) n'a pas changé depuis la
+    dernière passe n'est pas recompressé ; stat identique -> pas même relu. L'état garde aussi
+    les sorties jugées non rentables (pas plus petites) : elles ne sont pas retentées.
+    Retourne {"compressed", "uptodate", "bytes_in", "bytes_out"}.
+    """
+    root = Path(root)
+    state = load_manifest(state_path)
+    known = state["files"]
+    report = {"compressed": 0, "uptodate": 0, "bytes_in": 0, "bytes_out": 0}
+    suffixes = _precompress_suffixes()
+    jobs, metas = [], []
+    for rel in rels:
+        if os.path.splitext(rel)[1].lower() not in PRECOMPRESS_EXTENSIONS:
+            continue
+        st = (root / rel).stat()
+        if st.st_size < PRECOMPRESS_MIN_SIZE:
+            continue
+        old = known.get(rel)
+        if (old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns
+                and _precompress_fresh(old, suffixes, lambda sfx: (root / (rel + sfx)).exists())):
+            report["uptodate"] += 1
+            continue
+        jobs.append((str(root / rel), old, suffixes))
+        metas.append((rel, st))
+    if jobs:
+        if cancel is not None and cancel.is_set():
+            raise OperationCancelled()
+        try:  # lots de ~1/4 de la part de chaque processus du pool
+            results = list(_precompress_pool().map(_precompress_one, jobs,
+                                                   chunksize=max(1, len(jobs) // ((os.cpu_count() or 2) * 4))))
+        except BrokenProcessPool:
+            _reset_precompress_pool()  # un processus mort : le prochain appel repart d'un pool neuf
+            raise
+        for (rel, st), (digest, outputs) in zip(metas, results):
+            if outputs is None:
+                report["uptodate"] += 1
+                outputs = known[rel]["outputs"]
+            else:
+                report["compressed"] += 1
+                report["bytes_in"] += st.st_size * len(outputs)
+                report["bytes_out"] += sum(outputs.values())
+            known[rel] = {"size": st.st_size, "mtime": st.st_mtime_ns, "hash": digest, "outputs": outputs,
+                          "tried": list(suffixes)}
+    save_manifest(state_path, state)
+    return report
+
+def log_precompress(log_fn, report: dict):
+    saved = report["bytes_in"] - report["bytes_out"]
+    log_fn(f"Précompression{' (gzip + brotli)' if brotli else ' (gzip)'} : {report['compressed']} compressés, "
+           f"{report['uptodate']} à jour, {human_bytes(saved)} économisés")
+
+# ---------- Manifest staticfiles.json (ManifestStaticFilesStorage) ----------
+STATIC_MANIFEST_NAME = "staticfiles.json"
+# bundles déjà hashés par Angular, sous leur forme exacte : main-ABCD1234.js (esbuild, au moins une lettre),
+# main.0123456789abcdef.js (webpack, 16 hex) ; le reste (report-20240101.pdf, logo.ABCDEFGH.png…) est hashé par le wizard
+ANGULAR_HASHED_RE = re.compile(r"(?:-(?=[0-9]*[A-Z])[A-Z0-9]{8}|\.[0-9a-f]{16})\.(?:m?js|css)$")
+# + copies nom.<md5:12>.ext écrites par write_static_manifest (comme HashedFilesMixin) : servies immutable
+IMMUTABLE_FILE_RE = re.compile(rf"{ANGULAR_HASHED_RE.pattern}|\.[0-9a-f]{{12}}\.[A-Za-z0-9]+$")
+
+def django_hashed_name(rel: str, digest: str) -> str:
+    """Nom produit par HashedFilesMixin : nom.<md5[:12]>.ext"""
+    root, ext = os.path.splitext(rel)
+    return f"{root}.{digest[:12]}{ext}"
+
+def write_static_manifest(static_dir: Path, prefix="", out_path: Path | None = None) -> dict:
+    """
+    Écrit staticfiles.json (format lu par ManifestStaticFilesStorage) depuis l'arbre déployé,
+    sans post-traitement Django : les noms déjà hashés par Angular pointent sur eux-mêmes,
+    seuls les autres sont hashés (md5[:12], comme Django) et reçoivent une copie nom.hash.ext
+    (hardlink si possible). Les copies d'un manifest précédent devenues inutiles sont supprimées.
+    prefix : préfixe STATICFILES_DIRS ; out_path : défaut static_dir/staticfiles.json.
+    Retourne {"paths", "hashed", "generated", "removed"}.
+    """
+    static_dir = Path(static_dir)
+    out_path = Path(out_path) if out_path else static_dir / STATIC_MANIFEST_NAME
+    pre = prefix.strip("/") + "/" if prefix.strip("/") else ""
+    try:
+        previous = json.loads(read_text(out_path) or "{}").get("paths", {})
+    except ValueError:
+        previous = {}
+    old_copies = {v[len(pre):] for k, v in previous.items() if k != v and v.startswith(pre)}
+    files = scan_tree(static_dir)
+    paths, generated = {}, []
+    for rel in sorted(files):
+        base, ext = os.path.splitext(rel)
+        if rel in old_copies or rel == STATIC_MANIFEST_NAME or (ext in PRECOMPRESS_SUFFIXES and base in files):
+            continue
+        if ANGULAR_HASHED_RE.search(rel):
+            paths[pre + rel] = pre + rel
+            continue
+        h = hashlib.md5(usedforsecurity=False)
+        with open(static_dir / rel, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        hashed = django_hashed_name(rel, h.hexdigest())
+        if not (static_dir / hashed).exists():
+            _link_or_copy(static_dir / rel, static_dir / hashed)
+        generated.append(hashed)
+        paths[pre + rel] = pre + hashed
+    removed = 0
+    for rel in old_copies - set(generated):
+        if (static_dir / rel).is_file():
+            (static_dir / rel).unlink()
+            removed += 1
+    # même empreinte que Django 4.2 ; version "1.0" : lue par Django 3.2 comme par 4.2+
+    manifest_hash = hashlib.md5(json.dumps(sorted(paths.items())).encode(), usedforsecurity=False).hexdigest()[:12]
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    write_text(tmp, json.dumps({"paths": paths, "version": "1.0", "hash": manifest_hash}, indent=1))
+    os.replace(tmp, out_path)
+    return {"paths": len(paths), "hashed": len(generated), "generated": generated, "removed": removed}
+
+def log_static_manifest(log_fn, path: Path, report: dict):
+    log_fn(f"{short(path)} : {report['paths']} entrées, {report['hashed']} hashées par le wizard, "
+           f"{report['removed']} copies obsolètes supprimées")
+
 # ---------- HTML Rewriter ----------
 def is_local_asset(url: str) -> bool:
     if not url:
@@ -82,7 +834,7 @@ def is_local_asset(url: str) -> bool:
     # ne pas réécrire la racine ou chemins “vides”
     if u in ("/", "./"):
         return False
-    if any(u.startswith(p) for p in EXCLUDE_PREFIXES):
+    if u.startswith(EXCLUDE_PREFIXES):
         return False
     if u.startswith("{%") or u.startswith("{{"):
         return False
@@ -90,59 +842,92 @@ def is_local_asset(url: str) -> bool:
         return False
     return True
 
-def to_django_static(url: str) -> str:
-    u = url.strip()
-    u = re.sub(r"^/+", "", u).replace("\\", "/")
+def to_django_static(url: str, prefix="") -> str:
+    """prefix : sous-dossier de static/ d'une locale ; ne s'applique qu'aux URLs relatives (au <base href>)."""
+    u = url.strip().replace("\\", "/")
+    u = posixpath.normpath(f"{prefix}/{u}") if prefix and not u.startswith("/") else u.lstrip("/")
     return f"{DJ_STATIC_TAG}{u}{DJ_STATIC_TAG_END}"
 
-class StaticRewriter(HTMLParser):
-    # on ne cible PAS "content" (ne pas toucher <meta content="...">)
-    TARGET_ATTRS = {"src", "href", "poster"}
-
-    def __init__(self):
-        super().__init__(convert_charrefs=False)
-        self.out = []
-
-    def handle_decl(self, decl): self.out.append(f"<!{decl}>")
-    def handle_startendtag(self, tag, attrs): self.out.append(self._rebuild(tag, attrs, True))
-    def handle_starttag(self, tag, attrs): self.out.append(self._rebuild(tag, attrs, False))
-    def handle_endtag(self, tag): self.out.append(f"</{tag}>")
-    def handle_data(self, data): self.out.append(data)
-    def handle_comment(self, data): self.out.append(f"<!--{data}-->")
-    def handle_entityref(self, name): self.out.append(f"&{name};")
-    def handle_charref(self, name): self.out.append(f"&#{name};")
-
-    def _rebuild(self, tag, attrs, self_closing):
-        t = tag.lower()
-
-        # 1) ne jamais modifier <meta ...>
-        if t == "meta":
-            attr_str = "".join([f' {k}' if v is None else f' {k}="{v}"' for k, v in attrs])
-            return f"<{tag}{attr_str}{'/' if self_closing else ''}>"
-
-        rebuilt = []
-        for k, v in attrs:
-            if v is None:
-                rebuilt.append((k, v))
-                continue
-
-            # 2) ne jamais toucher <base href="/">
-            if t == "base" and k.lower() == "href":
-                rebuilt.append((k, v))
-                continue
-
-            # 3) réécrire seulement les attrs ciblés
-            if k.lower() in self.TARGET_ATTRS and is_local_asset(v):
-                v = to_django_static(v)
-
-            rebuilt.append((k, v))
-
-        attr_str = "".join([f' {k}' if v is None else f' {k}="{v}"' for k, v in rebuilt])
-        return f"<{tag}{attr_str}{'/' if self_closing else ''}>"
+# on ne cible PAS "content" (ne pas toucher <meta content="...">)
+TARGET_ATTRS = {"src", "href", "poster"}
+
+# Réécriture par épissure : une seule passe, seuls les spans de valeurs modifiées sont remplacés,
+# le reste (guillemets, espaces, casse, entités) est recopié octet pour octet.
+# attributs : boucle « déroulée » (pas de quantificateurs imbriqués ambigus -> pas de backtracking exponentiel)
+_TOKEN_RE = re.compile(r"""<!--.*?-->|<![^>]*>|<\?[^>]*>|<([A-Za-z][^\s/>]*)([^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*)>""",
+                       re.S)
+_ATTR_HINT_RE = re.compile(r"src|href|poster|style", re.I)   # balise sans candidat : pas d'analyse des attributs
+_ATTR_RE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+_RAW_TEXT_END = {t: re.compile(rf"</{t}\s*>", re.I) for t in ("script", "style", "textarea", "title")}
+_SRCSET_RE = re.compile(r"(^|,)(\s*)([^\s,]+)")
+_CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+?)\1\s*\)""")
+
+def _static_or_none(url: str, prefix="") -> str | None:
+    return to_django_static(url, prefix) if is_local_asset(url) and "'" not in url else None
+
+def _css_url(m, prefix="") -> str:
+    new = _static_or_none(m.group(2), prefix)
+    return f"url({m.group(1)}{new}{m.group(1)})" if new else m.group(0)  # guillemets de l'auteur conservés
+
+def _rewrite_attr(tag: str, name: str, value: str, prefix="") -> str | None:
+    """Nouvelle valeur de l'attribut, ou None s'il reste inchangé (src/href/poster, srcset, style)."""
+    if name in TARGET_ATTRS:
+        if tag == "base" and name == "href":
+            return None
+        return _static_or_none(value, prefix)
+    if name == "srcset":
+        out = _SRCSET_RE.sub(lambda m: m.group(1) + m.group(2) + (_static_or_none(m.group(3), prefix) or m.group(3)),
+                             value)
+    elif name == "style" and "url(" in value:
+        out = _CSS_URL_RE.sub(lambda m: _css_url(m, prefix), value)
+    else:
+        return None
+    return out if out != value else None
 
-    def transform(self, html_text: str) -> str:
-        self.feed(html_text); self.close()
-        return "".join(self.out)
+def rewrite_static_urls(html_text: str, prefix="") -> str:
+    """
+    Réécrit index.html en une tokenisation (temps linéaire) : contenu de <script>/<textarea>/<title>
+    et commentaires ignorés, <meta> et <base href> jamais modifiés. Gère aussi srcset,
+    style="...url(...)..." et les url() des blocs <style> (CSS critique inliné par Angular).
+    Seul le span de l'URL est remplacé : guillemets (ou leur absence) de l'attribut et de url()
+    restent ceux de l'auteur — Django rend le {% static %} avant que le navigateur ne lise
+    l'attribut. prefix : voir to_django_static (build localisé).
+    """
+    out, pos, last = [], 0, 0
+    search = _TOKEN_RE.search
+    while True:
+        m = search(html_text, pos)
+        if m is None:
+            break
+        pos = m.end()
+        tag = m.group(1)
+        if tag is None:
+            continue
+        tag = tag.lower()
+        body = None
+        if tag in _RAW_TEXT_END:  # contenu recopié sans analyse, hors url() d'un <style>
+            end = _RAW_TEXT_END[tag].search(html_text, pos)
+            body = (pos, end.start() if end else len(html_text))
+            pos = end.end() if end else len(html_text)
+        if tag != "meta" and _ATTR_HINT_RE.search(html_text, m.start(2), m.end(2)):
+            for a in _ATTR_RE.finditer(html_text, m.start(2), m.end(2)):
+                g = a.lastindex  # 2 "…", 3 '…', 4 sans guillemets ; 1 = attribut sans valeur
+                if g == 1:
+                    continue
+                new = _rewrite_attr(tag, a.group(1).lower(), a.group(g), prefix)
+                if new is None:
+                    continue
+                start, end = a.span(g)
+                out.append(html_text[last:start]); out.append(new)
+                last = end
+        if tag == "style":  # après les attributs de la balise : les spans restent dans l'ordre
+            for u in _CSS_URL_RE.finditer(html_text, *body):
+                new = _css_url(u, prefix)
+                if new != u.group(0):
+                    out.append(html_text[last:u.start()]); out.append(new)
+                    last = u.end()
+    out.append(html_text[last:])
+    return "".join(out)
 
 # ---------- Edits idempotents ----------
 SETTINGS_HINT = """# --- Angular/Django wizard settings ---
@@ -159,57 +944,328 @@ STATICFILES_DIRS = [ BASE_DIR / "static" ]
 # STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 """
 
+BASE_DIR_DECL = 'from pathlib import Path\nBASE_DIR = Path(__file__).resolve().parent.parent\n'
+
+@functools.lru_cache(maxsize=16)
+def _settings_tree(txt: str) -> ast.Module:
+    """ast de settings.py, mémorisé sur le texte : les ensure_* enchaînés ne reparsent qu'après une édition."""
+    try:
+        return ast.parse(txt)
+    except SyntaxError as e:
+        raise SyntaxError(f"settings.py illisible (ligne {e.lineno}) : {e.msg}") from None
+
+def _assigned(tree: ast.Module, name: str, nested=False) -> list:
+    """Affectations `name = ...` du module (nested : aussi sous if/try/def), dans l'ordre du fichier."""
+    nodes = ast.walk(tree) if nested else tree.body
+    found = [n for n in nodes if (isinstance(n, ast.Assign) and any(getattr(t, "id", None) == name for t in n.targets))
+             or (isinstance(n, ast.AnnAssign) and n.value is not None and getattr(n.target, "id", None) == name)]
+    return sorted(found, key=lambda n: (n.lineno, n.col_offset))
+
+def _node_span(txt: str, node: ast.AST) -> tuple:
+    lines = txt.splitlines(True)
+    return (_char_offset(lines, node.lineno, node.col_offset),
+            _char_offset(lines, node.end_lineno, node.end_col_offset))
+
 def ensure_base_dir_and_static(content: str) -> str:
     txt = content or ""
-    if re.search(r"^\s*BASE_DIR\s*=", txt, re.M) is None:
-        txt = 'from pathlib import Path\nBASE_DIR = Path(__file__).resolve().parent.parent\n' + txt
-    if re.search(r"^\s*STATIC_URL\s*=", txt, re.M) is None:
+    tree = _settings_tree(txt)
+    has = lambda name: bool(_assigned(tree, name, nested=True))
+    if not has("BASE_DIR"):
+        txt = BASE_DIR_DECL + txt
+    if not has("STATIC_URL"):
         txt += '\n' + SETTINGS_HINT
     else:
-        if re.search(r"^\s*STATIC_ROOT\s*=", txt, re.M) is None:
+        if not has("STATIC_ROOT"):
             txt += '\nSTATIC_ROOT = BASE_DIR / "staticfiles"\n'
-        if re.search(r"^\s*STATICFILES_DIRS\s*=", txt, re.M) is None:
+        if not has("STATICFILES_DIRS"):
             txt += '\nSTATICFILES_DIRS = [ BASE_DIR / "static" ]\n'
     return txt
 
+def _is_templates_dir(node: ast.AST) -> bool:
+    """BASE_DIR / "templates", éventuellement enveloppé (str(...), os.fspath(...))."""
+    return any(isinstance(n, ast.BinOp) and isinstance(n.op, ast.Div) and getattr(n.left, "id", None) == "BASE_DIR"
+               and isinstance(n.right, ast.Constant) and n.right.value == "templates" for n in ast.walk(node))
+
 def ensure_templates_dir_decl(content: str) -> str:
     """
-    Ajoute BASE_DIR / "templates" dans TEMPLATES[0]['DIRS'] de façon idempotente,
-    gère 'DIRS'/"DIRS" et formats multi-lignes.
+    Ajoute BASE_DIR / "templates" aux listes 'DIRS' de TEMPLATES de façon idempotente, inséré
+    aux positions ast (guillemets, virgule finale et commentaires de fin de ligne indifférents).
     """
     txt = content
-    if re.search(r"^\s*BASE_DIR\s*=", txt, re.M) is None:
-        txt = 'from pathlib import Path\nBASE_DIR = Path(__file__).resolve().parent.parent\n' + txt
-
-    def repl_dirs(m):
-        arr = m.group(1)
-        if re.search(r'BASE_DIR\s*/\s*["\']templates["\']', arr):
-            return m.group(0)
-        if re.match(r"^\s*$", arr):
-            new_arr = ' BASE_DIR / "templates" '
-        else:
-            arr_stripped = arr.strip()
-            if arr_stripped.endswith(","):
-                new_arr = arr + ' BASE_DIR / "templates" '
-            else:
-                new_arr = arr + ', BASE_DIR / "templates" '
-        return m.group(0).replace(arr, new_arr)
+    if not _assigned(_settings_tree(txt), "BASE_DIR", nested=True):
+        txt = BASE_DIR_DECL + txt
+    lines = txt.splitlines(True)
+    inserts = []
+    for stmt in _assigned(_settings_tree(txt), "TEMPLATES"):
+        for d in ast.walk(stmt.value):
+            if not isinstance(d, ast.Dict):
+                continue
+            for k, v in zip(d.keys, d.values):
+                if not (isinstance(k, ast.Constant) and k.value == "DIRS" and isinstance(v, ast.List)):
+                    continue
+                if any(map(_is_templates_dir, v.elts)):
+                    continue
+                if not v.elts:
+                    inserts.append((_char_offset(lines, v.lineno, v.col_offset) + 1, 'BASE_DIR / "templates"'))
+                    continue
+                pos = _char_offset(lines, v.elts[-1].end_lineno, v.elts[-1].end_col_offset)
+                comma = re.compile(r"\s*,").match(txt, pos)
+                inserts.append((comma.end(), ' BASE_DIR / "templates"') if comma
+                               else (pos, ', BASE_DIR / "templates"'))
+    for pos, code in sorted(inserts, reverse=True):
+        txt = txt[:pos] + code + txt[pos:]
+    return txt
+
+STATIC_STORAGE_MARK = "# --- Angular/Django wizard : staticfiles.json pré-calculé ---"
 
-    txt = re.sub(r"""['"]DIRS['"]\s*:\s*\[\s*(.*?)\s*\]""", repl_dirs, txt, flags=re.S)
+def ensure_static_storage(content: str, backend: str, mark=STATIC_STORAGE_MARK) -> str:
+    """
+    Sélectionne le stockage statique `backend` de façon idempotente :
+    remplace STATICFILES_STORAGE (Django < 4.2) s'il est seul, sinon complète/ajoute STORAGES.
+    """
+    txt = content
+    tree = _settings_tree(txt)
+    if any(isinstance(n, ast.Constant) and n.value == backend for n in ast.walk(tree)):
+        return txt
+    has_storages = _assigned(tree, "STORAGES")
+    legacy = [n.value for n in _assigned(tree, "STATICFILES_STORAGE")
+              if isinstance(n.value, ast.Constant) and isinstance(n.value.value, str)]
+    if legacy and not has_storages:  # la dernière affectation est celle que Django retient
+        a, b = _node_span(txt, legacy[-1])
+        return txt[:a] + f'"{backend}"' + txt[b:]
+    if has_storages:
+        block = f'STORAGES["staticfiles"] = {{"BACKEND": "{backend}"}}\n'
+    else:
+        block = ('STORAGES = {\n'
+                 '    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},\n'
+                 f'    "staticfiles": {{"BACKEND": "{backend}"}},\n'
+                 '}\n')
+    return txt.rstrip("\n") + "\n\n" + mark + "\n" + block
+
+def _char_offset(lines, lineno: int, col: int) -> int:
+    """Position dans le texte d'un (lineno, col_offset) ast — col_offset est en octets UTF-8."""
+    line = lines[lineno - 1]
+    return sum(map(len, lines[:lineno - 1])) + len(line.encode("utf-8")[:col].decode("utf-8", "ignore"))
+
+WHITENOISE_MIDDLEWARE = "whitenoise.middleware.WhiteNoiseMiddleware"
+WHITENOISE_STORAGE = "whitenoise.storage.CompressedStaticFilesStorage"  # noms déjà hashés par Angular
+# middleware -> celui après lequel l'insérer (en tête de liste s'il est absent) ; les autres vont en fin
+MIDDLEWARE_AFTER = {WHITENOISE_MIDDLEWARE: "django.middleware.security.SecurityMiddleware"}
+
+def ensure_middleware(content: str, dotted: str) -> str:
+    """Ajoute `dotted` à MIDDLEWARE (liste/tuple littéral repéré par ast) de façon idempotente."""
+    txt = content
+    tree = _settings_tree(txt)
+    if any(isinstance(n, ast.Constant) and n.value == dotted for n in ast.walk(tree)):
+        return txt
+    stmts = _assigned(tree, "MIDDLEWARE")
+    node = stmts[-1].value if stmts else None
+    if not isinstance(node, (ast.List, ast.Tuple)):
+        line = f'MIDDLEWARE = [*MIDDLEWARE, "{dotted}"]' if node is not None else f'MIDDLEWARE = ["{dotted}"]'
+        return txt.rstrip("\n") + "\n" + line + "\n"
+    lines = txt.splitlines(keepends=True)
+    elts = node.elts
+    if not elts:
+        pos = _char_offset(lines, node.lineno, node.col_offset) + 1
+        return txt[:pos] + f'\n    "{dotted}",\n' + txt[pos:]
+    anchor = elts[-1]
+    if dotted in MIDDLEWARE_AFTER:
+        anchor = next((e for e in elts if isinstance(e, ast.Constant) and e.value == MIDDLEWARE_AFTER[dotted]), None)
+        if anchor is None:
+            pos = _char_offset(lines, node.lineno, node.col_offset) + 1
+            return txt[:pos] + f'\n    "{dotted}",' + txt[pos:]
+    pos = _char_offset(lines, anchor.end_lineno, anchor.end_col_offset)
+    comma = re.match(r"[ \t]*,", txt[pos:])
+    if comma:
+        pos += comma.end()
+        return txt[:pos] + f'\n    "{dotted}",' + txt[pos:]
+    return txt[:pos] + f',\n    "{dotted}"' + txt[pos:]
+
+PRODUCTION_MARK = "# --- Angular/Django wizard : service statique de production (WhiteNoise) ---"
+
+def ensure_production_serving(content: str) -> str:
+    """
+    WhiteNoise juste après SecurityMiddleware ; fichiers hashés par Angular (name-HASH.ext)
+    servis `max-age=31536000, immutable` ; compression gzip/brotli à la collecte si aucun
+    stockage statique n'est déjà choisi (celui du wizard sert les .gz/.br pré-calculés).
+    """
+    txt = ensure_middleware(content, WHITENOISE_MIDDLEWARE)
+    if not SettingsReader(Path("settings.py"), text=txt, tree=_settings_tree(txt)).staticfiles_storage():
+        txt = ensure_static_storage(txt, WHITENOISE_STORAGE, mark=PRODUCTION_MARK)
+    line = f'WHITENOISE_IMMUTABLE_FILE_TEST = r"{IMMUTABLE_FILE_RE.pattern}"  # Angular : name-HASH.ext'
+    stmts = _assigned(_settings_tree(txt), "WHITENOISE_IMMUTABLE_FILE_TEST")
+    if stmts:
+        a, b = _node_span(txt, stmts[-1])
+        end = txt.find("\n", b)
+        end = len(txt) if end < 0 else end
+        if re.search(r"# Angular : name-HASH\.ext\s*$", txt[b:end]):  # écrite par le wizard : resynchronisée
+            txt = txt[:a] + line + txt[end:]
+    else:
+        head = "\n" if PRODUCTION_MARK in txt else "\n\n" + PRODUCTION_MARK + "\n"
+        txt = txt.rstrip("\n") + head + line + "\n"
     return txt
 
-def idempotent_add_settings(settings_text: str) -> str:
+def idempotent_add_settings(settings_text: str, storage_backend: str | None = None, middleware=(),
+                            production=False) -> str:
     txt = ensure_base_dir_and_static(settings_text or "")
     txt = ensure_templates_dir_decl(txt)
+    if storage_backend:
+        txt = ensure_static_storage(txt, storage_backend)
+    if production:
+        txt = ensure_production_serving(txt)
+    for dotted in middleware:
+        txt = ensure_middleware(txt, dotted)
     return txt
 
-def idempotent_add_urls(urls_text: str) -> str:
+SPA_INDEX_VIEW_CLASS = "SpaIndexView"  # vue de wizard_support.py
+
+def _index_route_re(template: str) -> str:
+    """Vue d'un index (TemplateView ou SpaIndexView) pour le template donné."""
+    name = re.escape(template)
+    return (rf'(?:TemplateView\.as_view\(\s*template_name\s*=\s*["\']{name}["\']\s*\)'
+            rf'|{SPA_INDEX_VIEW_CLASS}\(\s*["\']{name}["\']\s*\))')
+
+# Fallback SPA : préfixes Django montés + STATIC_URL/MEDIA_URL exclus, assets et sondes (x.ext connues) → 404 ;
+# une route Angular à point (/users/john.doe, /v/1.2) reste servie par l'index
+SPA_RESERVED_DEFAULT = ("media", "static")
+SPA_FILE_EXTENSIONS = ("js", "mjs", "css", "map", "json", "webmanifest", "txt", "xml", "html?",
+                       "ico", "png", "jpe?g", "gif", "svg", "webp", "avif", "woff2?", "ttf", "otf", "eot",
+                       "mp[34]", "webm", "pdf", "zip", "gz", "br",
+                       "php", "aspx?", "jsp", "cgi", "env", "ini", "bak", "sql", "ya?ml")
+_SPA_FALLBACK_RE = re.compile(
+    r're_path\(\s*r(["\'])(\^\(\?!.*?)\1\s*,\s*' + _index_route_re("index.html") + r'\s*\)')
+_RE_PATH_PREFIX_RE = re.compile(r"\^?([\w-]+)/")
+
+def spa_fallback_pattern(prefixes) -> str:
+    alts = "|".join(re.escape(p) for p in sorted(set(prefixes)))
+    head = f"(?!(?:{alts})(?:/|$))" if alts else ""
+    exts = "|".join(SPA_FILE_EXTENSIONS)
+    return f"^{head}(?!.*\\.(?i:{exts})$)(?:.*)/?$"
+
+def _route_prefix(route: str, regex: bool) -> str:
+    """Premier segment littéral d'une route : "api/v1/<int:pk>/" -> "api" (tout api/ est à Django)."""
+    if regex:
+        m = _RE_PATH_PREFIX_RE.match(route)
+        return m.group(1) if m else ""
+    seg = route.split("/", 1)[0]
+    return seg if "/" in route and seg and "<" not in seg else ""
+
+def _index_template(call: ast.Call) -> str | None:
+    """Template servi par la vue d'une route : TemplateView.as_view(template_name=...) ou SpaIndexView("...")."""
+    v = call.args[1] if len(call.args) > 1 else None
+    if not isinstance(v, ast.Call):
+        return None
+    if getattr(v.func, "id", None) == SPA_INDEX_VIEW_CLASS and v.args:
+        arg = v.args[0]
+    elif getattr(v.func, "attr", None) == "as_view" and getattr(v.func.value, "id", None) == "TemplateView":
+        arg = next((k.value for k in v.keywords if k.arg == "template_name"), None)
+    else:
+        return None
+    return arg.value if isinstance(arg, ast.Constant) and isinstance(arg.value, str) else None
+
+def _urls_state(txt: str) -> dict:
+    """
+    Une passe ast sur urls.py : début de la liste urlpatterns (offset), templates d'index déjà routés,
+    fallback SPA (motif, span du littéral), span à couper pour le déplacer s'il n'est pas la dernière
+    instruction sur urlpatterns, et préfixes montés. Repli regex si le fichier ne se parse pas.
+    """
+    state = {"open": None, "templates": set(), "fallback": None, "fallback_cut": None, "prefixes": set()}
+    try:
+        tree = ast.parse(txt)
+    except SyntaxError:
+        m = re.search(r"^urlpatterns\s*(?::[^=\n]+)?=\s*\[", txt, re.M)
+        state["open"] = m.end() if m else None
+        state["templates"] = {a or b for a, b in re.findall(
+            rf'TemplateView\.as_view\(\s*template_name\s*=\s*["\']([^"\']+)["\']\s*\)'
+            rf'|{SPA_INDEX_VIEW_CLASS}\(\s*["\']([^"\']+)["\']\s*\)', txt)}
+        m = _SPA_FALLBACK_RE.search(txt)
+        state["fallback"] = m and (m.group(2), *m.span(2))
+        return state
+    lines = txt.splitlines(True)
+    for node in tree.body:
+        targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, "target", None)]
+        if (isinstance(node, (ast.Assign, ast.AnnAssign)) and isinstance(node.value, ast.List)
+                and any(getattr(t, "id", None) == "urlpatterns" for t in targets)):
+            state["open"] = _char_offset(lines, node.value.lineno, node.value.col_offset) + 1
+            break
+    last = fallback = None  # dernière instruction qui touche urlpatterns ; (instruction, appel) du fallback
+    for stmt in tree.body:
+        for node in ast.walk(stmt):
+            if getattr(node, "id", None) == "urlpatterns":
+                last = stmt
+            if not (isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant)
+                    and isinstance(node.args[0].value, str)):
+                continue
+            name = getattr(node.func, "id", None) or getattr(node.func, "attr", None)
+            if name not in ("path", "re_path"):
+                continue
+            route, template = node.args[0], _index_template(node)
+            if template and re.search(r"(?:^|/)index\.html$", template):
+                state["templates"].add(template)
+                if template == "index.html" and name == "re_path" and route.value.startswith("^(?!"):
+                    a = _char_offset(lines, route.lineno, route.col_offset)
+                    b = _char_offset(lines, route.end_lineno, route.end_col_offset)
+                    q = txt.index(txt[b - 1], a)  # guillemet ouvrant, après un éventuel préfixe r
+                    state["fallback"] = (route.value, q + 1, b - 1)
+                    fallback = (stmt, node)
+                continue
+            prefix = _route_prefix(route.value, name == "re_path")
+            if prefix:
+                state["prefixes"].add(prefix)
+    if fallback:
+        stmt, call = fallback
+        alone = isinstance(stmt, ast.AugAssign) and isinstance(stmt.value, ast.List) and len(stmt.value.elts) == 1
+        if not (alone and stmt is last):  # urlpatterns += [re_path(...)] en dernier : déjà en place
+            node = stmt if alone else call
+            state["fallback_cut"] = _cut_span(txt, _char_offset(lines, node.lineno, node.col_offset),
+                                              _char_offset(lines, node.end_lineno, node.end_col_offset))
+    return state
+
+def _cut_span(txt: str, a: int, b: int) -> tuple:
+    """Étend [a, b) à la virgule qui suit et, si rien d'autre n'est sur ces lignes, aux lignes entières."""
+    b = re.compile(r"[ \t]*,?").match(txt, b).end()
+    start, end = txt.rfind("\n", 0, a) + 1, txt.find("\n", b)
+    end = len(txt) if end < 0 else end + 1
+    return (start, end) if not txt[start:a].strip() and not txt[b:end].strip() else (a, b)
+
+def mounted_url_prefixes(urls_text: str) -> list:
+    """Préfixes des path()/re_path() de urlpatterns (hors routes des index SPA)."""
+    return sorted(_urls_state(urls_text or "")["prefixes"])
+
+def project_url_prefixes(settings_py: Path | None) -> list:
+    """Chemins de STATIC_URL et MEDIA_URL (défaut static/ et media/), hors URL absolues (CDN)."""
+    values = {}
+    if settings_py:
+        try:
+            reader = settings_reader(settings_py)
+            values = {k: reader.get(k) for k in ("STATIC_URL", "MEDIA_URL")}
+        except (OSError, SyntaxError, ValueError):
+            values = {}
+    out = []
+    for key, default in zip(("MEDIA_URL", "STATIC_URL"), SPA_RESERVED_DEFAULT):
+        url = values.get(key)
+        url = url if isinstance(url, str) and url else default
+        if not url.startswith(("http://", "https://", "//")):
+            out.append(url.strip("/").split("/", 1)[0])
+    return [u for u in out if u]
+
+def idempotent_add_urls(urls_text: str, locales=None, index_view=None, reserved=SPA_RESERVED_DEFAULT) -> str:
     """
     - Garantit imports path/re_path + TemplateView + staticfiles_urlpatterns
-    - Ajoute racine + fallback SPA en excluant /static/ et /media/
+    - Ajoute la racine en tête de urlpatterns
+    - Build localisé : /<locale>/... -> templates/<locale>/index.html, en tête aussi
+    - index_view : module wizard_support → SpaIndexView (index en mémoire, ETag/304)
+      remplace les TemplateView des index
     - Ajoute urlpatterns += staticfiles_urlpatterns() (DEV)
+    - Fallback SPA en toute dernière instruction (urlpatterns += [re_path(...)]) : les routes du projet
+      passent avant lui ; il exclut les préfixes montés, `reserved` (STATIC_URL/MEDIA_URL,
+      cf. project_url_prefixes) et les noms de fichier : 404 au lieu de l'index
     """
     txt = urls_text or ""
+    if index_view:
+        view = lambda name: f'{SPA_INDEX_VIEW_CLASS}("{name}")'
+    else:
+        view = lambda name: f'TemplateView.as_view(template_name="{name}")'
 
     # 1) Import path, re_path
     if re.search(r"^from\s+django\.urls\s+import\s+.+$", txt, flags=re.M):
@@ -228,8 +1284,14 @@ def idempotent_add_urls(urls_text: str) -> str:
     else:
         txt = "from django.urls import path, re_path\n" + txt
 
-    # 2) Import TemplateView
-    if "from django.views.generic import TemplateView" not in txt:
+    # 2) Import de la vue des index ; les TemplateView existantes d'un index basculent sur SpaIndexView
+    if index_view:
+        imp = f"from {index_view} import {SPA_INDEX_VIEW_CLASS}"
+        if imp not in txt:
+            txt = imp + "\n" + txt
+        txt = re.sub(r'TemplateView\.as_view\(\s*template_name\s*=\s*["\']((?:[\w-]+/)?index\.html)["\']\s*\)',
+                     lambda m: view(m.group(1)), txt)
+    elif "from django.views.generic import TemplateView" not in txt:
         txt = "from django.views.generic import TemplateView\n" + txt
 
     # 3) Import staticfiles_urlpatterns (dev)
@@ -237,43 +1299,383 @@ def idempotent_add_urls(urls_text: str) -> str:
         txt = "from django.contrib.staticfiles.urls import staticfiles_urlpatterns\n" + txt
 
     # 4) S'assurer d'avoir urlpatterns
-    if re.search(r"^\s*urlpatterns\s*=", txt, flags=re.M) is None:
+    if re.search(r"^\s*urlpatterns\s*(?::[^=\n]+)?=", txt, flags=re.M) is None:
         txt += "\nurlpatterns = []\n"
 
-    # 5) Ajouter (idempotent) racine et fallback excluant /static/ et /media/
-    has_root = re.search(r'TemplateView\.as_view\(\s*template_name\s*=\s*["\']index\.html["\']\s*\)', txt)
-    has_re_fallback = re.search(
-        r're_path\(\s*r["\']\^\(\?!static/|media/\)\(\?:\.\*\)/\?\$["\']\s*,\s*TemplateView\.as_view\(\s*template_name\s*=\s*["\']index\.html["\']\s*\)\s*\)',
-        txt
-    )
-
-    if not (has_root and has_re_fallback):
-        def _inject(m):
-            head = m.group(0)
-            lines = []
-            if not has_root:
-                lines.append('    path("", TemplateView.as_view(template_name="index.html")),')
-            if not has_re_fallback:
-                # Negative lookahead pour NE PAS matcher /static/ ni /media/
-                lines.append('    re_path(r"^(?!static/|media/)(?:.*)/?$", TemplateView.as_view(template_name="index.html")),')
-            return head + ("\n" + "\n".join(lines) if lines else "")
-        txt = re.sub(r"urlpatterns\s*=\s*\[", _inject, txt, count=1)
+    # 5) Racine et routes par locale en tête de urlpatterns, placées d'après l'ast de urls.py
+    state = _urls_state(txt)
+    lines = [f'    re_path(r"^{loc}(?:/.*)?$", {view(f"{loc}/index.html")}),'
+             for loc in locales or () if f"{loc}/index.html" not in state["templates"]]
+    if "index.html" not in state["templates"]:
+        lines.append(f'    path("", {view("index.html")}),')
+    if lines and state["open"] is not None:
+        at = state["open"]
+        txt = txt[:at] + "\n" + "\n".join(lines) + txt[at:]
 
     # 6) Ajouter (idempotent) les patterns statics pour le DEV
     if re.search(r"urlpatterns\s*\+=\s*staticfiles_urlpatterns\(\s*\)", txt) is None:
         txt += "\nurlpatterns += staticfiles_urlpatterns()\n"
 
+    # 7) Fallback en dernier : un fallback placé avant (ancienne version, routes ajoutées après lui)
+    #    est déplacé, un fallback en place suit les préfixes montés
+    state = _urls_state(txt)
+    fallback = spa_fallback_pattern([*state["prefixes"], *reserved])
+    if state["fallback_cut"]:
+        a, b = state["fallback_cut"]
+        txt, state["fallback"] = txt[:a] + txt[b:], None
+    if not state["fallback"]:
+        txt += f'\nurlpatterns += [re_path(r"{fallback}", {view("index.html")})]\n'
+    elif state["fallback"][0] != fallback:  # routes ajoutées depuis : resynchroniser
+        _, a, b = state["fallback"]
+        txt = txt[:a] + fallback + txt[b:]
+
     return txt
 
+# ---------- Diff (Myers en espace linéaire) ----------
+DIFF_CONTEXT = 3
+DIFF_CACHE_SIZE = 16
+_DIFF_CACHE = {}  # (empreinte a, empreinte b) -> opcodes
+
+def _middle_snake(a, b, a0, a1, b0, b1):
+    """Serpent du milieu de Myers (1986, §4b) : (x, y, u, v) absolus, en O(N+M) d'espace."""
+    n, m = a1 - a0, b1 - b0
+    delta = n - m
+    odd = delta & 1
+    off = (n + m + 1) // 2 + 1
+    vf, vb = [0] * (2 * off + 1), [0] * (2 * off + 1)
+    for d in range(off):
+        for k in range(-d, d + 1, 2):  # avant
+            if k == -d or (k != d and vf[off + k - 1] < vf[off + k + 1]):
+                x = vf[off + k + 1]
+            else:
+                x = vf[off + k - 1] + 1
+            y = x - k
+            xs = x
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1; y += 1
+            vf[off + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + vb[off + delta - k] >= n:
+                return a0 + xs, b0 + xs - k, a0 + x, b0 + y
+        for k in range(-d, d + 1, 2):  # arrière (coordonnées comptées depuis la fin)
+            if k == -d or (k != d and vb[off + k - 1] < vb[off + k + 1]):
+                x = vb[off + k + 1]
+            else:
+                x = vb[off + k - 1] + 1
+            y = x - k
+            xs = x
+            while x < n and y < m and a[a1 - 1 - x] == b[b1 - 1 - y]:
+                x += 1; y += 1
+            vb[off + k] = x
+            if not odd and -d <= delta - k <= d and x + vf[off + delta - k] >= n:
+                return a1 - x, b1 - y, a1 - xs, b1 - xs + k
+    raise RuntimeError("diff : serpent du milieu introuvable")
+
+def _myers_pairs(a, b) -> list:
+    """Paires (i, j) de lignes appariées d'une plus longue sous-séquence commune de a et b."""
+    pairs, stack = [], [(0, len(a), 0, len(b))]
+    while stack:
+        a0, a1, b0, b1 = stack.pop()
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            pairs.append((a0, b0)); a0 += 1; b0 += 1
+        while a0 < a1 and b0 < b1 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1; b1 -= 1; pairs.append((a1, b1))
+        if a0 == a1 or b0 == b1:
+            continue
+        x, y, u, v = _middle_snake(a, b, a0, a1, b0, b1)
+        pairs.extend((x + t, y + t) for t in range(u - x))
+        stack.append((a0, x, b0, y))
+        stack.append((u, a1, v, b1))
+    pairs.sort()
+    return pairs
+
+def _diff_opcodes(a: list, b: list) -> list:
+    n, m = len(a), len(b)
+    # préfixe / suffixe communs : le cas courant (quelques lignes insérées) ne coûte qu'un balayage
+    p = 0
+    while p < n and p < m and a[p] == b[p]:
+        p += 1
+    s = 0
+    while s < n - p and s < m - p and a[n - 1 - s] == b[m - 1 - s]:
+        s += 1
+    # lignes internées en entiers ; celles absentes de l'autre côté ne peuvent pas s'apparier :
+    # écartées avant Myers (sans effet sur le résultat, décisif sur un fichier réécrit)
+    ids = {}
+    ai = [ids.setdefault(line, len(ids)) for line in a[p:n - s]]
+    bi = [ids.setdefault(line, len(ids)) for line in b[p:m - s]]
+    common = set(ai) & set(bi)
+    ka = [i for i, x in enumerate(ai) if x in common]
+    kb = [j for j, x in enumerate(bi) if x in common]
+    pairs = [(p + ka[i], p + kb[j]) for i, j in _myers_pairs([ai[i] for i in ka], [bi[j] for j in kb])]
+    blocks = [[0, 0, p]] if p else []
+    for i, j in pairs:
+        if blocks and blocks[-1][0] + blocks[-1][2] == i and blocks[-1][1] + blocks[-1][2] == j:
+            blocks[-1][2] += 1
+        else:
+            blocks.append([i, j, 1])
+    if s:
+        blocks.append([n - s, m - s, s])
+    codes, i, j = [], 0, 0
+    for bi_, bj, size in blocks + [[n, m, 0]]:
+        tag = "replace" if i < bi_ and j < bj else "delete" if i < bi_ else "insert" if j < bj else None
+        if tag:
+            codes.append((tag, i, bi_, j, bj))
+        if size:
+            codes.append(("equal", bi_, bi_ + size, bj, bj + size))
+        i, j = bi_ + size, bj + size
+    return codes
+
+def diff_opcodes(a: list, b: list) -> list:
+    """
+    Opcodes (tag, i1, i2, j1, j2) à la difflib entre deux listes de lignes, par Myers
+    (diff minimal, espace linéaire). Résultat en cache, indexé par l'empreinte des entrées :
+    re-prévisualiser un fichier inchangé ne recalcule rien.
+    """
+    key = (hashlib.blake2b("".join(a).encode("utf-8", "surrogatepass"), digest_size=16).digest(), len(a),
+           hashlib.blake2b("".join(b).encode("utf-8", "surrogatepass"), digest_size=16).digest(), len(b))
+    codes = _DIFF_CACHE.get(key)
+    if codes is None:
+        codes = _diff_opcodes(a, b)
+        if len(_DIFF_CACHE) >= DIFF_CACHE_SIZE:
+            _DIFF_CACHE.pop(next(iter(_DIFF_CACHE)))
+        _DIFF_CACHE[key] = codes
+    return codes
+
+def diff_hunks(a: list, b: list, context=DIFF_CONTEXT) -> list:
+    """Hunks (listes d'opcodes) avec `context` lignes de contexte, comme get_grouped_opcodes."""
+    codes = list(diff_opcodes(a, b))
+    if not codes or (len(codes) == 1 and codes[0][0] == "equal"):
+        return []
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    hunks, group = [], []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            hunks.append(group); group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        hunks.append(group)
+    return hunks
+
+def _unified_range(start, stop) -> str:
+    length = stop - start
+    return f"{start + (length > 0)}" + ("" if length == 1 else f",{length}")
+
+def hunk_header(hunk) -> str:
+    return (f"@@ -{_unified_range(hunk[0][1], hunk[-1][2])} "
+            f"+{_unified_range(hunk[0][3], hunk[-1][4])} @@")
+
+def hunk_context(a: list, i: int, limit=200) -> str:
+    """Dernière ligne de niveau module avant la ligne i (def, class, NOM = …), façon git."""
+    for k in range(i - 1, max(i - 1 - limit, -1), -1):
+        line = a[k]
+        if line[:1].isalpha() or line[:1] == "_":
+            return line.rstrip()[:60]
+    return ""
+
+def unified_diff_lines(a: list, b: list, fromfile="", tofile="", context=DIFF_CONTEXT) -> list:
+    """Même sortie que difflib.unified_diff (sans dates), calculée par diff_opcodes."""
+    hunks = diff_hunks(a, b, context)
+    out = [f"--- {fromfile}\n", f"+++ {tofile}\n"] if hunks else []
+    for hunk in hunks:
+        out.append(hunk_header(hunk) + "\n")
+        for tag, i1, i2, j1, j2 in hunk:
+            if tag == "equal":
+                out.extend(" " + line for line in a[i1:i2])
+                continue
+            out.extend("-" + line for line in a[i1:i2])
+            out.extend("+" + line for line in b[j1:j2])
+    return out
+
+# ---------- Module wizard_support.py (généré à côté de settings.py) ----------
+WIZARD_SUPPORT_NAME = "wizard_support.py"
+PREBUILT_STORAGE_CLASS = "PrebuiltManifestStaticFilesStorage"
+WIZARD_SUPPORT_SOURCE = '''"""
+Généré par Angular → Django Wizard : ne pas éditer, le fichier est réécrit à chaque application.
+"""
+import hashlib
+import json
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class PrebuiltManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Fait confiance au staticfiles.json écrit par le wizard (noms déjà hashés par Angular) :
+    collectstatic copie les assets tels quels. Seuls les fichiers absents de ce manifest, ni
+    clés ni copies nom.hash.ext qu'il référence (statics des apps Django : admin...), passent
+    par le post-traitement habituel.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        loaded = self.load_manifest()  # celui qui vient d'être collecté
+        prebuilt = loaded[0] if isinstance(loaded, tuple) else loaded
+        known = set(prebuilt) | set(prebuilt.values())
+        todo = {name: entry for name, entry in paths.items()
+                if name != self.manifest_name and self.hash_key(self.clean_name(name)) not in known}
+        if todo:
+            yield from super().post_process(todo, dry_run=dry_run, **options)
+        if not dry_run:
+            self.hashed_files = {**self.hashed_files, **prebuilt}
+            self.save_manifest()
+
+
+class ModulePreloadMiddleware:
+    """
+    Ajoute `Link: <…>; rel=modulepreload` aux pages SPA d'après le <template>.preload.json
+    écrit par le wizard à côté de l'index : le navigateur charge tout le graphe initial de
+    modules en parallèle. Un proxy/CDN compatible peut relayer ces en-têtes en 103 Early Hints.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cache = {}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        names = getattr(response, "template_name", None)
+        if response.status_code == 200 and names:
+            links = self.links([names] if isinstance(names, str) else list(names))
+            if links:
+                response["Link"] = f"{response['Link']}, {links}" if response.has_header("Link") else links
+        return response
+
+    def links(self, names):
+        from django.template import TemplateDoesNotExist, loader
+        from django.templatetags.static import static
+        try:
+            origin = loader.select_template(names).origin.name
+        except TemplateDoesNotExist:
+            return ""
+        path = os.path.splitext(str(origin))[0] + ".preload.json"
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return ""
+        cached = self.cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, encoding="utf-8") as f:
+                modules = json.load(f).get("modules", [])
+            cached = self.cache[path] = (mtime, ", ".join(f"<{static(m)}>; rel=modulepreload" for m in modules))
+        return cached[1]
+
+
+class IndexNoCacheMiddleware:
+    """
+    Cache-Control: no-cache sur les pages rendues depuis un index.html : le shell SPA est
+    toujours revalidé, alors que les bundles hashés qu'il référence sont immuables.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        names = getattr(response, "template_name", None) or ()
+        if isinstance(names, str):
+            names = [names]
+        if not response.has_header("Cache-Control") and any(n.endswith("index.html") for n in names):
+            response["Cache-Control"] = "no-cache"
+        return response
+
+
+class SpaIndexView:
+    """
+    Index SPA rendu une seule fois par déploiement puis servi depuis la mémoire, avec un ETag
+    fort et 304 sur If-None-Match. Seul un stat() du template est fait par requête : une
+    nouvelle mtime (déploiement) invalide le cache. Rendu sans requête : {% static %} oui,
+    {% csrf_token %} et context processors non.
+    """
+
+    def __init__(self, template_name):
+        self.template_name = template_name
+        self.cached = None  # (chemin, mtime_ns, corps, etag)
+
+    def __call__(self, request, *args, **kwargs):
+        from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+        from django.utils.http import parse_etags
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        _, _, body, etag = entry = self.entry()
+        tags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if "*" in tags or etag in (t.removeprefix("W/") for t in tags):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="text/html; charset=utf-8")
+            response.template_name = [self.template_name]  # lu par les middlewares du wizard
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    def entry(self):
+        cached = self.cached
+        if cached:
+            try:
+                if os.stat(cached[0]).st_mtime_ns == cached[1]:
+                    return cached
+            except OSError:
+                pass
+            try:  # loader "cached" : recompiler le template redéployé
+                from django.template.autoreload import reset_loaders
+                reset_loaders()
+            except ImportError:
+                pass
+        from django.template import loader
+        template = loader.get_template(self.template_name)
+        path = str(template.origin.name)
+        mtime = os.stat(path).st_mtime_ns
+        body = template.render().encode("utf-8")
+        self.cached = (path, mtime, body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+        return self.cached
+'''
+
+def support_module_for(settings_py: Path, project_root: Path) -> str:
+    """Chemin pointé du module généré : <paquet des settings>.wizard_support"""
+    pkg = Path(settings_py).resolve().parent
+    try:
+        parts = pkg.relative_to(Path(project_root).resolve()).parts
+    except ValueError:
+        parts = (pkg.name,)
+    return ".".join(parts + (Path(WIZARD_SUPPORT_NAME).stem,))
+
+PRELOAD_MIDDLEWARE_CLASS = "ModulePreloadMiddleware"
+INDEX_NO_CACHE_MIDDLEWARE_CLASS = "IndexNoCacheMiddleware"
+
+def prebuilt_storage_backend(settings_py: Path, project_root: Path) -> str:
+    return f"{support_module_for(settings_py, project_root)}.{PREBUILT_STORAGE_CLASS}"
+
+def preload_middleware_path(settings_py: Path, project_root: Path) -> str:
+    return f"{support_module_for(settings_py, project_root)}.{PRELOAD_MIDDLEWARE_CLASS}"
+
+def index_no_cache_middleware_path(settings_py: Path, project_root: Path) -> str:
+    return f"{support_module_for(settings_py, project_root)}.{INDEX_NO_CACHE_MIDDLEWARE_CLASS}"
+
+def ensure_wizard_support(settings_py: Path, backup_fn=None) -> Path | None:
+    """(Ré)écrit wizard_support.py à côté de settings.py ; None s'il était déjà à jour."""
+    p = Path(settings_py).parent / WIZARD_SUPPORT_NAME
+    if read_text(p) == WIZARD_SUPPORT_SOURCE:
+        return None
+    if p.exists() and backup_fn:
+        backup_fn(p)
+    write_text(p, WIZARD_SUPPORT_SOURCE)
+    return p
+
 # ---------- Déploiement ----------
-def transform_index_html(dist_browser: Path) -> str:
+def transform_index_html(dist_browser: Path, prefix="") -> str:
     """
     Transforme index.html → injecte {% static %} et ajoute {% load static %} s'il manque.
+    prefix : locale d'un build i18n (dist_browser/<locale>/ servi sous static/<locale>/).
     """
     src_html = read_text(dist_browser / "index.html")
     if not src_html:
         raise RuntimeError("index.html introuvable dans le dossier sélectionné.")
-    out_html = StaticRewriter().transform(src_html)
+    out_html = rewrite_static_urls(src_html, prefix)
     if "{% load static %}" not in out_html:
         if out_html.lstrip().upper().startswith("<!DOCTYPE"):
             lines = out_html.splitlines(True)
@@ -288,582 +1690,1749 @@ def transform_index_html(dist_browser: Path) -> str:
             out_html = "{% load static %}\n" + out_html
     return out_html
 
-def deploy_front(dist_browser: Path, templates_dir: Path, static_dir: Path, log_fn, backup_fn=None):
-    out_html = transform_index_html(dist_browser)
+# ---------- Graphe de modules initial (modulepreload) ----------
+PRELOAD_SUFFIX = ".preload.json"   # templates/index.html -> templates/index.preload.json
+_STATIC_IMPORT_RE = re.compile(rb"""\b(?:import|export)\s*(?:[\w$*{}\s,]*?\bfrom\s*)?(["'])([^"'\n]+)\1""")
+_SCRIPT_TAG_RE = re.compile(r"<(script|link)\b([^>]*)>", re.I)
+
+def _resolve_specifier(importer: str, spec: str) -> str | None:
+    if spec.startswith(("./", "../")):
+        return posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+    if spec.startswith("/") and not spec.startswith("//"):
+        return spec.lstrip("/")
+    return None  # specifier nu / URL : hors build
+
+def initial_modules(dist_dir: Path, src_html: str) -> tuple[list, list]:
+    """
+    (entrées, chunks) : les <script type="module" src> d'index.html et, en largeur d'abord,
+    les chunks qu'ils importent statiquement (import/export … from, import "…"), hors
+    imports dynamiques et hors chunks déjà annoncés par un <link rel="modulepreload">.
+    """
+    dist_dir = Path(dist_dir)
+    entries, announced = [], set()
+    for m in _SCRIPT_TAG_RE.finditer(src_html):
+        attrs = {a.group(1).lower(): a.group(a.lastindex) for a in _ATTR_RE.finditer(m.group(2))
+                 if a.lastindex and a.lastindex > 1}
+        if m.group(1).lower() == "script" and attrs.get("type") == "module" and is_local_asset(attrs.get("src", "")):
+            entries.append(_resolve_specifier("", attrs["src"] if attrs["src"].startswith("/") else "./" + attrs["src"]))
+        elif attrs.get("rel") == "modulepreload" and is_local_asset(attrs.get("href", "")):
+            announced.add(_resolve_specifier("", attrs["href"] if attrs["href"].startswith("/") else "./" + attrs["href"]))
+    entries = [e for e in entries if e and (dist_dir / e).is_file()]
+    seen, queue, chunks = set(entries), list(entries), []
+    while queue:
+        rel = queue.pop(0)
+        for m in _STATIC_IMPORT_RE.finditer((dist_dir / rel).read_bytes()):
+            dep = _resolve_specifier(rel, m.group(2).decode("utf-8", "replace"))
+            if dep and dep not in seen and dep.endswith((".js", ".mjs")) and (dist_dir / dep).is_file():
+                seen.add(dep); queue.append(dep)
+                if dep not in announced:
+                    chunks.append(dep)
+    return entries, chunks
+
+def inject_modulepreload(html: str, chunks, prefix="") -> str:
+    """Insère les <link rel="modulepreload"> avant </head> (à défaut avant le premier <script>)."""
+    if not chunks:
+        return html
+    links = "".join(f'<link rel="modulepreload" href="{to_django_static(c, prefix)}">' for c in chunks)
+    m = re.search(r"</head\s*>", html, re.I) or re.search(r"<script\b", html, re.I)
+    pos = m.start() if m else 0
+    return html[:pos] + links + html[pos:]
+
+def write_preload_list(dest_index: Path, modules):
+    """templates/…/index.preload.json : chemins statiques lus par ModulePreloadMiddleware."""
+    target = Path(dest_index).with_suffix(PRELOAD_SUFFIX)
+    write_text(target, json.dumps({"modules": list(modules)}, indent=1))
+    return target
+
+# ---------- Builds localisés (ng build --localize) ----------
+LOCALE_DIR_RE = re.compile(r"^[a-z]{2,3}(?:-[A-Za-z0-9]{2,8})*$")
+
+def detect_locales(dist_browser: Path) -> list:
+    """Locales d'un build i18n : sous-dossiers browser/<locale>/ contenant un index.html."""
+    dist = Path(dist_browser)
+    if not dist.is_dir():
+        return []
+    with os.scandir(dist) as it:
+        return sorted(e.name for e in it if e.is_dir() and LOCALE_DIR_RE.match(e.name)
+                      and os.path.isfile(os.path.join(e.path, "index.html")))
+
+def has_index(dist_browser: Path) -> bool:
+    return (Path(dist_browser) / "index.html").exists() or bool(detect_locales(dist_browser))
+
+def index_names(locales) -> set:
+    """index.html à ne pas copier dans static/ (ils partent dans templates/)."""
+    return {"index.html", *(f"{loc}/index.html" for loc in locales)}
+
+def render_indexes(dist_browser: Path, templates_dir: Path, locales, workers=COPY_WORKERS,
+                   preloads: dict | None = None) -> dict:
+    """
+    {templates/…/index.html: html transformé} : l'index racine et un index par locale
+    (templates/<locale>/index.html, assets sous static/<locale>/), transformés en parallèle.
+    Sans index racine, templates/index.html reprend la première locale (fallback SPA).
+    preloads (dict) : si fourni, chaque index reçoit ses <link rel="modulepreload"> et
+    preloads[destination] la liste des modules initiaux (chemins statiques).
+    """
+    def render(dist_dir, prefix):
+        html = transform_index_html(dist_dir, prefix)
+        if preloads is None:
+            return html, None
+        entries, chunks = initial_modules(dist_dir, read_text(dist_dir / "index.html"))
+        static_paths = [posixpath.join(prefix, rel) if prefix else rel for rel in entries + chunks]
+        return inject_modulepreload(html, chunks, prefix), static_paths
+
+    dist, templates_dir = Path(dist_browser), Path(templates_dir)
+    jobs = {}
+    if (dist / "index.html").exists():
+        jobs[templates_dir / "index.html"] = (dist, "")
+    for loc in locales:
+        jobs[templates_dir / loc / "index.html"] = (dist / loc, loc)
+    if not jobs:
+        raise RuntimeError("index.html introuvable dans le dossier sélectionné.")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as ex:
+        rendered = dict(zip(jobs, ex.map(lambda job: render(*job), jobs.values())))
+    root = templates_dir / "index.html"
+    if root not in rendered:
+        rendered[root] = rendered[templates_dir / locales[0] / "index.html"]
+    if preloads is not None:
+        preloads.update({dest: modules for dest, (_, modules) in rendered.items()})
+    return {dest: html for dest, (html, _) in rendered.items()}
+
+# ---------- Chargement des chunks sous STATIC_URL ----------
+_WEBPACK_PUBLIC_PATH_RE = re.compile(rb"""\b((?:__webpack_require__|[A-Za-z_$][\w$]{0,2})\.p\s*=\s*)(["'])/?\2""")
+_ABS_SPECIFIER_RE = re.compile(rb"""(\bimport\s*\(\s*|\bfrom\s*|\bimport\s*)(["'])/([^"'?#\s]+\.m?js)\2""")
+_WEBPACK_RUNTIME_MARK = b"function __webpack_require__("
+
+class ChunkUrlRewriter:
+    """
+    Fait résoudre le chargement des chunks JS sous STATIC_URL au lieu de la racine
+    (où le fallback SPA de urls.py répondrait index.html avec un 200) :
+    - runtime webpack seulement (runtime*.js, ou le chunk qui définit __webpack_require__) :
+      publicPath vide (`r.p=""`, relatif à <base href="/">) -> STATIC_URL[/<locale>/] ; les chunks
+      lazy (qui ne font que référencer webpackChunk…) ne sont pas touchés par cette substitution
+    - specifiers absolus import("/chunk-….js") / from "/….js" vers un fichier du build -> STATIC_URL
+    Les specifiers relatifs d'esbuild ("./chunk-….js") se résolvent déjà depuis l'URL du module.
+    """
+    def __init__(self, static_url: str, files=(), locales=()):
+        self.static_url = static_url
+        self.files = set(files)
+        self.locales = tuple(locales)
+        self.key = f"chunks-v2:{static_url}"  # v2 : publicPath réécrit dans le runtime seul (recopie complète)
+
+    def applies(self, rel: str) -> bool:
+        return rel.endswith((".js", ".mjs"))
+
+    def _base(self, rel: str) -> str:
+        loc = rel.split("/", 1)[0] if "/" in rel else ""
+        return f"{self.static_url}{loc}/" if loc in self.locales else self.static_url
+
+    def __call__(self, rel: str, data: bytes) -> bytes | None:
+        base = self._base(rel)
+        out = data
+        name = rel.rsplit("/", 1)[-1]
+        if name.startswith("runtime") or _WEBPACK_RUNTIME_MARK in data:
+            # une seule affectation de publicPath par runtime : la première
+            out = _WEBPACK_PUBLIC_PATH_RE.sub(lambda m: m.group(1) + m.group(2) + base.encode() + m.group(2), out,
+                                              count=1)
+        if b'"/' in out or b"'/" in out:
+            def spec(m):
+                target = m.group(3).decode("utf-8", "replace")
+                if target not in self.files:
+                    return m.group(0)
+                return m.group(1) + m.group(2) + (self.static_url + target).encode() + m.group(2)
+            out = _ABS_SPECIFIER_RE.sub(spec, out)
+        return out if out != data else None
+
+def normalize_static_url(url) -> str:
+    """"/static/" par défaut ; "static/" -> "/static/" (Django préfixe les STATIC_URL relatifs)."""
+    url = url if isinstance(url, str) and url else "/static/"
+    if not url.startswith(("/", "http://", "https://")):
+        url = "/" + url
+    return url if url.endswith("/") else url + "/"
+
+def project_static_url(settings_py: Path | None) -> str:
+    """STATIC_URL de settings.py, normalisé."""
+    url = None
+    if settings_py:
+        try:
+            url = settings_reader(settings_py).get("STATIC_URL")
+        except (OSError, SyntaxError, ValueError):
+            url = None
+    return normalize_static_url(url)
+
+# ---------- Déploiement atomique (staging + bascule) ----------
+def _side(p: Path, tag: str) -> Path:
+    """Chemin frère caché : static -> .static.<tag>, index.html -> .index.html.<tag>"""
+    name = p.name if p.name.startswith(".") else "." + p.name
+    return p.with_name(f"{name}.{tag}")
+
+def _anchored(p: Path) -> Path:
+    """Chemin absolu sans suivre le dernier composant (static/ peut être le lien basculé)."""
+    p = Path(p)
+    return p.parent.resolve() / p.name
+
+def _link_target(link: Path) -> Path:
+    """Cible absolue d'un symlink (les cibles relatives sont relatives au dossier du lien)."""
+    return link.parent / os.readlink(link)
+
+def _exchange(a: Path, b: Path) -> bool:
+    """
+    Échange atomique de deux chemins existants : renameat2(RENAME_EXCHANGE) sous Linux,
+    renamex_np(RENAME_SWAP) sous macOS. False si le système ou le FS ne le propose pas.
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if sys.platform.startswith("linux") and hasattr(libc, "renameat2"):
+            rc = libc.renameat2(-100, os.fsencode(a), -100, os.fsencode(b), 2)  # AT_FDCWD, RENAME_EXCHANGE
+        elif sys.platform == "darwin" and hasattr(libc, "renamex_np"):
+            rc = libc.renamex_np(os.fsencode(a), os.fsencode(b), 2)  # RENAME_SWAP
+        else:
+            return False
+    except (OSError, TypeError):
+        return False
+    if rc == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EXDEV):
+        return False
+    raise OSError(err, os.strerror(err), str(a))
+
+def _swap(a: Path, b: Path):
+    """Échange deux chemins (fichiers ou dossiers) : atomique si possible, sinon trois renommages."""
+    if _exchange(a, b):
+        return
+    tmp = _side(a, "swap")
+    os.replace(a, tmp)
+    os.replace(b, a)
+    os.replace(tmp, b)
+
+def _flip_symlink(link: Path, target: Path):
+    """Fait pointer link vers target de façon atomique (symlink temporaire + rename)."""
+    link, target = _anchored(link), Path(target).resolve()
+    tmp = _side(link, "link.tmp")
+    _remove(tmp)
+    if link.exists() and not link.is_symlink():
+        shutil.rmtree(link)  # reste d'un déploiement en mode 'rename' (jamais le static/ live)
+    os.symlink(target, tmp, target_is_directory=True)
+    os.replace(tmp, link)
+
+def _symlinks_supported(folder: Path) -> bool:
+    """Faux sous Windows sans privilège (ou FS sans liens) : repli sur la stratégie 'rename'."""
+    probe = folder / f".wizard-link-probe-{os.getpid()}"
+    try:
+        os.symlink(folder, probe, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        return False
+    probe.unlink()
+    return True
+
+def _remove(p: Path):
+    if p.is_symlink() or p.is_file():
+        p.unlink()
+    elif p.exists():
+        shutil.rmtree(p)
+
+def _link_or_copy(src: Path, dst: Path):
+    try:
+        os.link(src, dst)
+    except OSError:
+        copy_file_fast(src, dst)
+
+def staged_strategy(static_dir: Path, strategy="auto") -> str:
+    """
+    'symlink' dès que le système sait créer des liens : static/ devient (au premier déploiement
+    atomique) un lien vers .static.releases/<stamp>, ensuite seulement basculé.
+    'rename' sinon : échange atomique si l'OS le propose, deux renommages à défaut.
+    """
+    if strategy == "auto":
+        static_dir = _anchored(static_dir)
+        if static_dir.is_symlink():
+            return "symlink"
+        static_dir.parent.mkdir(parents=True, exist_ok=True)
+        return "symlink" if _symlinks_supported(static_dir.parent) else "rename"
+    return strategy
+
+def staged_deploy(dist_browser: Path, pages: dict, static_dir: Path, full=False,
+                  strategy="auto", workers=COPY_WORKERS, progress=None, cancel=None, precompress=False,
+                  static_manifest=False, ignore_names=None, dedupe=False, transform=None) -> dict:
+    """
+    Construit le nouvel arbre static/ à côté du live (hardlinks pour l'existant,
+    copie pour le nouveau/modifié), puis bascule :
+      1) static/ (flip du symlink vers releases/<stamp>, ou échange/renommages sans liens)
+      2) les index.html de pages {destination: html} (os.replace atomique) — une fois les chunks en place.
+    La génération précédente est conservée pour un rollback O(1).
+    Une annulation avant la bascule supprime le staging : le live n'est pas touché.
+    precompress / static_manifest : appliqués au staging, donc publiés avec la bascule.
+    """
+    static_dir = _anchored(static_dir)
+    strategy = staged_strategy(static_dir, strategy)
+    manifest_path = manifest_path_for(static_dir)
+    manifest = load_manifest(manifest_path)
+    changed = _transform_changed(manifest, transform)  # toujours : la clé doit être mémorisée, même en install
+    full = full or changed
+    files = scan_tree(dist_browser, ignore_names or {"index.html"})
+    to_copy, unchanged, entries = plan_sync(dist_browser, static_dir, manifest, files, full=full)
+
+    if strategy == "symlink":
+        _side(static_dir, "releases").mkdir(parents=True, exist_ok=True)
+        staging = _side(static_dir, "releases") / nowstamp()
+        n = 1
+        while staging.exists():  # deux déploiements dans la même seconde
+            staging = staging.with_name(f"{nowstamp()}_{n}"); n += 1
+    else:
+        staging = _side(static_dir, "staging")
+    _remove(staging)
+
+    # ancien contenu conservé (sémantique de fusion) sans recopie : hardlinks
+    skip = set(to_copy)
+    link_rels = [r for r in scan_tree(static_dir) if r not in skip]
+    try:
+        ensure_dirs(staging, link_rels)
+        for rel in link_rels:
+            _link_or_copy(static_dir / rel, staging / rel)
+        if dedupe:
+            copied_bytes = copy_deduped(dist_browser, staging, to_copy, files, workers=workers,
+                                        progress=progress, cancel=cancel, transform=transform)
+        else:
+            copied_bytes = copy_files(dist_browser, staging, to_copy, workers=workers,
+                                      progress=_totals_progress(progress, files, to_copy), cancel=cancel,
+                                      transform=transform)
+        listed = write_static_manifest(staging) if static_manifest else None
+        compressed = precompress_tree(staging, [*files, *(listed["generated"] if listed else ())],
+                                      precompress_state_path(static_dir), cancel=cancel) if precompress else None
+    except OperationCancelled:
+        _remove(staging)
+        raise
+    manifest["files"] = {**manifest.get("files", {}), **entries}
+    record_generation(manifest, files)
+    staging_manifest = _side(manifest_path, "staging")
+    save_manifest(staging_manifest, manifest)
+    staged_pages = {}
+    for dest_index, out_html in pages.items():
+        staged_pages[dest_index] = _side(dest_index, "staging")
+        write_text(staged_pages[dest_index], out_html)
+
+    # bascule static/ (+ manifest associé)
+    prev_manifest = _side(manifest_path, "previous")
+    if strategy == "symlink":
+        prev_link = _side(static_dir, "previous")
+        if static_dir.is_symlink():
+            current = _link_target(static_dir)
+            _flip_symlink(static_dir, staging)
+        elif static_dir.exists():
+            # conversion unique : le lien prend la place de l'arbre réel, qui devient la release "initial"
+            current = _side(static_dir, "releases") / "initial"
+            _remove(current)
+            _remove(prev_link)  # .static.previous réel laissé par le mode 'rename'
+            tmp = _side(static_dir, "link.tmp")
+            _remove(tmp)
+            os.symlink(staging, tmp, target_is_directory=True)
+            if _exchange(tmp, static_dir):
+                os.replace(tmp, current)
+            else:  # sans échange atomique : seul instant sans static/, une fois pour toutes
+                os.replace(static_dir, current)
+                os.replace(tmp, static_dir)
+        else:
+            current = None
+            _flip_symlink(static_dir, staging)
+        if current:
+            _flip_symlink(prev_link, current)
+        keep = {staging.name, current.name if current else None}
+        for old in _side(static_dir, "releases").iterdir():
+            if old.name not in keep:
+                shutil.rmtree(old, ignore_errors=True)
+    else:
+        prev = _side(static_dir, "previous")
+        _remove(prev)
+        if static_dir.exists() and _exchange(staging, static_dir):
+            os.replace(staging, prev)  # staging désigne maintenant l'ancien arbre
+        else:
+            if static_dir.exists():
+                os.replace(static_dir, prev)
+            os.replace(staging, static_dir)
+    if manifest_path.exists():
+        os.replace(manifest_path, prev_manifest)
+    os.replace(staging_manifest, manifest_path)
+
+    # bascule des index.html : la version courante est gardée en .previous
+    for dest_index, staging_index in staged_pages.items():
+        if dest_index.exists():
+            prev_index = _side(dest_index, "previous")
+            if prev_index.exists():
+                prev_index.unlink()
+            _link_or_copy(dest_index, prev_index)
+        os.replace(staging_index, dest_index)
+    return {"copied": len(to_copy), "skipped": len(unchanged), "bytes": copied_bytes, "strategy": strategy,
+            "precompress": compressed, "manifest": listed}
+
+def rollback_deploy(templates_dir: Path, static_dir: Path) -> str:
+    """
+    Revient à la génération précédente d'un déploiement atomique (et inversement
+    si on relance : la génération courante devient la précédente).
+    index.html d'abord : le static/ courant contient aussi les chunks de l'ancienne génération.
+    """
+    static_dir, templates_dir = _anchored(static_dir), Path(templates_dir)
+    indexes = [templates_dir / "index.html", *templates_dir.glob("*/index.html")]  # + locales
+    swaps = [(i, _side(i, "previous")) for i in indexes if _side(i, "previous").exists()]
+    strategy = "symlink" if static_dir.is_symlink() else "rename"
+    prev_static = _side(static_dir, "previous")
+    if not swaps or not (prev_static.exists() or prev_static.is_symlink()):
+        raise RuntimeError("Aucune génération précédente (déploiement atomique requis).")
+    for dest_index, prev_index in swaps:
+        _swap(dest_index, prev_index)
+    if strategy == "symlink":
+        current, previous = _link_target(static_dir), _link_target(prev_static)
+        _flip_symlink(static_dir, previous)
+        _flip_symlink(prev_static, current)
+    else:
+        _swap(static_dir, prev_static)
+    manifest_path = manifest_path_for(static_dir)
+    prev_manifest = _side(manifest_path, "previous")
+    if manifest_path.exists() and prev_manifest.exists():
+        _swap(manifest_path, prev_manifest)
+    return strategy
+
+def deploy_front(dist_browser: Path, templates_dir: Path, static_dir: Path, log_fn, backup_fn=None, mode="install",
+                 gc_keep=None, staged=False, progress=None, cancel=None, precompress=False,
+                 static_manifest=False, static_url=None, modulepreload=False):
+    """
+    mode="install" : copie complète des assets (le manifest est réécrit).
+    mode="update"  : ne copie que les fichiers nouveaux/modifiés d'après le manifest.
+    gc_keep        : si renseigné, GC des bundles absents des gc_keep dernières générations.
+    staged=True    : construit à côté puis bascule atomiquement (voir staged_deploy).
+    precompress    : frères .gz/.br des assets texte (voir precompress_tree).
+    static_manifest: staticfiles.json depuis les noms hashés (voir write_static_manifest).
+    static_url     : STATIC_URL ; les chunks JS chargés au runtime sont résolus dessous (voir ChunkUrlRewriter).
+    modulepreload  : <link rel="modulepreload"> du graphe initial + index.preload.json (en-têtes Link).
+    progress(fichiers, total fichiers, octets, total octets) / cancel (threading.Event) :
+    utilisables depuis un thread de travail.
+    Build localisé (browser/<locale>/index.html) : un index par locale dans templates/<locale>/,
+    assets identiques entre locales copiés une seule fois (hardlinks).
+    """
+    locales = detect_locales(dist_browser)
+    preloads = {} if modulepreload else None
+    pages = render_indexes(dist_browser, templates_dir, locales, preloads=preloads)
+    ignore = index_names(locales)
+    transform = None
+    if static_url:
+        transform = ChunkUrlRewriter(static_url, scan_tree(dist_browser, ignore), locales)
+    if locales:
+        log_fn(f"Build localisé : {', '.join(locales)}")
     templates_dir.mkdir(parents=True, exist_ok=True)
-    dest_index = templates_dir / "index.html"
-    if dest_index.exists():
-        if backup_fn:
+    backup_fn = backup_fn or functools.partial(backup_file, session=nowstamp())  # une session par déploiement
+    for dest_index in pages:
+        if dest_index.exists():
             bak = backup_fn(dest_index)
             log_fn(f"Backup: {short(bak)}")
+    if staged:
+        stats = staged_deploy(dist_browser, pages, static_dir, full=(mode != "update"),
+                              progress=progress, cancel=cancel, precompress=precompress,
+                              static_manifest=static_manifest, ignore_names=ignore, dedupe=bool(locales),
+                              transform=transform)
+        log_fn(f"Bascule atomique ({stats['strategy']}) : {short(static_dir)} + "
+               f"{', '.join(short(p) for p in pages)}")
+    else:
+        static_dir.mkdir(parents=True, exist_ok=True)
+        stats = sync_tree(dist_browser, static_dir, ignore_names=ignore, full=(mode != "update"),
+                          progress=progress, cancel=cancel, dedupe=bool(locales), transform=transform)
+        stats["manifest"] = write_static_manifest(static_dir) if static_manifest else None
+        # index en dernier : jamais servi tant que les bundles qu'il référence ne sont pas tous copiés
+        if cancel is not None and cancel.is_set():
+            raise OperationCancelled()
+        for dest_index, out_html in pages.items():
+            write_text(dest_index, out_html)
+            log_fn(f"index.html transformé → {short(dest_index)}")
+        if precompress:
+            rels = [*scan_tree(dist_browser, ignore), *(stats["manifest"] or {}).get("generated", ())]
+            stats["precompress"] = precompress_tree(static_dir, rels, precompress_state_path(static_dir),
+                                                    cancel=cancel)
+    log_fn(f"Assets → {short(static_dir)} : {stats['copied']} copiés, {stats['skipped']} inchangés, "
+           f"{human_bytes(stats['bytes'])} écrits")
+    for dest_index, modules in (preloads or {}).items():
+        target = write_preload_list(dest_index, modules)
+        log_fn(f"modulepreload : {len(modules)} modules initiaux → {short(target)}")
+    if stats.get("manifest"):
+        log_static_manifest(log_fn, static_dir / STATIC_MANIFEST_NAME, stats["manifest"])
+    if stats.get("precompress"):
+        log_precompress(log_fn, stats["precompress"])
+    if gc_keep:
+        gc = gc_static(static_dir, keep=gc_keep, dry_run=False)
+        log_fn(f"GC : {gc['deleted']} fichiers obsolètes supprimés, {human_bytes(gc['bytes'])} libérés")
+    return stats
+
+# ---------- Plan de déploiement (pré-passe stat seule) ----------
+PLAN_STATUSES = ("new", "changed", "unchanged", "orphaned")
+PLAN_LABELS = {"new": "nouveau", "changed": "modifié", "unchanged": "inchangé", "orphaned": "orphelin"}
+
+def plan_deploy(dist_browser: Path, static_dir: Path, mode="update", static_url=None) -> dict:
+    """
+    Ce que ferait deploy_front, sans lire ni écrire un seul asset : deux scans os.scandir + le manifest.
+    - new       : absent de static/
+    - changed   : présent, mais taille/mtime différents du manifest (borne haute : le déploiement
+                  peut encore en sauter un dont le hash n'a pas changé)
+    - unchanged : stat identique au manifest
+    - orphaned  : dans static/ mais plus dans le build (hors staticfiles.json, ses copies hashées et les .gz/.br)
+    mode="install" ou réécriture des chunks modifiée : tout le build est recopié (full).
+    Retourne {"entries": {rel: (statut, taille)}, "totals": {statut: [fichiers, octets]},
+              "copy": [fichiers, octets], "full"}.
+    """
+    dist, static_dir = Path(dist_browser), Path(static_dir)
+    files = scan_tree(dist, index_names(detect_locales(dist)))
+    present = scan_tree(static_dir)
+    manifest = load_manifest(manifest_path_for(static_dir))
+    key = ChunkUrlRewriter(static_url).key if static_url else ""
+    full = mode != "update" or manifest.get("transform", "") != key
+    known = manifest.get("files", {})
+    try:
+        paths = json.loads(read_text(static_dir / STATIC_MANIFEST_NAME) or "{}").get("paths", {})
+    except ValueError:
+        paths = {}
+    generated = {v for k, v in paths.items() if k != v}
+    entries = {}
+    for rel, st in files.items():
+        old = known.get(rel)
+        if rel not in present:
+            status = "new"
+        elif old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+            status = "unchanged"
         else:
-            bak = backup_file(dest_index)
-            log_fn(f"Backup: {short(bak)}")
-    write_text(dest_index, out_html)
-    log_fn(f"index.html transformé → {short(dest_index)}")
-    static_dir.mkdir(parents=True, exist_ok=True)
-    copytree_merge(dist_browser, static_dir, ignore_names={"index.html"})
-    log_fn(f"Assets copiés vers {short(static_dir)}")
-
-# ---------- Widgets helper ----------
-class ScrollText(tk.Frame):
-    """Text + scrollbar verticale, simple."""
-    def __init__(self, master, **kwargs):
-        super().__init__(master)
-        self.text = tk.Text(self, **kwargs)
-        sb = ttk.Scrollbar(self, orient="vertical", command=self.text.yview)
-        self.text.configure(yscrollcommand=sb.set)
-        self.text.pack(side="left", fill="both", expand=True)
-        sb.pack(side="right", fill="y")
-
-    def insert(self, *a, **k): self.text.insert(*a, **k)
-    def delete(self, *a, **k): self.text.delete(*a, **k)
-    def see(self, *a, **k): self.text.see(*a, **k)
-    def get(self, *a, **k): return self.text.get(*a, **k)
-    def widget(self): return self.text
-
-class CollapsibleSection(ttk.Frame):
-    """Section repliable : header avec bouton, body scrollable optionnel."""
-    def __init__(self, master, title="Section", initially_open=True):
-        super().__init__(master)
-        self._open = initially_open
-        self.header = ttk.Frame(self)
-        self.header.pack(fill="x")
-        self.btn = ttk.Button(self.header, text=f"{title} ⯆" if self._open else f"{title} ⯈", command=self.toggle)
-        self.btn.pack(side="left", padx=(0,6))
-        self.body = ttk.Frame(self)
-        if self._open:
-            self.body.pack(fill="x")
-
-    def toggle(self):
-        self._open = not self._open
-        self.btn.configure(text=self.btn.cget("text").replace("⯆","⯈") if not self._open else self.btn.cget("text").replace("⯈","⯆"))
-        if self._open:
-            self.body.pack(fill="x")
-        else:
-            self.body.forget()
+            status = "changed"
+        entries[rel] = (status, st.st_size)
+    for rel, st in present.items():
+        base, ext = os.path.splitext(rel)
+        if rel in files or rel in generated or rel == STATIC_MANIFEST_NAME:
+            continue
+        if ext in PRECOMPRESS_SUFFIXES and (base in files or base in generated):
+            continue
+        entries[rel] = ("orphaned", st.st_size)
+    totals = {s: [0, 0] for s in PLAN_STATUSES}
+    for status, size in entries.values():
+        totals[status][0] += 1
+        totals[status][1] += size
+    copied = PLAN_STATUSES[:3] if full else PLAN_STATUSES[:2]
+    copy = [sum(totals[s][0] for s in copied), sum(totals[s][1] for s in copied)]
+    return {"entries": entries, "totals": totals, "copy": copy, "full": full}
+
+def plan_summary(plan: dict) -> str:
+    names = {"new": "nouveaux", "changed": "modifiés", "unchanged": "inchangés", "orphaned": "orphelins"}
+    parts = [f"{names[s]} : {n} ({human_bytes(b)})" for s, (n, b) in plan["totals"].items()]
+    return (" · ".join(parts) + f" — à copier : {plan['copy'][0]} fichiers, {human_bytes(plan['copy'][1])}"
+            + (" (copie complète)" if plan["full"] else ""))
+
+# ---------- Mode watch (ng build --watch) ----------
+WATCH_POLL = 0.2        # s entre deux instantanés stat de dist/browser
+WATCH_DEBOUNCE = 0.3    # s sans changement avant d'appliquer (Angular a fini d'écrire)
+
+def stat_snapshot(root: Path) -> dict:
+    """{chemin relatif: (taille, mtime_ns)} — instantané bon marché (os.scandir, aucune lecture)."""
+    return {rel: (st.st_size, st.st_mtime_ns) for rel, st in scan_tree(root).items()}
+
+def _index_rels(snapshot: dict) -> set:
+    """index.html d'un instantané : racine + browser/<locale>/index.html (cf. detect_locales)."""
+    return {rel for rel in snapshot if rel == "index.html" or (
+        rel.count("/") == 1 and rel.endswith("/index.html") and LOCALE_DIR_RE.match(rel.split("/")[0]))}
+
+def apply_dist_delta(dist_browser: Path, templates_dir: Path, static_dir: Path, before: dict, after: dict,
+                     static_url=None, modulepreload=False) -> dict:
+    """
+    Applique le delta entre deux instantanés de dist/browser : assets nouveaux/modifiés copiés,
+    assets supprimés retirés de static/ (avec leurs .gz/.br, devenus périmés), manifest mis à jour ;
+    index re-rendus seulement si un index.html a changé, et réécrits seulement si le HTML diffère.
+    Retourne {"copied", "deleted", "bytes", "indexes", "written"}.
+    """
+    dist, templates_dir, static_dir = Path(dist_browser), Path(templates_dir), Path(static_dir)
+    locales = detect_locales(dist)
+    names = _index_rels(after)
+    old_names = _index_rels(before)
+    changed = sorted(rel for rel, sig in after.items() if rel not in names and before.get(rel) != sig)
+    deleted = sorted(rel for rel in before if rel not in after and rel not in old_names)
+    transform = None
+    if static_url:
+        transform = ChunkUrlRewriter(static_url, (r for r in after if r not in names), locales)
+    gone = set(deleted)
+    for rel in changed + deleted:
+        stale = [static_dir / (rel + s) for s in PRECOMPRESS_SUFFIXES] + ([static_dir / rel] if rel in gone else [])
+        for target in stale:
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
+        if rel in gone:
+            _prune_empty_dirs((static_dir / rel).parent, static_dir)
+    nbytes = copy_files(dist, static_dir, changed, transform=transform)
+    if changed or deleted:
+        manifest_path = manifest_path_for(static_dir)
+        manifest = load_manifest(manifest_path)
+        files = manifest.setdefault("files", {})
+        files.update({rel: {"size": after[rel][0], "mtime": after[rel][1], "hash": None} for rel in changed})
+        for rel in deleted:
+            files.pop(rel, None)
+        _transform_changed(manifest, transform)
+        record_generation(manifest, (r for r in after if r not in names))
+        save_manifest(manifest_path, manifest)
+    report = {"copied": len(changed), "deleted": len(deleted), "bytes": nbytes, "indexes": 0, "written": []}
+    if any(before.get(n) != after.get(n) for n in names | old_names):
+        preloads = {} if modulepreload else None
+        pages = render_indexes(dist, templates_dir, locales, preloads=preloads)
+        report["indexes"] = len(pages)
+        for dest, html in pages.items():
+            if read_text(dest) != html:
+                write_text(dest, html)
+                report["written"].append(dest)
+        for dest, modules in (preloads or {}).items():
+            if dest in report["written"]:
+                write_preload_list(dest, modules)
+    return report
+
+def watch_dist(dist_browser: Path, templates_dir: Path, static_dir: Path, log_fn, cancel, backup_fn=None,
+               static_url=None, modulepreload=False, poll=WATCH_POLL, debounce=WATCH_DEBOUNCE):
+    """
+    Miroir continu de dist/browser pendant `ng build --watch`, jusqu'à cancel.set() : un déploiement
+    incrémental initial, puis un instantané stat toutes les `poll` s ; quand l'arbre est resté stable
+    `debounce` s, seul le delta est appliqué (apply_dist_delta). Chaque cycle journalise sa durée et
+    sa latence (dernière écriture d'Angular -> visible côté Django).
+    """
+    dist = Path(dist_browser)
+    deploy_front(dist, templates_dir, static_dir, log_fn, backup_fn=backup_fn, mode="update",
+                 static_url=static_url, modulepreload=modulepreload)
+    applied = last = stat_snapshot(dist)
+    changed_at = None
+    log_fn(f"Watch : {short(dist)} surveillé toutes les {poll:g} s (arrêt : Annuler / Ctrl+C).")
+    cycles = 0
+    while not cancel.wait(poll):
+        try:
+            snap = stat_snapshot(dist)
+        except OSError:  # dossier réécrit pendant le parcours
+            changed_at = time.monotonic()
+            continue
+        if snap != last:
+            last, changed_at = snap, time.monotonic()
+            continue
+        if changed_at is None or time.monotonic() - changed_at < debounce:
+            continue
+        changed_at = None
+        if snap == applied:
+            continue
+        if not has_index(dist):
+            log_fn("Watch : index.html absent (build en cours ou en échec ?), cycle ignoré.")
+            continue
+        t0 = time.perf_counter()
+        try:
+            report = apply_dist_delta(dist, templates_dir, static_dir, applied, snap,
+                                      static_url=static_url, modulepreload=modulepreload)
+        except OSError as e:  # Angular a repris l'écriture : on retentera au prochain calme
+            log_fn(f"Watch : cycle interrompu ({e}), nouvel essai.")
+            last, changed_at = {}, time.monotonic()
+            continue
+        newest = max((st[1] for rel, st in snap.items() if applied.get(rel) != st), default=time.time_ns())
+        applied = snap
+        cycles += 1
+        index = f", {len(report['written'])} index réécrit(s)" if report["written"] else ""
+        log_fn(f"Watch #{cycles} : {report['copied']} copiés, {report['deleted']} supprimés{index}, "
+               f"{human_bytes(report['bytes'])} — {(time.perf_counter() - t0) * 1000:.0f} ms, "
+               f"latence {max(0.0, time.time() - newest / 1e9):.2f} s")
+    log_fn(f"Watch arrêté ({cycles} cycles).")
+    return cycles
+
+# ---------- Lecture statique de settings.py (ast) ----------
+class SettingsReader:
+    """
+    Évalue sans l'importer (ni Django) les affectations simples de settings.py :
+    chaînes, listes/tuples/dicts, Path(__file__).resolve().parent, `/`, os.path.join,
+    os.path.dirname/abspath, str(), et les noms déjà évalués (BASE_DIR...).
+    Ce qui n'est pas évaluable est ignoré.
+    """
+    def __init__(self, settings_py: Path, text: str | None = None, tree: ast.Module | None = None):
+        self.path = Path(settings_py).resolve()
+        self.values = {}
+        tree = tree or ast.parse(text if text is not None else read_text(self.path))
+        for node in tree.body:
+            if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                try:
+                    value = self._eval(node.value)
+                except Exception:
+                    continue
+                for t in targets:
+                    if isinstance(t, ast.Name):
+                        self.values[t.id] = value
+                    elif (isinstance(t, ast.Subscript) and isinstance(t.value, ast.Name)
+                          and isinstance(self.values.get(t.value.id), dict)):
+                        try:  # STORAGES["staticfiles"] = {...}
+                            self.values[t.value.id][self._eval(t.slice)] = value
+                        except Exception:
+                            pass
+
+    def get(self, name, default=None):
+        return self.values.get(name, default)
+
+    def _eval(self, n):
+        if isinstance(n, ast.Constant):
+            return n.value
+        if isinstance(n, (ast.List, ast.Tuple)):
+            items = [self._eval(e) for e in n.elts]
+            return items if isinstance(n, ast.List) else tuple(items)
+        if isinstance(n, ast.Dict):
+            return {self._eval(k): self._eval(v) for k, v in zip(n.keys, n.values)}
+        if isinstance(n, ast.Name):
+            if n.id == "__file__":
+                return str(self.path)
+            return self.values[n.id]
+        if isinstance(n, ast.BinOp) and isinstance(n.op, ast.Div):
+            return Path(self._eval(n.left)) / self._eval(n.right)
+        if isinstance(n, ast.BinOp) and isinstance(n.op, ast.Add):
+            return self._eval(n.left) + self._eval(n.right)
+        if isinstance(n, ast.Attribute) and n.attr == "parent":
+            return Path(self._eval(n.value)).parent
+        if isinstance(n, ast.Call):
+            func = ast.unparse(n.func)
+            args = [self._eval(a) for a in n.args]
+            if func in ("Path", "pathlib.Path"):
+                return Path(*args)
+            if func in ("str", "os.fspath"):
+                return str(args[0])
+            if func == "os.path.join":
+                return os.path.join(*map(str, args))
+            if func == "os.path.dirname":
+                return os.path.dirname(str(args[0]))
+            if func in ("os.path.abspath", "os.path.realpath"):
+                return os.path.abspath(str(args[0]))
+            if isinstance(n.func, ast.Attribute) and n.func.attr in ("resolve", "absolute") and not args:
+                return Path(self._eval(n.func.value)).resolve()
+            if isinstance(n.func, ast.Attribute) and n.func.attr == "joinpath":
+                return Path(self._eval(n.func.value)).joinpath(*args)
+        raise ValueError(ast.dump(n))
+
+    def static_root(self) -> Path | None:
+        root = self.get("STATIC_ROOT")
+        return Path(root) if root else None
+
+    def staticfiles_dirs(self) -> list:
+        """[(préfixe, Path)] — STATICFILES_DIRS accepte des chemins ou des tuples (préfixe, chemin)."""
+        out = []
+        for entry in self.get("STATICFILES_DIRS", []) or []:
+            if isinstance(entry, (tuple, list)) and len(entry) == 2:
+                out.append((str(entry[0]), Path(entry[1])))
+            else:
+                out.append(("", Path(entry)))
+        return out
 
-    def open(self):
-        if not self._open:
-            self.toggle()
+    def staticfiles_storage(self) -> str:
+        storages = self.get("STORAGES") or {}
+        backend = (storages.get("staticfiles") or {}).get("BACKEND") if isinstance(storages, dict) else None
+        return backend or self.get("STATICFILES_STORAGE") or ""
 
-    def close(self):
-        if self._open:
-            self.toggle()
+# ---------- collectstatic natif ----------
+def native_collectstatic(settings_py: Path, static_dir: Path, log_fn, workers=COPY_WORKERS,
+                         progress=None, cancel=None) -> dict:
+    """
+    Collecte incrémentale de static/ (assets Angular) vers STATIC_ROOT sans lancer Django :
+    seuls les fichiers dont le contenu diffère du manifest de STATIC_ROOT sont copiés,
+    en parallèle. Les statics des apps Django restent l'affaire de `manage.py collectstatic`.
+    """
+    conf = settings_reader(settings_py)
+    static_root = conf.static_root()
+    if not static_root:
+        raise RuntimeError("STATIC_ROOT introuvable ou non évaluable dans settings.py.")
+    static_dir = Path(static_dir).resolve()
+    prefixes = [prefix for prefix, d in conf.staticfiles_dirs() if d.resolve() == static_dir]
+    if not prefixes:
+        log_fn(f"Attention : {short(static_dir)} n'est pas dans STATICFILES_DIRS (collecté sans préfixe).")
+    prebuilt = (static_dir / STATIC_MANIFEST_NAME).exists()
+    if "Manifest" in conf.staticfiles_storage() and not prebuilt:
+        log_fn(f"Attention : {conf.staticfiles_storage()} attend staticfiles.json ; "
+               f"déployez avec le manifest pré-calculé ou lancez manage.py collectstatic.")
+    dst = static_root / (prefixes[0] if prefixes else "")
+    stats = sync_tree(static_dir, dst, workers=workers, progress=progress, cancel=cancel)
+    log_fn(f"Collecte native → {short(dst)} : {stats['copied']} copiés, {stats['skipped']} inchangés, "
+           f"{human_bytes(stats['bytes'])} écrits")
+    if prebuilt and dst != static_root:
+        # Django lit STATIC_ROOT/staticfiles.json : le réécrire à la racine avec le préfixe
+        out = static_root / STATIC_MANIFEST_NAME
+        log_static_manifest(log_fn, out, write_static_manifest(dst, prefix=prefixes[0], out_path=out))
+    return stats
+
+# ---------- Sous-processus ----------
+def run_streaming(cmd, cwd, line_fn, cancel=None) -> int:
+    """
+    Lance cmd et transmet stdout/stderr ligne par ligne à line_fn.
+    cancel (threading.Event) : termine le processus puis lève OperationCancelled.
+    """
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, errors="replace", bufsize=1, env=env)
+
+    def watch():
+        while proc.poll() is None:
+            if cancel.wait(0.1):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                return
 
-# ---------- UI principale ----------
-class Wizard(tk.Tk):
+    if cancel is not None:
+        threading.Thread(target=watch, daemon=True).start()
+    for line in proc.stdout:
+        line_fn(line.rstrip("\n"))
+    code = proc.wait()
+    if cancel is not None and cancel.is_set():
+        raise OperationCancelled()
+    return code
+
+VENV_DIRS = (".venv", "venv", "env")
+
+def project_python(manage: Path) -> str:
+    """Interpréteur du projet : venv voisin de manage.py (ou du dossier parent), sinon le nôtre."""
+    manage = Path(manage)
+    for base in (manage.parent, manage.parent.parent):
+        for venv in VENV_DIRS:
+            for exe in (base / venv / "bin" / "python", base / venv / "Scripts" / "python.exe"):
+                if exe.exists():
+                    return str(exe)
+    return sys.executable
+
+def manage_cmd(manage: Path, *argv) -> list:
+    return [project_python(manage), str(manage), *argv]
+
+def collectstatic_cmd(manage: Path) -> list:
+    return manage_cmd(manage, "collectstatic", "--noinput")
+
+# ---------- Worker Django persistant ----------
+WORKER_SOURCE = r"""
+import io, json, os, sys, traceback
+sys.path.insert(0, os.getcwd())
+_out = sys.stdout
+
+def _send(**msg):
+    _out.write(json.dumps(msg) + "\n"); _out.flush()
+
+class _Lines(io.TextIOBase):
     def __init__(self):
-        super().__init__()
-        self.title("Angular → Django Wizard")
-        self.geometry("1120x760")
-
-        # Mode
-        self.mode = tk.StringVar(value="install")
-
-        # State (paths)
-        self.project_root = tk.StringVar()
-        self.manage_py    = tk.StringVar()
-        self.dist_folder  = tk.StringVar()
-        self.templates_dir= tk.StringVar()
-        self.static_dir   = tk.StringVar()
-
-        # Refs UI
-        self.logs = None
-        self.settings_diff = None
-        self.urls_diff = None
-        self.collect_out = None
-        self.paths_section = None
-        self.status_var = tk.StringVar(value="Prêt.")
-
-        # Backups session
-        self.run_stamp = nowstamp()
-        self.backup_dir = None  # set après confirmation des chemins
-
-        self._build_menu()
-        self._build_layout()
-
-        # Charger profil local (si dispo) et décider visibilité chemins
-        self._load_state(DEFAULT_PROFILE, quiet=True)
-        self._auto_paths_visibility()
-
-    # ----- Menu -----
-    def _build_menu(self):
-        menubar = tk.Menu(self); self.config(menu=menubar)
-        m_file = tk.Menu(menubar, tearoff=0)
-        m_file.add_command(label="Quitter", command=self.destroy)
-        menubar.add_cascade(label="Fichier", menu=m_file)
-
-        m_cfg = tk.Menu(menubar, tearoff=0)
-        m_cfg.add_command(label="Charger depuis JSON…", command=self.menu_load_json)
-        m_cfg.add_command(label="Sauver vers JSON…", command=self.menu_save_json)
-        m_cfg.add_separator()
-        m_cfg.add_command(label="Basculer Chemins (afficher/masquer)", command=self.toggle_paths)
-        menubar.add_cascade(label="Config", menu=m_cfg)
-
-        m_help = tk.Menu(menubar, tearoff=0)
-        m_help.add_command(label="À propos", command=lambda: messagebox.showinfo(
-            "À propos",
-            "Angular → Django Wizard\nUI compacte, chemins auto-hide, JSON config.\nStdlib only."
-        ))
-        menubar.add_cascade(label="Aide", menu=m_help)
-
-    # ----- Layout -----
-    def _build_layout(self):
-        root = ttk.Frame(self, padding=10)
-        root.pack(fill="both", expand=True)
-
-        # topbar
-        bar = ttk.Frame(root)
-        bar.pack(fill="x")
-        ttk.Label(bar, text="Mode :", font=("Segoe UI", 10, "bold")).pack(side="left")
-        ttk.Radiobutton(bar, text="Installation", variable=self.mode, value="install").pack(side="left", padx=8)
-        ttk.Radiobutton(bar, text="Mise à jour", variable=self.mode, value="update").pack(side="left", padx=8)
-        ttk.Button(bar, text="Chemins ⯈/⯆", command=self.toggle_paths).pack(side="right")
-
-        # Chemins (collapsible)
-        self.paths_section = CollapsibleSection(root, title="Chemins", initially_open=True)
-        self.paths_section.pack(fill="x", pady=(8,0))
-        self._build_paths_body(self.paths_section.body)
-
-        # Notebook
-        nb = ttk.Notebook(root)
-        nb.pack(fill="both", expand=True, pady=(8,0))
-
-        # settings
-        p1 = ttk.Frame(nb, padding=8)
-        nb.add(p1, text="1) settings.py")
-        self._build_settings_page(p1)
-
-        # urls
-        p2 = ttk.Frame(nb, padding=8)
-        nb.add(p2, text="2) urls.py")
-        self._build_urls_page(p2)
-
-        # deploy
-        p3 = ttk.Frame(nb, padding=8)
-        nb.add(p3, text="3) Déploiement Angular")
-        self._build_deploy_page(p3)
-
-        # collectstatic
-        p4 = ttk.Frame(nb, padding=8)
-        nb.add(p4, text="4) collectstatic (optionnel)")
-        self._build_collectstatic_page(p4)
-
-        # logs
-        p5 = ttk.Frame(nb, padding=8)
-        nb.add(p5, text="Logs")
-        self._build_logs_page(p5)
-
-        # status bar
-        status = ttk.Frame(root)
-        status.pack(fill="x", pady=(6,0))
-        ttk.Label(status, textvariable=self.status_var, anchor="w").pack(fill="x")
-
-    def _build_paths_body(self, parent):
-        def row(lbl, var, pick_cmd, hint=None):
-            fr = ttk.Frame(parent); fr.pack(fill="x", pady=4)
-            ttk.Label(fr, text=lbl).pack(anchor="w")
-            ed = ttk.Entry(fr, textvariable=var)
-            ed.pack(side="left", fill="x", expand=True, padx=(0,8))
-            ttk.Button(fr, text="Parcourir…", command=pick_cmd).pack(side="left")
-            if hint:
-                ttk.Label(parent, text=hint).pack(anchor="w", padx=(4,0))
-
-        row("Projet Django (sélectionne un fichier DANS le dossier) :", self.project_root, self.pick_project_root)
-        row("manage.py :", self.manage_py, self.pick_manage)
-        row("dist Angular (sélectionne un fichier DANS dist/<app>/browser) :", self.dist_folder, self.pick_dist,
-            hint="Astuce: choisis index.html pour être sûr d’être au bon endroit.")
-        row("templates/ :", self.templates_dir, lambda: self.pick_dir_into_var(self.templates_dir))
-        row("static/ :", self.static_dir, lambda: self.pick_dir_into_var(self.static_dir))
-
-        act = ttk.Frame(parent); act.pack(fill="x", pady=(6,0))
-        ttk.Button(act, text="Charger JSON…", command=self.menu_load_json).pack(side="left")
-        ttk.Button(act, text="Sauver JSON…", command=self.menu_save_json).pack(side="left", padx=6)
-        ttk.Button(act, text="Confirmer les chemins", command=self.confirm_paths).pack(side="right")
-
-    # ----- Pages -----
-    def _build_settings_page(self, parent):
-        ttk.Label(parent, text="Prévisualiser et appliquer les modifications idempotentes à settings.py").pack(anchor="w")
-        controls = ttk.Frame(parent); controls.pack(fill="x", pady=6)
-        ttk.Button(controls, text="Prévisualiser diff", command=self.preview_settings_diff).pack(side="left")
-        ttk.Button(controls, text="Appliquer", command=self.apply_settings).pack(side="left", padx=6)
-        st = ScrollText(parent, height=22, wrap="none"); st.pack(fill="both", expand=True)
-        self.settings_diff = st
-
-    def _build_urls_page(self, parent):
-        ttk.Label(parent, text="Prévisualiser et appliquer les modifications idempotentes à urls.py").pack(anchor="w")
-        controls = ttk.Frame(parent); controls.pack(fill="x", pady=6)
-        ttk.Button(controls, text="Prévisualiser diff", command=self.preview_urls_diff).pack(side="left")
-        ttk.Button(controls, text="Appliquer", command=self.apply_urls).pack(side="left", padx=6)
-        st = ScrollText(parent, height=22, wrap="none"); st.pack(fill="both", expand=True)
-        self.urls_diff = st
-
-    def _build_deploy_page(self, parent):
-        ttk.Label(parent, text="Transformer index.html et copier les assets vers static/").pack(anchor="w")
-        ttk.Button(parent, text="Exécuter le déploiement", command=self.do_deploy).pack(anchor="w", pady=6)
-        ttk.Label(parent, text="Assure-toi d’avoir buildé Angular (ng build --configuration production).").pack(anchor="w")
-
-    def _build_collectstatic_page(self, parent):
-        ttk.Label(parent, text="Lancer python manage.py collectstatic --noinput").pack(anchor="w")
-        ttk.Button(parent, text="Lancer collectstatic", command=self.do_collectstatic).pack(anchor="w", pady=6)
-        st = ScrollText(parent, height=22, wrap="word"); st.pack(fill="both", expand=True)
-        self.collect_out = st
-
-    def _build_logs_page(self, parent):
-        ttk.Label(parent, text="Journal d’exécution").pack(anchor="w")
-        st = ScrollText(parent, height=24, wrap="word"); st.pack(fill="both", expand=True)
-        self.logs = st
-
-    # ----- Status & logs -----
-    def set_status(self, msg: str):
-        self.status_var.set(msg)
-        self.update_idletasks()
-
-    def log(self, msg: str):
-        if self.logs:
-            self.logs.insert("end", msg + "\n")
-            self.logs.see("end")
-        self.set_status(msg)
-
-    # ----- Backups centralisés -----
-    def backup(self, file_path: Path) -> Path | None:
-        """
-        Sauvegarde file_path dans le dossier centralisé de la session:
-        <parent>/<projectname>_backups/<timestamp>/<relative_to_project_root>.bak
-        """
-        try:
-            if not file_path or not file_path.exists():
-                return None
-            if not self.backup_dir:
-                proj_root = Path(self.project_root.get() or "").resolve()
-                backup_root = proj_root.parent / f"{proj_root.name}_backups"
-                self.backup_dir = (backup_root / self.run_stamp)
-                self.backup_dir.mkdir(parents=True, exist_ok=True)
-
-            proj_root = Path(self.project_root.get()).resolve()
+        self.buf = ""
+    def write(self, s):
+        self.buf += s
+        while "\n" in self.buf:
+            line, self.buf = self.buf.split("\n", 1)
+            _send(out=line)
+        return len(s)
+    def flush(self):
+        if self.buf:
+            _send(out=self.buf); self.buf = ""
+
+try:
+    import django
+    django.setup()
+    from django.core.management import call_command
+except Exception as e:
+    _send(error=f"{type(e).__name__}: {e}"); sys.exit(1)
+_send(ready=True)
+for raw in sys.stdin:
+    argv = json.loads(raw)["argv"]
+    stream, code = _Lines(), 0
+    sys.stdout = sys.stderr = stream
+    try:
+        call_command(*argv, stdout=stream, stderr=stream)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except Exception:
+        traceback.print_exc(file=stream); code = 1
+    finally:
+        stream.flush(); sys.stdout, sys.stderr = _out, sys.__stderr__
+    _send(done=code)
+"""
+
+class WorkerUnavailable(RuntimeError):
+    """Le worker n'a pas pu initialiser Django : repli sur un sous-processus classique."""
+
+def settings_module_from_manage(manage: Path) -> str | None:
+    m = re.search(r"""DJANGO_SETTINGS_MODULE['"]\s*,\s*['"]([\w.]+)['"]""", read_text(Path(manage)))
+    return m.group(1) if m else None
+
+class DjangoWorker:
+    """
+    Processus Python longue durée (interpréteur du projet, cwd = dossier de manage.py)
+    gardant Django initialisé ; exécute les commandes via call_command et renvoie
+    la sortie ligne par ligne (JSON lines sur stdin/stdout). Redémarré automatiquement
+    quand settings.py ou manage.py changent.
+    """
+    def __init__(self, manage: Path, settings_py: Path | None = None):
+        self.manage = Path(manage)
+        self.settings_py = Path(settings_py) if settings_py else None
+        self.proc = None
+        self.signature = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        sig = []
+        for p in (self.manage, self.settings_py):
             try:
-                rel = file_path.resolve().relative_to(proj_root)
-            except Exception:
-                rel = Path(file_path.name)
+                st = p.stat()
+                sig.append((st.st_mtime_ns, st.st_size))
+            except (OSError, AttributeError, TypeError):
+                sig.append(None)
+        return tuple(sig)
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        self.stop()
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        module = settings_module_from_manage(self.manage)
+        if module:
+            env.setdefault("DJANGO_SETTINGS_MODULE", module)
+        self.signature = self._signature()
+        self.proc = subprocess.Popen([project_python(self.manage), "-c", WORKER_SOURCE], cwd=self.manage.parent,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     text=True, errors="replace", bufsize=1, env=env)
+        noise = []
+        for line in self.proc.stdout:
+            msg = self._decode(line)
+            if msg is None:
+                noise.append(line.rstrip())
+            elif msg.get("ready"):
+                return
+            elif "error" in msg:
+                self.stop()
+                raise WorkerUnavailable(msg["error"])
+        self.stop()
+        raise WorkerUnavailable("\n".join(noise[-5:]) or "worker terminé au démarrage")
+
+    def stop(self):
+        if self.alive():
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
 
-            dest = (self.backup_dir / rel).with_suffix(rel.suffix + ".bak")
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(file_path, dest)
-            return dest
-        except Exception:
+    @staticmethod
+    def _decode(line: str):
+        try:
+            msg = json.loads(line)
+            return msg if isinstance(msg, dict) else None
+        except ValueError:
             return None
 
-    # ----- JSON -----
-    def _load_state(self, path: str, quiet=False):
-        p = Path(path)
-        if not p.exists():
-            if not quiet:
-                messagebox.showwarning("Info", f"Aucun fichier trouvé: {short(path)}")
-            return
+    def run(self, argv, line_fn, cancel=None) -> int:
+        """Exécute `manage.py <argv>` dans le worker ; cancel tue le worker (redémarré au prochain appel)."""
+        with self._lock:
+            if not self.alive() or self.signature != self._signature():
+                self.start()
+            proc = self.proc
+            proc.stdin.write(json.dumps({"argv": list(argv)}) + "\n")
+            proc.stdin.flush()
+
+            def watch():
+                while proc.poll() is None:
+                    if cancel.wait(0.1):
+                        proc.kill()
+                        return
+
+            if cancel is not None:
+                threading.Thread(target=watch, daemon=True).start()
+            for line in proc.stdout:
+                msg = self._decode(line)
+                if msg is None:
+                    line_fn(line.rstrip("\n"))
+                elif "out" in msg:
+                    line_fn(msg["out"])
+                elif "done" in msg:
+                    return msg["done"]
+            self.proc = None
+            if cancel is not None and cancel.is_set():
+                raise OperationCancelled()
+            raise RuntimeError("Le worker Django s'est arrêté pendant la commande.")
+
+def run_manage(manage: Path, argv, line_fn, cancel=None, worker: DjangoWorker | None = None) -> int:
+    """manage.py <argv> via le worker persistant si fourni, sinon (ou en cas d'échec) en sous-processus."""
+    if worker is not None:
         try:
-            data = json.loads(p.read_text(encoding="utf-8"))
-            self.project_root.set(data.get("project_root",""))
-            self.dist_folder.set(data.get("dist_folder",""))
-            self.manage_py.set(data.get("manage_py",""))
-            self.static_dir.set(data.get("static_dir",""))
-            self.templates_dir.set(data.get("templates_dir",""))
-            if not quiet:
-                messagebox.showinfo("OK", f"Config chargée depuis {short(path)}")
-            self.log(f"Config chargée: {short(path)}")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Impossible de charger {short(path)}:\n{e}")
-            self.set_status("Erreur de chargement JSON.")
-
-    def _save_state(self, path: str):
-        data = {
-            "project_root": self.project_root.get(),
-            "dist_folder": self.dist_folder.get(),
-            "manage_py": self.manage_py.get(),
-            "static_dir": self.static_dir.get(),
-            "templates_dir": self.templates_dir.get()
-        }
-        Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
-        messagebox.showinfo("OK", f"Config sauvegardée dans {short(path)}")
-        self.log(f"Config sauvegardée: {short(path)}")
-
-    def menu_load_json(self):
-        p = filedialog.askopenfilename(title="Charger config JSON",
-                                       filetypes=[("JSON","*.json"),("Tous fichiers","*.*")])
-        if p:
-            self._load_state(p)
-            self._auto_paths_visibility()
-
-    def menu_save_json(self):
-        p = filedialog.asksaveasfilename(title="Sauver config JSON",
-                                         defaultextension=".json",
-                                         filetypes=[("JSON","*.json")])
-        if p:
-            self._save_state(p)
-
-    # ----- Chemins -----
-    def _paths_complete(self) -> bool:
+            return worker.run(argv, line_fn, cancel=cancel)
+        except WorkerUnavailable as e:
+            line_fn(f"[worker indisponible, repli sous-processus] {e}")
+    return run_streaming(manage_cmd(manage, *argv), Path(manage).parent, line_fn, cancel=cancel)
+
+# ---------- Projet Django & profil ----------
+PROFILE_KEYS = ("project_root", "dist_folder", "manage_py", "static_dir", "templates_dir")
+EMPTY_URLS = "from django.urls import path\n\nurlpatterns = []\n"
+
+def load_profile(path) -> dict:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {k: data.get(k, "") for k in PROFILE_KEYS}
+
+def _profile_data(path) -> dict:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def save_profile(path, data: dict):
+    """Projet courant ; le catalogue "projects" déjà présent dans le fichier est conservé."""
+    out = {k: data.get(k, "") for k in PROFILE_KEYS}
+    projects = _profile_data(path).get("projects")
+    if projects:
+        out["projects"] = projects
+    Path(path).write_text(json.dumps(out, indent=2), encoding="utf-8")
+
+def load_projects(path) -> dict:
+    """Catalogue {nom: chemins} du profil (clé "projects") ; {} s'il n'y en a pas."""
+    projects = _profile_data(path).get("projects")
+    if not isinstance(projects, dict):
+        return {}
+    return {name: {k: cfg.get(k, "") for k in PROFILE_KEYS} for name, cfg in projects.items() if isinstance(cfg, dict)}
+
+def save_projects(path, projects: dict):
+    """Réécrit le catalogue en conservant le projet courant du profil."""
+    data = _profile_data(path)
+    data["projects"] = {name: {k: str(cfg.get(k) or "") for k in PROFILE_KEYS} for name, cfg in sorted(projects.items())}
+    Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+def normalize_paths(cfg: dict) -> tuple[dict, list]:
+    """
+    Corrections douces (fichier choisi -> son dossier, valeurs par défaut
+    manage.py/templates/static) ; retourne (chemins, problèmes bloquants).
+    """
+    pr = Path(cfg.get("project_root") or "")
+    if pr.is_file():
+        pr = pr.parent
+    df = Path(cfg.get("dist_folder") or "")
+    if df.is_file():
+        df = df.parent
+    paths = {
+        "project_root": pr,
+        "dist_folder": df,
+        "manage_py": Path(cfg.get("manage_py") or (pr / "manage.py")),
+        "templates_dir": Path(cfg.get("templates_dir") or (pr / "templates")),
+        "static_dir": Path(cfg.get("static_dir") or (pr / "static")),
+    }
+    problems = []
+    if not paths["manage_py"].exists():
+        problems.append("manage.py introuvable.")
+    if not has_index(df):
+        problems.append("dist/browser/index.html introuvable.")
+    return paths, problems
+
+# ---------- Découverte du dist Angular (angular.json / project.json) ----------
+DISCOVER_CACHE = str(Path.home() / ".angular_django_wizard_cache.json")
+DISCOVER_CONFIGS = ("angular.json", "project.json")
+DISCOVER_PRUNE = {"node_modules", ".git", ".hg", ".svn", ".angular", ".nx", ".cache", ".tox", "__pycache__",
+                  ".venv", "venv", "env", "dist", "build", "static", "staticfiles", "media"}
+DISCOVER_MAX_DEPTH = 4
+# dossiers frères du projet explorés (monorepos frontend/ + backend/), en plus de ceux qui portent une config
+DISCOVER_SIBLINGS = {"frontend", "front", "client", "web", "webapp", "angular", "ui", "app", "apps", "spa"}
+DISCOVER_CACHE_TTL = 30 * 86400  # entrée non consultée depuis 30 jours : oubliée
+DISCOVER_CACHE_MAX = 5000        # entrées gardées au plus par table (les plus récemment consultées)
+_APPLICATION_BUILDERS = (":application",)  # esbuild (Angular 17+) : sortie dans <outputPath>/browser/
+
+def _config_outputs(config: Path) -> list:
+    """[(projet, dist/browser absolu)] d'un angular.json (workspace) ou project.json (Nx)."""
+    try:
+        data = json.loads(read_text(config))
+    except ValueError:
+        return []
+    if config.name == "project.json":
+        projects = {data.get("name") or config.parent.name: data}
+        base = next((d for d in (config.parent, *config.parent.parents) if (d / "nx.json").exists()), config.parent)
+    else:
+        projects, base = data.get("projects") or {}, config.parent
+    out = []
+    for name, proj in projects.items():
+        targets = proj.get("architect") or proj.get("targets") or {}
+        build = targets.get("build") or {}
+        builder = build.get("builder") or build.get("executor") or ""
+        opt = (build.get("options") or {}).get("outputPath") or f"dist/{name}"
+        if isinstance(opt, dict):  # {"base": "dist/app", "browser": "browser"}
+            dist = base / opt.get("base", f"dist/{name}") / opt.get("browser", "browser")
+        else:
+            dist = base / opt
+            if builder.endswith(_APPLICATION_BUILDERS):
+                dist = dist / "browser"
+        out.append((name, str(Path(os.path.normpath(dist)))))
+    return out
+
+def _build_mtime(dist: Path) -> float | None:
+    """Date du build : mtime de index.html (ou de l'index de locale le plus récent), None si absent."""
+    stamps = []
+    for p in [dist / "index.html", *(dist / loc / "index.html" for loc in detect_locales(dist))]:
         try:
-            pr = Path(self.project_root.get() or "")
-            mp = Path(self.manage_py.get() or "")
-            df = Path(self.dist_folder.get() or "")
-            ok = pr.exists() and mp.exists() and df.exists()
-            return ok
-        except Exception:
-            return False
+            stamps.append(p.stat().st_mtime)
+        except OSError:
+            pass
+    return max(stamps, default=None)
 
-    def _auto_paths_visibility(self):
-        # Si profil local chargeable et chemins plausibles -> replier
-        if self._paths_complete():
-            self.paths_section.close()
-            self.set_status("Chemins OK (profil).")
-        else:
-            self.paths_section.open()
-            self.set_status("Veuillez renseigner les chemins puis confirmer.")
+def _prune_discover_cache(table: dict, now: int) -> dict:
+    """Entrées consultées depuis moins de DISCOVER_CACHE_TTL, au plus DISCOVER_CACHE_MAX (les plus récentes)."""
+    fresh = [(k, v) for k, v in table.items() if now - v.get("seen", 0) < DISCOVER_CACHE_TTL]
+    return dict(sorted(fresh, key=lambda kv: kv[1]["seen"])[-DISCOVER_CACHE_MAX:])
 
-    def confirm_paths(self):
-        # corrections & validations douces
+def discover_dist(project_root: Path, cache_path=DISCOVER_CACHE, max_depth=DISCOVER_MAX_DEPTH) -> list:
+    """
+    Builds Angular proches du projet Django : angular.json et project.json trouvés dans le projet
+    (parcours os.scandir qui élague node_modules, .git, .angular (cache), venvs et sorties de build),
+    à la racine du dossier parent et dans les dossiers frères connus (frontend/, client/, web/…) ou
+    portant eux-mêmes une config — jamais tout le parent, qui peut être le dossier personnel ;
+    puis outputPath résolu (browser/ d'Angular 17+).
+    Le listing de chaque dossier est mis en cache par mtime de dossier, la lecture des configs par
+    mtime/taille : une réouverture ne fait que des stat(). Les entrées non consultées depuis
+    DISCOVER_CACHE_TTL sont oubliées, et chaque table plafonnée à DISCOVER_CACHE_MAX.
+    Retourne des dicts {"project", "config", "dist", "built"} — builds existants d'abord, le plus récent en tête.
+    """
+    root = Path(project_root).resolve()
+    cache = _profile_data(cache_path) if cache_path else {}
+    dirs, configs = cache.get("dirs", {}), cache.get("configs", {})
+    now = int(time.time())
+    dirty = False
+
+    def touch(entry):  # date de consultation, rafraîchie au plus une fois par jour
+        nonlocal dirty
+        if now - entry.get("seen", 0) > 86400:
+            entry["seen"], dirty = now, True
+        return entry
+
+    def listing(folder):
+        """{"configs", "subdirs"} d'un dossier, relu seulement si sa mtime a changé ; None si illisible."""
+        nonlocal dirty
         try:
-            # project_root à partir d'un fichier choisi
-            pr = Path(self.project_root.get() or "")
-            if pr.is_file():
-                pr = pr.parent
-            self.project_root.set(str(pr))
-
-            # dist_folder à partir d'un fichier choisi
-            df = Path(self.dist_folder.get() or "")
-            if df.is_file():
-                df = df.parent
-            self.dist_folder.set(str(df))
-
-            # vérifier manage.py
-            mp = Path(self.manage_py.get() or (pr / "manage.py"))
-            if mp.exists():
-                self.manage_py.set(str(mp))
-
-            # templates/static
-            tdir = Path(self.templates_dir.get() or (pr / "templates"))
-            sdir = Path(self.static_dir.get() or (pr / "static"))
-            tdir.mkdir(parents=True, exist_ok=True)
-            sdir.mkdir(parents=True, exist_ok=True)
-            self.templates_dir.set(str(tdir))
-            self.static_dir.set(str(sdir))
-
-            # checks essentiels
-            problems = []
-            if not mp.exists():
-                problems.append("manage.py introuvable.")
-            if not (df / "index.html").exists():
-                problems.append("dist/browser/index.html introuvable.")
-            if problems:
-                messagebox.showwarning("Chemins à vérifier", "\n".join(problems))
-                self.set_status("Chemins incomplets. Corrige puis reconfirme.")
-                return
-
-            # auto-save profil local
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+        entry = dirs.get(folder)
+        if entry and entry["mtime"] == mtime:
+            return touch(entry)
+        names, subdirs = [], []
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    if e.name in DISCOVER_CONFIGS and e.is_file():
+                        names.append(e.name)
+                    elif e.is_dir(follow_symlinks=False) and e.name not in DISCOVER_PRUNE \
+                            and not e.name.startswith("."):
+                        subdirs.append(e.name)
+        except OSError:
+            return None
+        dirty = True
+        dirs[folder] = {"mtime": mtime, "configs": names, "subdirs": sorted(subdirs), "seen": now}
+        return dirs[folder]
+
+    seen, found = set(), []
+    stack = [(str(root), 0)]
+    parent = listing(str(root.parent)) if root.parent != root else None
+    if parent:  # frères explorés sur max_depth - 1 niveaux, comme depuis le parent
+        found += [os.path.join(str(root.parent), n) for n in parent["configs"]]
+        for d in parent["subdirs"]:
+            sibling = os.path.join(str(root.parent), d)
+            if sibling != str(root) and (d.lower() in DISCOVER_SIBLINGS or any(
+                    os.path.isfile(os.path.join(sibling, c)) for c in DISCOVER_CONFIGS)):
+                stack.append((sibling, 1))
+    while stack:
+        folder, depth = stack.pop()
+        if folder in seen:
+            continue
+        seen.add(folder)
+        entry = listing(folder)
+        if entry is None:
+            continue
+        found += [os.path.join(folder, n) for n in entry["configs"]]
+        if depth < max_depth:
+            stack += [(os.path.join(folder, d), depth + 1) for d in entry["subdirs"]]
+    results = []
+    for config in found:
+        try:
+            st = os.stat(config)
+        except OSError:
+            continue
+        hit = configs.get(config)
+        if not hit or hit["sig"] != [st.st_mtime_ns, st.st_size]:
+            hit = configs[config] = {"sig": [st.st_mtime_ns, st.st_size], "outputs": _config_outputs(Path(config)),
+                                     "seen": now}
+            dirty = True
+        results += [{"project": name, "config": config, "dist": dist} for name, dist in touch(hit)["outputs"]]
+    if cache_path:
+        tables = [_prune_discover_cache(t, now) for t in (dirs, configs)]
+        if dirty or tables != [dirs, configs]:
             try:
-                self._save_state(DEFAULT_PROFILE)
-            except Exception:
+                Path(cache_path).write_text(json.dumps(dict(zip(("dirs", "configs"), tables))), encoding="utf-8")
+            except OSError:
                 pass
+    unique = {r["dist"]: r for r in results}.values()
+    for r in unique:
+        r["built"] = _build_mtime(Path(r["dist"]))
+    return sorted(unique, key=lambda r: (r["built"] is None, -(r["built"] or 0), r["project"]))
+
+# ---------- Modèle du projet Django (résolu une fois, sources en cache mtime/taille) ----------
+_SOURCE_CACHE = {}  # chemin -> ((mtime_ns, taille), texte, ast | None)
+
+def parsed_source(path: Path) -> tuple:
+    """(texte, ast) d'un fichier Python ; relu et reparsé seulement si mtime/taille changent."""
+    p = Path(path)
+    try:
+        st = p.stat()
+    except OSError:
+        return "", None
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _SOURCE_CACHE.get(p)
+    if hit and hit[0] == key:
+        return hit[1], hit[2]
+    text = read_text(p)
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        tree = None
+    _SOURCE_CACHE[p] = (key, text, tree)
+    return text, tree
+
+def settings_reader(settings_py: Path) -> SettingsReader:
+    """SettingsReader sur l'ast en cache ; SyntaxError si settings.py ne se parse pas."""
+    text, tree = parsed_source(settings_py)
+    if tree is None:
+        raise SyntaxError(f"settings.py illisible : {settings_py}")
+    return SettingsReader(settings_py, text, tree)
+
+def module_file(module: str, bases) -> Path | None:
+    """proj.settings -> <base>/proj/settings.py (ou paquet proj/settings/__init__.py)."""
+    parts = module.split(".")
+    for base in bases:
+        for cand in (Path(base).joinpath(*parts).with_suffix(".py"), Path(base).joinpath(*parts, "__init__.py")):
+            if cand.is_file():
+                return cand
+    return None
+
+def _first_glob(root: Path, name: str) -> Path | None:
+    for p in sorted(root.glob(f"*/{name}")):
+        return p
+    cand = root / "project" / name
+    return cand if cand.exists() else None
+
+class DjangoProject:
+    """
+    Projet Django résolu comme Django le fait : manage.py -> DJANGO_SETTINGS_MODULE -> settings.py
+    -> ROOT_URLCONF -> urls.py (repli : premier */settings.py, urls.py voisin, premier */urls.py).
+    Construit une fois (confirmation des chemins) ; les sources sont lues via parsed_source.
+    """
+    def __init__(self, root: Path, manage_py: Path | None = None):
+        self.root = Path(root)
+        self.manage = Path(manage_py) if manage_py else self.root / "manage.py"
+        bases = list(dict.fromkeys([self.manage.parent, self.root]))
+        self.settings_module = settings_module_from_manage(self.manage) if self.manage.is_file() else None
+        self.settings_py = self.settings_module and module_file(self.settings_module, bases)
+        if not self.settings_py and self.root.exists():
+            self.settings_py = _first_glob(self.root, "settings.py")
+        self.urlconf = None
+        if self.settings_py:
+            try:
+                self.urlconf = settings_reader(self.settings_py).get("ROOT_URLCONF")
+            except (OSError, SyntaxError, ValueError):
+                pass
+        if isinstance(self.urlconf, str):  # ROOT_URLCONF fait foi, même si le fichier reste à créer
+            self.urls_py = module_file(self.urlconf, bases)
+        elif self.settings_py and (self.package() / "urls.py").is_file():
+            self.urls_py = self.package() / "urls.py"
+        else:
+            self.urls_py = _first_glob(self.root, "urls.py") if self.root.exists() else None
 
-            # Préparer le dossier de backups centralisé: <parent>/<projectname>_backups/<timestamp>/
-            proj_root = Path(self.project_root.get())
-            backup_root = proj_root.parent / f"{proj_root.name}_backups"
-            session_dir = backup_root / self.run_stamp
-            session_dir.mkdir(parents=True, exist_ok=True)
-            self.backup_dir = session_dir
-            self.log(f"Backups: {short(self.backup_dir)}")
-
-            # auto-hide
-            self.paths_section.close()
-            self.set_status("Chemins confirmés.")
-            self.log("Chemins confirmés (section repliée).")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
-            self.set_status("Erreur lors de la confirmation des chemins.")
-
-    def toggle_paths(self):
-        self.paths_section.toggle()
-
-    # Selectors
-    def pick_project_root(self):
-        p = filedialog.askopenfilename(title="Choisir un fichier DANS le dossier du projet Django",
-                                       filetypes=[("Tous fichiers", "*.*")])
-        if p:
-            folder = str(Path(p).parent)
-            self.project_root.set(folder)
-            mp = Path(folder) / "manage.py"
-            if mp.exists():
-                self.manage_py.set(str(mp))
-
-    def pick_manage(self):
-        p = filedialog.askopenfilename(title="Sélectionner manage.py",
-                                       filetypes=[("Python", "*.py"), ("Tous fichiers", "*.*")])
-        if p:
-            if Path(p).name != "manage.py":
-                messagebox.showwarning("Attention", "Ce fichier n'est pas 'manage.py'.")
-            self.manage_py.set(p)
-
-    def pick_dist(self):
-        p = filedialog.askopenfilename(title="Choisir un fichier DANS dist/<app>/browser (ex: index.html)",
-                                       filetypes=[("Tous fichiers", "*.*")])
-        if p:
-            self.dist_folder.set(str(Path(p).parent))
-
-    def pick_dir_into_var(self, var: tk.StringVar):
-        d = filedialog.askdirectory(title="Choisir un dossier")
-        if d:
-            var.set(d)
-
-    # ----- settings.py -----
-    def project_settings_py(self) -> Path | None:
-        root = Path(self.project_root.get() or "")
-        if not root.exists():
-            return None
-        for p in root.glob("*/settings.py"):
-            return p
-        cand = root / "project" / "settings.py"
-        return cand if cand.exists() else None
-
-    def preview_settings_diff(self):
-        p = self.project_settings_py()
-        if not p:
-            messagebox.showerror("Erreur", "settings.py introuvable dans le projet Django.")
-            return
-        current = read_text(p).splitlines(keepends=True)
-        proposed = idempotent_add_settings(read_text(p)).splitlines(keepends=True)
-        diff = difflib.unified_diff(current, proposed, fromfile=short(p), tofile=f"{short(p)} (proposé)")
-        self.settings_diff.delete("1.0", "end")
-        self.settings_diff.insert("1.0", "".join(diff) or "Aucune modification requise.")
-        self.settings_diff.see("end")
-
-    def apply_settings(self):
-        p = self.project_settings_py()
-        if not p:
-            messagebox.showerror("Erreur", "settings.py introuvable.")
-            return
-        src = read_text(p)
-        new = idempotent_add_settings(src)
-        if src == new:
-            messagebox.showinfo("OK", "Aucune modification à appliquer.")
-            self.set_status("settings.py déjà conforme.")
-            return
-        bak = self.backup(p)
-        self.log(f"Backup settings.py → {short(bak)}")
-        write_text(p, new)
-        messagebox.showinfo("OK", f"settings.py mis à jour: {short(p)}")
-        self.set_status("settings.py mis à jour.")
-
-    # ----- urls.py -----
-    def project_urls_py(self) -> Path | None:
-        root = Path(self.project_root.get() or "")
-        if not root.exists():
+    def package(self) -> Path | None:
+        """Paquet du projet : proj/settings.py ou proj/settings/prod.py -> proj/"""
+        if not self.settings_py:
             return None
-        for p in root.glob("*/urls.py"):
-            return p
-        cand = root / "project" / "urls.py"
-        return cand if cand.exists() else None
+        pkg = self.settings_py.parent
+        return pkg.parent if pkg.name == "settings" else pkg
+
+    def urls_target(self) -> Path:
+        """urls.py attendu : celui de ROOT_URLCONF, sinon à côté de settings.py, sinon <root>/project/."""
+        if isinstance(self.urlconf, str) and re.fullmatch(r"[\w.]+", self.urlconf):
+            return self.manage.parent.joinpath(*self.urlconf.split(".")).with_suffix(".py")
+        if self.settings_py:
+            return self.package() / "urls.py"
+        return self.root / "project" / "urls.py"
+
+    def default_urls_path(self) -> Path:
+        """urls.py à créer (urls_target), dossier créé au besoin."""
+        p = self.urls_target()
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    def settings_text(self) -> str:
+        return parsed_source(self.settings_py)[0] if self.settings_py else ""
+
+    def urls_text(self) -> str:
+        return parsed_source(self.urls_py)[0] if self.urls_py else ""
+
+_PROJECTS = {}
+
+def _project_sig(project: DjangoProject) -> tuple:
+    """(mtime, taille) de manage.py, settings.py et urls.py — celui à créer s'il manque : sa création invalide."""
+    sig = []
+    for p in (project.manage, project.settings_py, project.urls_py or project.urls_target()):
+        try:
+            st = p.stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except (OSError, AttributeError):
+            sig.append(None)
+    return tuple(sig)
 
-    def preview_urls_diff(self):
-        p = self.project_urls_py()
-        if not p:
-            current_text = "from django.urls import path\n\nurlpatterns = []\n"
-            current = current_text.splitlines(keepends=True)
-            proposed = idempotent_add_urls(current_text).splitlines(keepends=True)
-            diff = difflib.unified_diff(current, proposed, fromfile="(nouveau urls.py)", tofile="(proposé)")
+def django_project(root: Path, manage_py: Path | None = None) -> DjangoProject:
+    """
+    Modèle mémorisé par (racine, manage.py) ; reconstruit si manage.py, settings.py ou urls.py changent.
+    Un urls.py absent est un état valide (à créer), un settings.py introuvable est recherché à chaque appel.
+    """
+    root = Path(root)
+    manage = Path(manage_py) if manage_py else root / "manage.py"
+    hit = _PROJECTS.get((root, manage))
+    if hit and hit[1].settings_py and hit[0] == _project_sig(hit[1]):
+        return hit[1]
+    project = DjangoProject(root, manage)
+    _PROJECTS[(root, manage)] = (_project_sig(project), project)
+    return project
+
+def find_settings_py(root: Path) -> Path | None:
+    return django_project(root).settings_py
+
+def find_urls_py(root: Path) -> Path | None:
+    return django_project(root).urls_py
+
+def default_urls_path(root: Path) -> Path:
+    return django_project(root).default_urls_path()
+
+# ---------- CLI (headless) ----------
+EXIT_OK = 0         # succès / rien à faire
+EXIT_ERROR = 1      # échec d'une étape
+EXIT_USAGE = 2      # arguments invalides (argparse)
+EXIT_CHANGES = 3    # --check : des modifications seraient appliquées
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="angular_django_wizard",
+        description="Angular → Django Wizard (sans argument : interface graphique).")
+    ap.add_argument("--profile", default=DEFAULT_PROFILE, help="profil JSON (défaut: %(default)s)")
+    ap.add_argument("--log-file", help="copie du journal dans un fichier tournant")
+    ap.add_argument("--project-root"); ap.add_argument("--manage-py")
+    ap.add_argument("--dist", dest="dist_folder"); ap.add_argument("--templates-dir"); ap.add_argument("--static-dir")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    for name in ("settings", "urls"):
+        sp = sub.add_parser(name, help=f"edits idempotents de {name}.py")
+        sp.add_argument("--diff", action="store_true", help="afficher le diff proposé")
+        sp.add_argument("--check", action="store_true", help=f"ne rien écrire, code {EXIT_CHANGES} si modifications")
+        if name == "settings":
+            sp.add_argument("--static-manifest", action="store_true",
+                            help="stockage qui lit le staticfiles.json pré-calculé (+ wizard_support.py)")
+            sp.add_argument("--preload-middleware", action="store_true",
+                            help="middleware d'en-têtes Link: modulepreload (+ wizard_support.py)")
+            sp.add_argument("--production", action="store_true",
+                            help="WhiteNoise : bundles hashés immuables, compression, index.html no-cache")
         else:
-            current = read_text(p).splitlines(keepends=True)
-            proposed = idempotent_add_urls(read_text(p)).splitlines(keepends=True)
-            diff = difflib.unified_diff(current, proposed, fromfile=short(p), tofile=f"{short(p)} (proposé)")
-        self.urls_diff.delete("1.0", "end")
-        self.urls_diff.insert("1.0", "".join(diff) or "Aucune modification requise.")
-        self.urls_diff.see("end")
-
-    def apply_urls(self):
-        p = self.project_urls_py()
-        if not p:
-            root = Path(self.project_root.get() or "")
-            if not root.exists():
-                messagebox.showerror("Erreur", "Projet Django invalide.")
-                return
-            proj_dir = None
-            for cand in root.iterdir():
-                if cand.is_dir() and (cand / "settings.py").exists():
-                    proj_dir = cand
-                    break
-            if not proj_dir:
-                proj_dir = root / "project"
-                proj_dir.mkdir(parents=True, exist_ok=True)
-            p = proj_dir / "urls.py"
-            current = "from django.urls import path\n\nurlpatterns = []\n"
-            proposed = idempotent_add_urls(current)
-            write_text(p, proposed)
-            messagebox.showinfo("OK", f"urls.py créé et mis à jour: {short(p)}")
-            self.log(f"Créé urls.py → {short(p)}")
-            self.set_status("urls.py créé.")
-            return
+            sp.add_argument("--cached-index", action="store_true",
+                            help="SpaIndexView : index en mémoire, ETag/304 (+ wizard_support.py)")
+
+    def deploy_opts(sp):
+        sp.add_argument("--mode", choices=("install", "update"), default="update")
+        sp.add_argument("--staged", action="store_true", help="staging + bascule atomique")
+        sp.add_argument("--gc-keep", type=int, default=None, help="GC après déploiement (N générations)")
+        sp.add_argument("--precompress", action="store_true", help="frères .gz/.br des assets texte")
+        sp.add_argument("--static-manifest", action="store_true",
+                        help="staticfiles.json depuis les noms hashés d'Angular")
+        sp.add_argument("--static-url", help="STATIC_URL pour le chargement des chunks (défaut : settings.py)")
+        sp.add_argument("--no-chunk-urls", action="store_true", help="ne pas réécrire le chargement des chunks JS")
+        sp.add_argument("--modulepreload", action="store_true",
+                        help="<link rel=modulepreload> du graphe de modules initial + index.preload.json")
+
+    deploy_opts(sub.add_parser("deploy", help="index.html + assets vers templates/ et static/"))
+    sp = sub.add_parser("plan", help="ce que ferait deploy (stat seulement, rien n'est écrit)")
+    sp.add_argument("--mode", choices=("install", "update"), default="update")
+    sp.add_argument("--static-url", help="STATIC_URL pour le chargement des chunks (défaut : settings.py)")
+    sp.add_argument("--no-chunk-urls", action="store_true", help="ne pas réécrire le chargement des chunks JS")
+    sp.add_argument("--all", action="store_true", help="lister aussi les fichiers inchangés")
+    sp = sub.add_parser("watch", help="miroir continu de ng build --watch (delta seulement)")
+    sp.add_argument("--static-url", help="STATIC_URL pour le chargement des chunks (défaut : settings.py)")
+    sp.add_argument("--no-chunk-urls", action="store_true", help="ne pas réécrire le chargement des chunks JS")
+    sp.add_argument("--modulepreload", action="store_true", help="<link rel=modulepreload> dans les index")
+    sp.add_argument("--poll", type=float, default=WATCH_POLL, help="intervalle des instantanés (s)")
+    sp.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE, help="calme requis avant application (s)")
+    sp = sub.add_parser("collectstatic", help="manage.py collectstatic --noinput")
+    sp.add_argument("--native", action="store_true",
+                    help="collecte incrémentale de static/ vers STATIC_ROOT, sans Django")
+    deploy_opts(sub.add_parser("all", help="settings, urls, deploy puis collectstatic"))
+    sub.add_parser("rollback", help="revenir à la génération précédente (déploiement atomique)")
+    sp = sub.add_parser("gc", help="GC des anciens bundles de static/ (simulation par défaut)")
+    sp.add_argument("--keep", type=int, default=GC_KEEP_GENERATIONS)
+    sp.add_argument("--apply", action="store_true", help="supprimer réellement")
+    sp = sub.add_parser("discover", help="builds Angular (angular.json / project.json) proches du projet")
+    sp.add_argument("--no-cache", action="store_true", help=f"ignorer {short(DISCOVER_CACHE)}")
+    sp = sub.add_parser("projects", help="catalogue de projets du profil : list | add <nom> | remove <nom>")
+    sp.add_argument("action", choices=("list", "add", "remove"))
+    sp.add_argument("name", nargs="?")
+    sp = sub.add_parser("batch", help="étapes sur plusieurs projets du catalogue, en parallèle")
+    sp.add_argument("names", nargs="*", help="projets (défaut : tout le catalogue)")
+    sp.add_argument("--workers", type=int, default=BATCH_WORKERS, help="projets traités en même temps")
+    sp.add_argument("--steps", default=",".join(BATCH_STEPS), help="étapes (défaut : %(default)s)")
+    sp.add_argument("--native", action="store_true", help="collecte native au lieu de manage.py collectstatic")
+    deploy_opts(sp)
+    sp = sub.add_parser("backups", help="sessions de backup : list | restore | prune")
+    sp.add_argument("action", choices=("list", "restore", "prune"))
+    sp.add_argument("session", nargs="?")
+    sp.add_argument("--keep-last", type=int, default=BACKUP_KEEP_SESSIONS)
+    sp.add_argument("--keep-days", type=int, default=BACKUP_KEEP_DAYS)
+    return ap
+
+class CliContext:
+    """Chemins résolus + session de backup pour une exécution headless."""
+    def __init__(self, args, log_fn=print):
+        cfg = {}
+        if args.profile and Path(args.profile).exists():
+            cfg = load_profile(args.profile)
+        for k in PROFILE_KEYS:
+            if getattr(args, k, None):
+                cfg[k] = getattr(args, k)
+        self.paths, self.problems = normalize_paths(cfg)
+        self.root = self.paths["project_root"]
+        self.project = django_project(self.root, self.paths["manage_py"])
+        self.stamp = nowstamp()
+        self.store = project_backup_store(self.root)
+        self.log = log_fn
+        self.stats = None  # bilan du dernier deploy_front
 
-        src = read_text(p)
-        new = idempotent_add_urls(src)
-        if src == new:
-            messagebox.showinfo("OK", "Aucune modification à appliquer.")
-            self.set_status("urls.py déjà conforme.")
-            return
-        bak = self.backup(p)
-        self.log(f"Backup urls.py → {short(bak)}")
-        write_text(p, new)
-        messagebox.showinfo("OK", f"urls.py mis à jour: {short(p)}")
-        self.set_status("urls.py mis à jour.")
-
-    # ----- Déploiement -----
-    def do_deploy(self):
-        try:
-            dist = Path(self.dist_folder.get() or "")
-            if dist.is_file():
-                dist = dist.parent
-            if not dist.exists() or not (dist / "index.html").exists():
-                raise RuntimeError("Le dossier dist sélectionné n'est pas valide (index.html introuvable).")
-            tpls = Path(self.templates_dir.get() or "")
-            sttc = Path(self.static_dir.get() or "")
-            if not tpls:
-                root = Path(self.project_root.get() or "")
-                tpls = root / "templates"; self.templates_dir.set(str(tpls))
-            if not sttc:
-                root = Path(self.project_root.get() or "")
-                sttc = root / "static"; self.static_dir.set(str(sttc))
-
-            deploy_front(dist, tpls, sttc, self.log, backup_fn=self.backup)
-            messagebox.showinfo("OK", "Déploiement frontend terminé.")
-            self.set_status("Déploiement OK.")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
-            self.set_status("Échec du déploiement.")
-            self.log(f"ERREUR: {e}")
-
-    # ----- collectstatic -----
-    def do_collectstatic(self):
-        manage = Path(self.manage_py.get() or "")
-        if not manage.exists():
-            messagebox.showerror("Erreur", "manage.py introuvable.")
-            self.set_status("manage.py manquant.")
-            return
-        cmd = [sys.executable, str(manage), "collectstatic", "--noinput"]
-        self.collect_out.insert("end", f"$ {' '.join(cmd)}\n"); self.collect_out.see("end")
-        proc = subprocess.run(cmd, cwd=manage.parent, capture_output=True, text=True)
-        self.collect_out.insert("end", proc.stdout + "\n" + proc.stderr); self.collect_out.see("end")
-        if proc.returncode == 0:
-            messagebox.showinfo("OK", "collectstatic terminé.")
-            self.set_status("collectstatic OK.")
-            self.log("collectstatic OK")
+    def backup(self, file_path: Path) -> Path | None:
+        return backup_into(self.store, self.root, self.stamp, file_path)
+
+def _cli_edit(ctx: CliContext, args, name: str, p: Path | None, edit_fn) -> int:
+    if not p and name == "settings":
+        ctx.log("ERREUR: settings.py introuvable dans le projet Django.")
+        return EXIT_ERROR
+    src = parsed_source(p)[0] if p else EMPTY_URLS
+    new = edit_fn(src)
+    label = short(p) if p else "(nouveau urls.py)"
+    if args.diff or args.check:
+        # via ctx.log : sys.stdout vaut None dans l'exe fenêtré (console=False)
+        diff = "".join(unified_diff_lines(src.splitlines(True), new.splitlines(True), label, f"{label} (proposé)"))
+        if diff:
+            ctx.log(diff.rstrip("\n"))
+    if src == new and p:
+        ctx.log(f"{name}.py déjà conforme.")
+        return EXIT_OK
+    if args.check:
+        return EXIT_CHANGES
+    if not p:
+        p = ctx.project.default_urls_path()
+    else:
+        ctx.log(f"Backup {name}.py → {short(ctx.backup(p))}")
+    write_text(p, new)
+    ctx.log(f"{name}.py mis à jour: {short(p)}")
+    return EXIT_OK
+
+def _cli_support(ctx: CliContext, args, settings_py: Path, code: int) -> int:
+    """wizard_support.py requis par l'édition : vérifié (--check) ou (ré)écrit."""
+    support = Path(settings_py).parent / WIZARD_SUPPORT_NAME
+    if args.check:
+        return EXIT_CHANGES if read_text(support) != WIZARD_SUPPORT_SOURCE else code
+    if ensure_wizard_support(settings_py, ctx.backup):
+        ctx.log(f"{WIZARD_SUPPORT_NAME} écrit: {short(support)}")
+    return code
+
+def _cli_settings(ctx: CliContext, args) -> int:
+    settings_py = ctx.project.settings_py
+    backend, middleware = None, []
+    if settings_py:
+        if args.static_manifest:
+            backend = prebuilt_storage_backend(settings_py, ctx.root)
+        if getattr(args, "preload_middleware", False):
+            middleware.append(preload_middleware_path(settings_py, ctx.root))
+        if getattr(args, "production", False):
+            middleware.append(index_no_cache_middleware_path(settings_py, ctx.root))
+    production = getattr(args, "production", False)
+    code = _cli_edit(ctx, args, "settings", ctx.project.settings_py,
+                     lambda txt: idempotent_add_settings(txt, backend, middleware, production))
+    if not (backend or middleware) or code == EXIT_ERROR:
+        return code
+    return _cli_support(ctx, args, settings_py, code)
+
+def _cli_urls(ctx: CliContext, args, locales) -> int:
+    settings_py = ctx.project.settings_py
+    index_view = None
+    if getattr(args, "cached_index", False):
+        if not settings_py:
+            ctx.log("ERREUR: settings.py introuvable : wizard_support.py s'écrit à côté.")
+            return EXIT_ERROR
+        index_view = support_module_for(settings_py, ctx.root)
+    reserved = project_url_prefixes(settings_py)
+    code = _cli_edit(ctx, args, "urls", ctx.project.urls_py,
+                     lambda txt: idempotent_add_urls(txt, locales, index_view, reserved))
+    if not index_view or code == EXIT_ERROR:
+        return code
+    return _cli_support(ctx, args, settings_py, code)
+
+def _cli_static_url(ctx: CliContext, args) -> str | None:
+    if args.no_chunk_urls:
+        return None
+    return normalize_static_url(args.static_url) if args.static_url else project_static_url(ctx.project.settings_py)
+
+def _cli_deploy(ctx: CliContext, args) -> int:
+    dist = ctx.paths["dist_folder"]
+    if not has_index(dist):
+        ctx.log("ERREUR: dist/browser/index.html introuvable.")
+        return EXIT_ERROR
+    static_url = _cli_static_url(ctx, args)
+    ctx.stats = deploy_front(dist, ctx.paths["templates_dir"], ctx.paths["static_dir"], ctx.log, backup_fn=ctx.backup,
+                 mode=args.mode, gc_keep=args.gc_keep, staged=args.staged, precompress=args.precompress,
+                 static_manifest=args.static_manifest, static_url=static_url, modulepreload=args.modulepreload)
+    return EXIT_OK
+
+def _cli_plan(ctx: CliContext, args) -> int:
+    dist = ctx.paths["dist_folder"]
+    if not has_index(dist):
+        ctx.log("ERREUR: dist/browser/index.html introuvable.")
+        return EXIT_ERROR
+    plan = plan_deploy(dist, ctx.paths["static_dir"], mode=args.mode, static_url=_cli_static_url(ctx, args))
+    for rel, (status, size) in sorted(plan["entries"].items()):
+        if args.all or status != "unchanged":
+            print(f"{PLAN_LABELS[status]:<9} {human_bytes(size):>10}  {rel}")
+    ctx.log(plan_summary(plan))
+    return EXIT_OK
+
+def _cli_watch(ctx: CliContext, args) -> int:
+    dist = ctx.paths["dist_folder"]
+    if not has_index(dist):
+        ctx.log("ERREUR: dist/browser/index.html introuvable (lancez d'abord ng build --watch).")
+        return EXIT_ERROR
+    stop = threading.Event()
+    try:
+        watch_dist(dist, ctx.paths["templates_dir"], ctx.paths["static_dir"], ctx.log, stop, backup_fn=ctx.backup,
+                   static_url=_cli_static_url(ctx, args), modulepreload=args.modulepreload,
+                   poll=args.poll, debounce=args.debounce)
+    except KeyboardInterrupt:
+        ctx.log("Watch arrêté.")
+    return EXIT_OK
+
+def _cli_collectstatic(ctx: CliContext, args) -> int:
+    if getattr(args, "native", False):
+        settings_py = ctx.project.settings_py
+        if not settings_py:
+            ctx.log("ERREUR: settings.py introuvable dans le projet Django.")
+            return EXIT_ERROR
+        native_collectstatic(settings_py, ctx.paths["static_dir"], ctx.log)
+        return EXIT_OK
+    manage = ctx.paths["manage_py"]
+    if not manage.exists():
+        ctx.log("ERREUR: manage.py introuvable.")
+        return EXIT_ERROR
+    cmd = collectstatic_cmd(manage)
+    ctx.log(f"$ {' '.join(cmd)}")
+    code = run_streaming(cmd, manage.parent, ctx.log)
+    ctx.log("collectstatic OK" if code == 0 else "collectstatic a échoué")
+    return EXIT_OK if code == 0 else EXIT_ERROR
+
+def _cli_backups(ctx: CliContext, args) -> int:
+    if args.action == "list":
+        for name in ctx.store.sessions():
+            print(f"{name}  {len(ctx.store.load_session(name)['files'])} fichiers")
+        return EXIT_OK
+    if args.action == "prune":
+        report = ctx.store.prune(keep_last=args.keep_last, keep_days=args.keep_days)
+        ctx.log(f"Rétention : {len(report['sessions'])} sessions, {report['blobs']} blobs, "
+                f"{human_bytes(report['bytes'])} supprimés.")
+        return EXIT_OK
+    if not args.session:
+        ctx.log("ERREUR: précisez la session à restaurer (voir `backups list`).")
+        return EXIT_USAGE
+    for rel in ctx.store.restore(args.session, ctx.root, before_write=ctx.backup):
+        ctx.log(f"Restauré: {rel}")
+    return EXIT_OK
+
+def _cli_discover(ctx: CliContext, args) -> int:
+    found = discover_dist(ctx.root, cache_path=None if args.no_cache else DISCOVER_CACHE)
+    if not found:
+        ctx.log("Aucun angular.json / project.json trouvé près du projet Django.")
+        return EXIT_ERROR
+    for c in found:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(c["built"])) if c["built"] else "pas encore buildé"
+        print(f"{c['dist']}  [{c['project']}, {when}]  ← {short(c['config'])}")
+    return EXIT_OK
+
+def _cli_projects(ctx: CliContext, args) -> int:
+    catalogue = load_projects(args.profile)
+    if args.action == "list":
+        for name, cfg in sorted(catalogue.items()):
+            print(f"{name}  {cfg['project_root']}  (dist : {cfg['dist_folder']})")
+        return EXIT_OK
+    if not args.name:
+        ctx.log("ERREUR: précisez le nom du projet.")
+        return EXIT_USAGE
+    if args.action == "add":
+        catalogue[args.name] = {k: str(ctx.paths[k]) for k in PROFILE_KEYS}
+        ctx.log(f"Projet {args.name} enregistré : {short(ctx.root)}")
+    elif catalogue.pop(args.name, None) is None:
+        ctx.log(f"ERREUR: projet inconnu : {args.name}")
+        return EXIT_USAGE
+    else:
+        ctx.log(f"Projet {args.name} retiré du catalogue.")
+    save_projects(args.profile, catalogue)
+    return EXIT_OK
+
+# ---------- Déploiement multi-projets (batch) ----------
+BATCH_WORKERS = 4
+BATCH_STEPS = ("settings", "urls", "deploy", "collectstatic")
+BATCH_LOG_DIR = Path.home() / ".angular_django_wizard_batch"
+# options des étapes (mêmes noms que les arguments CLI), communes à tous les projets du lot
+BATCH_DEFAULTS = {"mode": "update", "staged": False, "gc_keep": None, "precompress": False,
+                  "static_manifest": False, "static_url": None, "no_chunk_urls": False,
+                  "modulepreload": False, "native": False}
+
+def batch_log_path(name: str) -> Path:
+    return BATCH_LOG_DIR / (re.sub(r"[^\w.-]+", "_", name) + ".log")
+
+def run_project(name: str, cfg: dict, steps, options: dict, log_fn, cancel=None) -> dict:
+    """
+    Étapes du lot sur un projet, isolé : contexte, session de backup et journal (batch_log_path)
+    propres ; log_fn reçoit les mêmes lignes préfixées [nom]. Retourne la ligne de bilan.
+    """
+    BATCH_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    file_log = open_log_file(str(batch_log_path(name)))
+    errors = []
+
+    def log(msg):
+        file_log(msg)
+        log_fn(f"[{name}] {msg}")
+        if msg.startswith("ERREUR"):
+            errors.append(msg.split(":", 1)[-1].strip())
+    args = argparse.Namespace(profile=None, diff=False, check=False,
+                              **{k: cfg.get(k) or None for k in PROFILE_KEYS}, **{**BATCH_DEFAULTS, **options})
+    row = {"name": name, "ok": False, "seconds": 0.0, "copied": 0, "bytes": 0, "step": None, "error": None}
+    t0 = time.perf_counter()
+    try:
+        ctx = CliContext(args, log)
+        runners = {"settings": lambda: _cli_settings(ctx, args),
+                   "urls": lambda: _cli_urls(ctx, args, detect_locales(ctx.paths["dist_folder"])),
+                   "deploy": lambda: _cli_deploy(ctx, args),
+                   "collectstatic": lambda: _cli_collectstatic(ctx, args)}
+        for step in steps:
+            if cancel is not None and cancel.is_set():
+                raise OperationCancelled()
+            row["step"] = step
+            if runners[step]() != EXIT_OK:
+                row["error"] = errors[-1] if errors else "code de sortie non nul"
+                break
         else:
-            messagebox.showerror("Erreur", "collectstatic a échoué.")
-            self.set_status("collectstatic KO.")
-            self.log("collectstatic a échoué")
+            stats = ctx.stats or {}
+            row.update(ok=True, step=None, copied=stats.get("copied", 0), bytes=stats.get("bytes", 0))
+    except OperationCancelled:
+        row["error"] = "annulé"
+    except Exception as e:
+        row["error"] = str(e)
+        log(f"ERREUR: {e}")
+    row["seconds"] = time.perf_counter() - t0
+    log(f"Terminé en {row['seconds']:.1f} s ({'OK' if row['ok'] else 'échec'}).")
+    return row
+
+def batch_deploy(projects: dict, steps=BATCH_STEPS, workers=BATCH_WORKERS, log_fn=print, options=None,
+                 cancel=None) -> list:
+    """Projets {nom: chemins} traités en parallèle (au plus `workers` à la fois) ; bilans dans l'ordre."""
+    if not projects:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(projects)))) as ex:
+        futures = [ex.submit(run_project, name, cfg, steps, options or {}, log_fn, cancel)
+                   for name, cfg in projects.items()]
+        return [f.result() for f in futures]
+
+def batch_summary(rows) -> str:
+    """Tableau de bilan : durée, fichiers et octets copiés, échecs (étape + message)."""
+    head = f"{'Projet':<20} {'Statut':<6} {'Durée':>8} {'Copiés':>7} {'Écrits':>10}  Détail"
+    lines = [head, "-" * len(head)]
+    for r in rows:
+        detail = "" if r["ok"] else f"{r['step'] + ' : ' if r['step'] else ''}{r['error'] or ''}"
+        lines.append(f"{r['name'][:20]:<20} {'OK' if r['ok'] else 'ÉCHEC':<6} {r['seconds']:>7.1f}s "
+                     f"{r['copied']:>7} {human_bytes(r['bytes']):>10}  {detail}".rstrip())
+    failed = sum(not r["ok"] for r in rows)
+    lines.append(f"{len(rows)} projets, {len(rows) - failed} OK, {failed} en échec, "
+                 f"{human_bytes(sum(r['bytes'] for r in rows))} écrits")
+    return "\n".join(lines)
+
+def _cli_batch(ctx: CliContext, args) -> int:
+    catalogue = load_projects(args.profile)
+    names = args.names or sorted(catalogue)
+    unknown = [n for n in names if n not in catalogue]
+    steps = [s.strip() for s in args.steps.split(",") if s.strip()]
+    bad = [s for s in steps if s not in BATCH_STEPS]
+    if unknown or bad or not names:
+        ctx.log(f"ERREUR: projets inconnus : {', '.join(unknown)}" if unknown else
+                f"ERREUR: étapes inconnues : {', '.join(bad)} (choix : {','.join(BATCH_STEPS)})" if bad else
+                "ERREUR: catalogue vide (voir `projects add <nom>`).")
+        return EXIT_USAGE
+    rows = batch_deploy({n: catalogue[n] for n in names}, steps, args.workers, ctx.log,
+                        {k: getattr(args, k) for k in BATCH_DEFAULTS})
+    for line in batch_summary(rows).splitlines():
+        ctx.log(line)
+    return EXIT_OK if all(r["ok"] for r in rows) else EXIT_ERROR
+
+def cli_main(argv) -> int:
+    args = build_arg_parser().parse_args(argv)
+    log_fn = print
+    if args.log_file:
+        file_log = open_log_file(args.log_file)
+        log_fn = lambda msg: (print(msg), file_log(msg))
+    try:
+        # dans le try : un profil JSON illisible donne « ERREUR: … » et EXIT_ERROR, pas une trace
+        ctx = CliContext(args, log_fn)
+        settings = lambda: _cli_settings(ctx, args)
+        locales = detect_locales(ctx.paths["dist_folder"])
+        urls = lambda: _cli_urls(ctx, args, locales)
+        if args.command == "settings":
+            return settings()
+        if args.command == "urls":
+            return urls()
+        if args.command == "deploy":
+            return _cli_deploy(ctx, args)
+        if args.command == "plan":
+            return _cli_plan(ctx, args)
+        if args.command == "watch":
+            return _cli_watch(ctx, args)
+        if args.command == "collectstatic":
+            return _cli_collectstatic(ctx, args)
+        if args.command == "all":
+            args.diff = args.check = False
+            for step in (settings, urls, lambda: _cli_deploy(ctx, args), lambda: _cli_collectstatic(ctx, args)):
+                code = step()
+                if code != EXIT_OK:
+                    return code
+            return EXIT_OK
+        if args.command == "rollback":
+            strategy = rollback_deploy(ctx.paths["templates_dir"], ctx.paths["static_dir"])
+            ctx.log(f"Rollback ({strategy}) : génération précédente restaurée.")
+            return EXIT_OK
+        if args.command == "gc":
+            report = gc_static(ctx.paths["static_dir"], keep=args.keep, dry_run=not args.apply)
+            for rel in report["files"]:
+                ctx.log(f"GC {'' if args.apply else '(simulation) '}{rel}")
+            ctx.log(f"GC : {len(report['files'])} fichiers, {human_bytes(report['bytes'])}"
+                    f"{' supprimés' if args.apply else ' récupérables'}.")
+            return EXIT_OK
+        if args.command == "backups":
+            return _cli_backups(ctx, args)
+        if args.command == "discover":
+            return _cli_discover(ctx, args)
+        if args.command == "projects":
+            return _cli_projects(ctx, args)
+        if args.command == "batch":
+            return _cli_batch(ctx, args)
+    except Exception as e:
+        log_fn(f"ERREUR: {e}")
+        return EXIT_ERROR
+    return EXIT_USAGE
 
 # ---------- main ----------
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return cli_main(argv)
+    from wizard_gui import Wizard  # tkinter chargé seulement pour le GUI
     app = Wizard()
     app.mainloop()
+    return EXIT_OK
 
 if __name__ == "__main__":
-    main()
+    multiprocessing.freeze_support()  # pool de précompression dans l'exécutable PyInstaller
+    # le GUI importe `angular_django_wizard` : réutiliser ce module plutôt que le recharger
+    sys.modules.setdefault("angular_django_wizard", sys.modules[__name__])
+    sys.exit(main())
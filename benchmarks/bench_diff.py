@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark : difflib.unified_diff contre unified_diff_lines (Myers en espace
+linéaire, préfixe/suffixe écartés, cache par empreinte) sur des fichiers de 10k lignes.
+
+    python benchmarks/bench_diff.py [--lines 10000] [--repeat 3]
+
+Cas mesurés : settings.py généré avec quelques modifications éparses, urls.py à
+routes répétitives, fichier entièrement réécrit. Affiche le temps et la taille du
+diff produit (lignes +/-), la plus petite étant la meilleure.
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import angular_django_wizard as wiz  # noqa: E402
+
+def settings_case(n: int):
+    a = [f"SETTING_{i} = {{'key': {i}, 'enabled': True}}\n" if i % 7 else "\n" for i in range(n)]
+    b = a[:]
+    rnd = random.Random(1)
+    for _ in range(20):
+        b.insert(rnd.randrange(len(b)), f"EXTRA_{rnd.randrange(10**6)} = None\n")
+    for _ in range(20):
+        del b[rnd.randrange(len(b))]
+    return a, b
+
+def urls_case(n: int):
+    a = ["urlpatterns = [\n"]
+    for i in range(n // 4):
+        a += ["    path(\n", f"        'page/{i % 50}/',\n", f"        views.page_{i % 50},\n", "    ),\n"]
+    a.append("]\n")
+    b = a[:]
+    rnd = random.Random(2)
+    for _ in range(30):
+        at = 1 + 4 * rnd.randrange(n // 4)
+        b[at:at] = ["    path(\n", "        'new/',\n", "        views.new,\n", "    ),\n"]
+    return a, b
+
+def rewrite_case(n: int):
+    return [f"old_{i} = {i}\n" for i in range(n)], [f"new_{i} = {i}\n" for i in range(n)]
+
+def best_of(fn, a, b, repeat, before=None):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        out = fn(a, b)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def diff_size(lines) -> int:
+    return sum(1 for line in lines if line[:1] in "+-" and line[:3] not in ("---", "+++"))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    impls = [("difflib", lambda a, b: list(difflib.unified_diff(a, b, "a", "b")), None),
+             ("myers (froid)", lambda a, b: wiz.unified_diff_lines(a, b, "a", "b"), wiz._DIFF_CACHE.clear),
+             ("myers (cache)", lambda a, b: wiz.unified_diff_lines(a, b, "a", "b"), None)]
+    print(f"{'cas':<10} {'implémentation':<16} {'temps':>10} {'lignes +/-':>11}")
+    for case, make in (("settings", settings_case), ("urls", urls_case), ("réécrit", rewrite_case)):
+        a, b = make(args.lines)
+        for name, fn, before in impls:
+            secs, out = best_of(fn, a, b, args.repeat, before)
+            print(f"{case:<10} {name:<16} {secs * 1000:>8.1f}ms {diff_size(out):>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark : StaticRewriter (HTMLParser, reconstruction des balises) contre
+rewrite_static_urls (épissure en une passe) sur un index.html prérendu de plusieurs Mo.
+
+    python benchmarks/bench_html_rewriter.py [--mb 2 4 8] [--repeat 3]
+
+Affiche le temps, le débit et le nombre de lignes qui diffèrent de l'original
+(le bruit de diff d'un déploiement).
+"""
+
+import argparse
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from angular_django_wizard import is_local_asset, rewrite_static_urls, to_django_static  # noqa: E402
+
+class StaticRewriter(HTMLParser):
+    """Ancienne implémentation (HTMLParser, balises reconstruites), gardée ici comme référence de mesure."""
+    # on ne cible PAS "content" (ne pas toucher <meta content="...">)
+    TARGET_ATTRS = {"src", "href", "poster"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+
+    def handle_decl(self, decl): self.out.append(f"<!{decl}>")
+    def handle_startendtag(self, tag, attrs): self.out.append(self._rebuild(tag, attrs, True))
+    def handle_starttag(self, tag, attrs): self.out.append(self._rebuild(tag, attrs, False))
+    def handle_endtag(self, tag): self.out.append(f"</{tag}>")
+    def handle_data(self, data): self.out.append(data)
+    def handle_comment(self, data): self.out.append(f"<!--{data}-->")
+    def handle_entityref(self, name): self.out.append(f"&{name};")
+    def handle_charref(self, name): self.out.append(f"&#{name};")
+
+    def _rebuild(self, tag, attrs, self_closing):
+        t = tag.lower()
+
+        # 1) ne jamais modifier <meta ...>
+        if t == "meta":
+            attr_str = "".join([f' {k}' if v is None else f' {k}="{v}"' for k, v in attrs])
+            return f"<{tag}{attr_str}{'/' if self_closing else ''}>"
+
+        rebuilt = []
+        for k, v in attrs:
+            if v is None:
+                rebuilt.append((k, v))
+                continue
+
+            # 2) ne jamais toucher <base href="/">
+            if t == "base" and k.lower() == "href":
+                rebuilt.append((k, v))
+                continue
+
+            # 3) réécrire seulement les attrs ciblés
+            if k.lower() in self.TARGET_ATTRS and is_local_asset(v):
+                v = to_django_static(v)
+
+            rebuilt.append((k, v))
+
+        attr_str = "".join([f' {k}' if v is None else f' {k}="{v}"' for k, v in rebuilt])
+        return f"<{tag}{attr_str}{'/' if self_closing else ''}>"
+
+    def transform(self, html_text: str) -> str:
+        self.feed(html_text); self.close()
+        return "".join(self.out)
+
+HEAD = """<!doctype html>
+<html lang="fr"><head><meta charset="utf-8"><title>App</title><base href="/">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<link rel="stylesheet" href="styles-5INURTSO.css" media="print" onload="this.media='all'">
+<link rel='icon' type='image/x-icon' href='favicon.ico'>
+<style>:root{--c:#123}body{margin:0}</style>
+</head><body><app-root ng-version="17.3.0" ng-server-context="ssg">
+"""
+
+BLOCK = """<div class="card" _ngcontent-ng-c1 data-i={i}>
+  <img  src=assets/img/p{i}.webp srcset="assets/img/p{i}.webp 1x, assets/img/p{i}@2x.webp 2x" alt='Produit {i}' loading=lazy>
+  <div style='background: url("assets/bg/b{i}.jpg") center/cover'></div>
+  <a href="/produits/{i}" class="link">Produit n° {i} &amp; co</a>
+  <p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>
+</div>
+"""
+
+TAIL = """</app-root>
+<script id="ng-state" type="application/json">{"k":"<img src='x.png'>"}</script>
+<script src="polyfills-FFHMD2TL.js" type="module"></script>
+<script src="main-OGHYFBOQ.js" type="module"></script></body></html>
+"""
+
+def make_html(mb: float) -> str:
+    body, i, size = [], 0, 0
+    while size < mb * 1024 * 1024:
+        chunk = BLOCK.format(i=i)
+        body.append(chunk)
+        size += len(chunk)
+        i += 1
+    return HEAD + "".join(body) + TAIL
+
+def best_of(fn, text, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def changed_lines(a: str, b: str) -> int:
+    return sum(1 for x, y in zip(a.splitlines(), b.splitlines()) if x != y)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    impls = [("StaticRewriter", lambda t: StaticRewriter().transform(t)),
+             ("rewrite_static_urls", rewrite_static_urls)]
+    print(f"{'taille':>8} {'implémentation':<22} {'temps':>9} {'débit':>11} {'lignes modifiées':>17}")
+    for mb in args.mb:
+        html = make_html(mb)
+        size = len(html.encode("utf-8")) / 1024 / 1024
+        for name, fn in impls:
+            secs, out = best_of(fn, html, args.repeat)
+            print(f"{size:>6.1f}Mo {name:<22} {secs * 1000:>7.0f}ms {size / secs:>8.1f}Mo/s "
+                  f"{changed_lines(html, out):>17}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def dj():
+    """Django configuré une fois pour le processus (pas de projet : réglages minimaux)."""
+    django = pytest.importorskip("django")
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(
+            DEBUG=False, SECRET_KEY="tests", ALLOWED_HOSTS=["*"], USE_TZ=True,
+            INSTALLED_APPS=["django.contrib.staticfiles"], STATIC_URL="/static/",
+            TEMPLATES=[{"BACKEND": "django.template.backends.django.DjangoTemplates", "DIRS": []}],
+        )
+        django.setup()
+    return settings
@@ -0,0 +1,32 @@
+import angular_django_wizard as w
+
+
+def test_files_outside_the_project_are_restored_in_place(tmp_path):
+    root, outside = tmp_path / "site", tmp_path / "shared" / "base.html"
+    (root / "proj").mkdir(parents=True)
+    outside.parent.mkdir()
+    inside = root / "proj" / "settings.py"
+    inside.write_text("A = 1\n")
+    outside.write_text("<html>v1</html>")
+    store = w.project_backup_store(root)
+    for p in (inside, outside):
+        w.backup_into(store, root, "s1", p)
+    files = store.load_session("s1")["files"]
+    assert set(files) == {"proj/settings.py", outside.resolve().as_posix()}
+    inside.write_text("A = 2\n")
+    outside.write_text("<html>v2</html>")
+    restored = store.restore("s1", root)
+    assert len(restored) == 2
+    assert inside.read_text() == "A = 1\n" and outside.read_text() == "<html>v1</html>"
+
+
+def test_backup_file_uses_the_project_store(tmp_path):
+    root = tmp_path / "site"
+    (root / "templates").mkdir(parents=True)
+    (root / "manage.py").write_text("")
+    index = root / "templates" / "index.html"
+    index.write_text("<html></html>")
+    w.backup_file(index, session="s1")
+    store = w.project_backup_store(root)
+    assert store.load_session("s1")["files"].keys() == {"templates/index.html"}
+    assert not list(tmp_path.rglob(".wizard_backups"))
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+import angular_django_wizard as w
+
+INDEX = ('<!doctype html><html><head><link rel="stylesheet" href="styles-EFGH5678.css"></head>'
+         '<body><app-root></app-root><script src="main-{}.js" type="module"></script></body></html>')
+
+
+def build(dist, version="ABCD1234"):
+    """Build Angular minimal : index.html + bundles hashés."""
+    dist.mkdir(parents=True, exist_ok=True)
+    (dist / "index.html").write_text(INDEX.format(version))
+    (dist / f"main-{version}.js").write_text(f"console.log('{version}')")
+    (dist / "styles-EFGH5678.css").write_text("body{}")
+    return dist
+
+
+@pytest.fixture
+def site(tmp_path):
+    return build(tmp_path / "dist"), tmp_path / "templates", tmp_path / "static"
+
+
+def test_cancelled_deploy_leaves_the_index_untouched(site):
+    dist, templates, static = site
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(w.OperationCancelled):
+        w.deploy_front(dist, templates, static, lambda msg: None, cancel=cancel)
+    assert not (templates / "index.html").exists()
+
+
+def test_deploy_writes_the_index_after_the_assets(site):
+    dist, templates, static = site
+    w.deploy_front(dist, templates, static, lambda msg: None)
+    html = (templates / "index.html").read_text()
+    assert "{% static 'main-ABCD1234.js' %}" in html
+    assert (static / "main-ABCD1234.js").exists()
+
+
+def test_noop_redeploys_keep_the_previous_release_for_gc(site):
+    dist, templates, static = site
+    log = lambda msg: None
+    w.deploy_front(dist, templates, static, log)
+    (dist / "main-ABCD1234.js").unlink()
+    build(dist, "WXYZ9876")
+    for _ in range(3):
+        w.deploy_front(dist, templates, static, log, mode="update")
+    manifest = w.load_manifest(w.manifest_path_for(static))
+    assert len(manifest["generations"]) == 2
+    assert w.gc_static(static, keep=2, dry_run=False)["deleted"] == 0
+    assert (static / "main-ABCD1234.js").exists()
+    report = w.gc_static(static, keep=1, dry_run=False)
+    assert report["files"] == ["main-ABCD1234.js"] and not (static / "main-ABCD1234.js").exists()
+
+
+def staged(dist, templates, static, strategy):
+    w.staged_deploy(dist, w.render_indexes(dist, templates, []), static, strategy=strategy)
+
+
+def live(templates, static):
+    """(bundle référencé par l'index, bundles présents dans static/)."""
+    version = (templates / "index.html").read_text().split("main-")[1][:8]
+    return version, sorted(p.name for p in static.glob("main-*.js"))
+
+
+@pytest.fixture(params=["symlink", "rename"])
+def upgraded(request, site):
+    """v1 déployé à l'ancienne (arbre réel), puis v2 construit dans dist/."""
+    dist, templates, static = site
+    w.deploy_front(dist, templates, static, lambda msg: None)
+    (dist / "main-ABCD1234.js").unlink()
+    build(dist, "WXYZ9876")
+    return dist, templates, static, request.param
+
+
+def test_staged_deploy_swaps_static_and_index(upgraded):
+    dist, templates, static, strategy = upgraded
+    staged(dist, templates, static, strategy)
+    assert live(templates, static) == ("WXYZ9876", ["main-ABCD1234.js", "main-WXYZ9876.js"])
+    assert static.is_symlink() == (strategy == "symlink")
+    assert "main-ABCD1234.js" in w._side(templates / "index.html", "previous").read_text()
+
+
+def test_failure_after_staging_leaves_the_live_tree(upgraded, monkeypatch):
+    dist, templates, static, strategy = upgraded
+
+    def broken(path, data):
+        raise OSError("disque plein")
+
+    with monkeypatch.context() as m:
+        m.setattr(w, "save_manifest", broken)
+        with pytest.raises(OSError):
+            staged(dist, templates, static, strategy)
+    assert live(templates, static) == ("ABCD1234", ["main-ABCD1234.js"])
+    assert not static.is_symlink()
+    staged(dist, templates, static, strategy)
+    assert live(templates, static)[0] == "WXYZ9876"
+
+
+def test_rollback_and_rollback_again(upgraded):
+    dist, templates, static, strategy = upgraded
+    staged(dist, templates, static, strategy)
+    assert w.rollback_deploy(templates, static) == strategy
+    assert live(templates, static) == ("ABCD1234", ["main-ABCD1234.js"])
+    w.rollback_deploy(templates, static)
+    assert live(templates, static) == ("WXYZ9876", ["main-ABCD1234.js", "main-WXYZ9876.js"])
+
+
+def test_rollback_without_previous_generation_fails(site):
+    dist, templates, static = site
+    w.deploy_front(dist, templates, static, lambda msg: None)
+    with pytest.raises(RuntimeError):
+        w.rollback_deploy(templates, static)
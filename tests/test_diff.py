@@ -0,0 +1,71 @@
+import difflib
+import random
+import re
+
+import pytest
+
+import angular_django_wizard as w
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def patch(a, diff):
+    """Applique une sortie unified_diff à a (vérifie au passage en-têtes et contexte)."""
+    out, pos = [], 0
+    for line in diff[2:]:
+        m = HUNK_RE.match(line)
+        if m:
+            start = int(m.group(1)) - (m.group(2) != "0")
+            out += a[pos:start]
+            pos = start
+        elif line[0] in " -":
+            assert a[pos] == line[1:]
+            pos += 1
+            if line[0] == " ":
+                out.append(line[1:])
+        else:
+            out.append(line[1:])
+    return out + a[pos:]
+
+
+def lcs(a, b):
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def lines(n, fmt="line {}\n"):
+    return [fmt.format(i) for i in range(n)]
+
+
+@pytest.mark.parametrize("a, b", [
+    ([], []),
+    (lines(5), lines(5)),
+    ([], lines(4)),                                   # tout insertion
+    (lines(4), []),                                   # tout suppression
+    (lines(30, "row {}\r\n"), lines(30, "row {}\r\n")[:12] + ["new\r\n"] + lines(30, "row {}\r\n")[14:]),
+    (["a\r\n", "b\r\n"], ["a\n", "b\n"]),             # seules les fins de ligne changent
+    (lines(100), lines(100)[:10] + ["X\n"] + lines(100)[12:50] + ["Y\n"] + lines(100)[50:90] + lines(100)[91:]),
+    (lines(3) + ["last"], lines(3) + ["last\n"]),     # pas de fin de ligne finale
+])
+def test_same_output_as_difflib(a, b):
+    assert w.unified_diff_lines(a, b, "f", "g") == list(difflib.unified_diff(a, b, "f", "g"))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits_are_minimal_and_apply(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        a = [rng.choice("abcde") + "\n" for _ in range(rng.randint(0, 30))]
+        b = [rng.choice("abcdef") + "\n" for _ in range(rng.randint(0, 30))]
+        codes = w.diff_opcodes(a, b)
+        assert sum(i2 - i1 for tag, i1, i2, _, _ in codes if tag == "equal") == lcs(a, b)
+        matched = sum(m.size for m in difflib.SequenceMatcher(None, a, b, autojunk=False).get_matching_blocks())
+        assert lcs(a, b) >= matched
+        diff = w.unified_diff_lines(a, b, "f", "g")
+        assert patch(a, diff) == b
+        assert (diff == []) == (a == b)
@@ -0,0 +1,33 @@
+import json
+import time
+
+import angular_django_wizard as w
+
+
+def workspace(folder, name):
+    folder.mkdir(parents=True)
+    build = {"builder": "@angular-devkit/build-angular:application", "options": {"outputPath": f"dist/{name}"}}
+    (folder / "angular.json").write_text(json.dumps({"projects": {name: {"architect": {"build": build}}}}))
+
+
+def test_scan_is_limited_to_the_project_and_known_siblings(tmp_path):
+    home, cache = tmp_path / "home", tmp_path / "cache.json"
+    (home / "backend").mkdir(parents=True)
+    workspace(home / "frontend", "shop")
+    workspace(home / "admin-ui", "admin")                  # frère portant une config
+    workspace(home / "photos" / "2019" / "old-app", "old")  # dossier quelconque du parent : ignoré
+    found = {r["project"] for r in w.discover_dist(home / "backend", cache_path=cache)}
+    assert found == {"shop", "admin"}
+    dirs = json.loads(cache.read_text())["dirs"]
+    assert not [d for d in dirs if "photos" in d]
+
+
+def test_stale_cache_entries_expire(tmp_path):
+    root, cache = tmp_path / "site", tmp_path / "cache.json"
+    root.mkdir()
+    old = int(time.time()) - w.DISCOVER_CACHE_TTL - 1
+    stale = {"mtime": 0, "configs": [], "subdirs": [], "seen": old}
+    cache.write_text(json.dumps({"dirs": {"/gone/project": stale}, "configs": {}}))
+    w.discover_dist(root, cache_path=cache)
+    dirs = json.loads(cache.read_text())["dirs"]
+    assert "/gone/project" not in dirs and str(root) in dirs
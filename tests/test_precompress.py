@@ -0,0 +1,21 @@
+import os
+
+import angular_django_wizard as w
+
+
+def test_unprofitable_outputs_are_remembered(tmp_path):
+    static, state = tmp_path / "static", tmp_path / "state.json"
+    static.mkdir()
+    noise = static / "noise-ABCD1234.js"
+    noise.write_bytes(os.urandom(4096))  # incompressible : aucune sortie rentable
+    text = static / "main-EFGH5678.js"
+    text.write_text("console.log('angular');\n" * 200)
+    rels = ["noise-ABCD1234.js", "main-EFGH5678.js"]
+    first = w.precompress_tree(static, rels, state)
+    assert first["compressed"] == 2
+    assert not (static / "noise-ABCD1234.js.gz").exists() and (static / "main-EFGH5678.js.gz").exists()
+    for p in (noise, text):  # recopie à l'identique : nouvelle mtime, même contenu
+        st = p.stat()
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    again = w.precompress_tree(static, rels, state)
+    assert again["compressed"] == 0 and again["uptodate"] == 2
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+import angular_django_wizard as w
+
+MANAGE = 'import os\nos.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj.settings")\n'
+SETTINGS = '''from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent
+ROOT_URLCONF = "proj.urls"
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+]
+TEMPLATES = [{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "DIRS": [
+        BASE_DIR / "other"  # gabarits partagés
+    ],
+}]
+STATIC_URL = "static/"
+'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "proj").mkdir()
+    (tmp_path / "manage.py").write_text(MANAGE)
+    (tmp_path / "proj" / "settings.py").write_text(SETTINGS)
+    return tmp_path
+
+
+def touch(p, text):
+    st = p.stat()
+    p.write_text(text)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_missing_urls_is_cached_until_created(project):
+    first = w.django_project(project)
+    assert first.urls_py is None
+    assert w.django_project(project) is first
+    first.default_urls_path().write_text(w.EMPTY_URLS)
+    second = w.django_project(project)
+    assert second is not first and second.urls_py == project / "proj" / "urls.py"
+
+
+def test_settings_change_rebuilds_the_model(project):
+    first = w.django_project(project)
+    settings = project / "proj" / "settings.py"
+    touch(settings, SETTINGS.replace('"proj.urls"', '"proj.routes"'))
+    second = w.django_project(project)
+    assert second is not first and second.urls_target() == project / "proj" / "routes.py"
+
+
+def test_settings_edits_follow_the_ast():
+    txt = w.idempotent_add_settings(SETTINGS, None, ["app.Middleware"], production=False)
+    assert 'BASE_DIR / "other", BASE_DIR / "templates"  # gabarits partagés' in txt
+    assert '"django.middleware.security.SecurityMiddleware",\n    "app.Middleware",' in txt
+    assert w.idempotent_add_settings(txt, None, ["app.Middleware"]) == txt
+    commented = "# STATICFILES_STORAGE = 'x.Storage'\n" + SETTINGS
+    assert 'STORAGES = {' in w.ensure_static_storage(commented, "x.Storage")
+
+
+def test_unparseable_settings_are_refused():
+    with pytest.raises(SyntaxError, match="settings.py illisible"):
+        w.idempotent_add_settings("TEMPLATES = [\n")
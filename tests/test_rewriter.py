@@ -0,0 +1,58 @@
+import pytest
+
+import angular_django_wizard as w
+
+rewrite = w.rewrite_static_urls
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<script src="main-ABCD1234.js"></script>', '<script src="{% static \'main-ABCD1234.js\' %}"></script>'),
+    ("<link href='styles.css'>", "<link href='{% static 'styles.css' %}'>"),
+    ("<img src=logo.png alt=x>", "<img src={% static 'logo.png' %} alt=x>"),
+    ('<img SRC="/media/a.png">', '<img SRC="{% static \'media/a.png\' %}">'),
+    ('<img src="it\'s.png">', '<img src="it\'s.png">'),               # apostrophe : hors {% static '…' %}
+])
+def test_attribute_quoting_is_preserved(html, expected):
+    assert rewrite(html) == expected
+
+
+def test_srcset_candidates():
+    html = '<img srcset="a.png 1x,b.png 2x, https://cdn/c.png 3x">'
+    assert rewrite(html) == ('<img srcset="{% static \'a.png\' %} 1x,{% static \'b.png\' %} 2x, '
+                             'https://cdn/c.png 3x">')
+
+
+def test_style_attribute_urls():
+    html = """<div style="background:url('bg.png'), url(data:image/png;base64,AA), url(&quot;x.png&quot;)">"""
+    out = rewrite(html)
+    assert "url('{% static 'bg.png' %}')" in out and "url(data:image/png;base64,AA)" in out
+
+
+def test_style_blocks_are_rewritten_script_blocks_are_not():
+    html = ('<STYLE media="print">body{background:url(/bg.png)}.f{src:url("media/f.woff2")}</STYLE>'
+            '<script>const u = "url(a.png)"; el.src = "b.png";</script>'
+            '<style>.x{background:url(https://cdn/x.png)}</style>')
+    assert rewrite(html) == (
+        '<STYLE media="print">body{background:url({% static \'bg.png\' %})}'
+        '.f{src:url("{% static \'media/f.woff2\' %}")}</STYLE>'
+        '<script>const u = "url(a.png)"; el.src = "b.png";</script>'
+        '<style>.x{background:url(https://cdn/x.png)}</style>')
+
+
+def test_meta_base_and_comments_are_untouched():
+    html = '<base href="/"><meta content="/x.png"><!-- <img src="c.png"> --><a href="#top"></a>'
+    assert rewrite(html) == html
+
+
+def test_locale_prefix():
+    assert rewrite('<img src="logo.png">', "fr/") == '<img src="{% static \'fr/logo.png\' %}">'
+
+
+def test_rendered_urls(dj):
+    from django.template import engines
+    html = ("{% load static %}<img src=logo.png srcset='a.png 2x'>"
+            "<style>body{background:url('/bg.png')}</style><div style=\"background:url(x.png)\">")
+    out = engines["django"].from_string(rewrite(html)).render({})
+    assert out == ("<img src=/static/logo.png srcset='/static/a.png 2x'>"
+                   "<style>body{background:url('/static/bg.png')}</style>"
+                   "<div style=\"background:url(/static/x.png)\">")
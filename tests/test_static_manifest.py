@@ -0,0 +1,28 @@
+import re
+import sys
+
+import angular_django_wizard as w
+
+DOUBLE_HASHED_RE = re.compile(r"\.[0-9a-f]{12}\.[0-9a-f]{12}\.")
+
+
+def test_collectstatic_does_not_rehash_the_wizard_copies(dj, tmp_path, monkeypatch):
+    from django.core.management import call_command
+    from django.test import override_settings
+    static, root = tmp_path / "static", tmp_path / "collected"
+    (static / "media").mkdir(parents=True)
+    (static / "main-ABCD1234.js").write_text("console.log(1)")
+    (static / "styles-EFGH5678.css").write_text("body{background:url(media/bg.png)}")
+    (static / "media" / "bg.png").write_bytes(b"\x89PNG")
+    (static / "favicon.ico").write_bytes(b"ico")
+    manifest = w.write_static_manifest(static)
+    assert manifest["generated"]
+    w.ensure_wizard_support(tmp_path / "settings.py")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    sys.modules.pop("wizard_support", None)
+    storages = {"staticfiles": {"BACKEND": "wizard_support.PrebuiltManifestStaticFilesStorage"}}
+    with override_settings(STATIC_ROOT=str(root), STATICFILES_DIRS=[str(static)], STORAGES=storages):
+        call_command("collectstatic", interactive=False, verbosity=0)
+    names = {p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file()}
+    assert not [n for n in names if DOUBLE_HASHED_RE.search(n)]
+    assert {"main-ABCD1234.js", "styles-EFGH5678.css", *manifest["generated"]} <= names
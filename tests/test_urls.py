@@ -0,0 +1,75 @@
+import importlib
+import sys
+
+import pytest
+
+import angular_django_wizard as w
+
+PROJECT_URLS = '''from django.http import HttpResponse
+from django.urls import include, path
+
+def health(request):
+    return HttpResponse("ok")
+
+urlpatterns = [
+    path("health", health),
+    path("", include("{sub}")),
+    path("api/", include("{sub}")),
+]
+'''
+
+SUB_URLS = '''from django.http import HttpResponse
+from django.urls import path
+
+def about(request):
+    return HttpResponse("about")
+
+urlpatterns = [path("about", about)]
+'''
+
+
+def test_fallback_is_the_last_urlpatterns_statement():
+    txt = w.idempotent_add_urls(w.EMPTY_URLS)
+    last = txt.rstrip().splitlines()[-1]
+    assert last.startswith('urlpatterns += [re_path(r"^(?!') and "index.html" in last
+    assert txt.index("staticfiles_urlpatterns()") < txt.index(last)
+    assert w.idempotent_add_urls(txt) == txt
+
+
+def test_fallback_at_the_top_or_followed_by_routes_moves_to_the_end():
+    top = w.idempotent_add_urls(w.EMPTY_URLS).replace(
+        "urlpatterns = [", 'urlpatterns = [\n    re_path(r"^(?!static/|media/)(?:.*)/?$", '
+                          'TemplateView.as_view(template_name="index.html")),', 1)
+    top = top[:top.rindex("urlpatterns += [re_path")]
+    txt = w.idempotent_add_urls(top)
+    assert txt.count("re_path(r\"^(?!") == 1
+    assert txt.rstrip().splitlines()[-1].startswith("urlpatterns += [re_path")
+    later = w.idempotent_add_urls(txt + 'urlpatterns += [path("late/", late)]\n')
+    assert later.count("re_path(r\"^(?!") == 1
+    assert later.index('path("late/"') < later.index('re_path(r"^(?!')
+    assert "(?:late|media|static)" in later
+
+
+def test_project_routes_resolve_before_the_fallback(dj, tmp_path, monkeypatch):
+    from django.urls import Resolver404, resolve
+    from django.views.generic import TemplateView
+    (tmp_path / "spa_sub_urls.py").write_text(SUB_URLS)
+    urls = w.idempotent_add_urls(PROJECT_URLS.format(sub="spa_sub_urls"))
+    (tmp_path / "spa_root_urls.py").write_text(urls)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("spa_root_urls", "spa_sub_urls"):
+        sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+
+    def view(url):
+        return resolve(url, urlconf="spa_root_urls").func
+
+    assert view("/health").__name__ == "health"
+    assert view("/about").__name__ == "about"
+    assert view("/api/about").__name__ == "about"
+    assert view("/").view_class is TemplateView
+    assert view("/users/john.doe").view_class is TemplateView
+    assert view("/dashboard/settings/").view_class is TemplateView
+    for url in ("/api/missing", "/static/app.js", "/favicon.ico", "/wp-login.php"):
+        with pytest.raises(Resolver404):
+            view(url)
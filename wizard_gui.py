@@ -0,0 +1,1362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Angular → Django Wizard — interface Tkinter.
+Importé uniquement au lancement du GUI : le CLI (angular_django_wizard.py <commande>)
+ne charge ni tkinter ni ttk/filedialog.
+"""
+
+import bisect
+import functools
+import queue
+import time
+import threading
+from collections import deque
+from pathlib import Path
+
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk, filedialog, messagebox, simpledialog
+
+from angular_django_wizard import (
+    DEFAULT_PROFILE, DEFAULT_LOG_FILE, open_log_file, GC_KEEP_GENERATIONS, MAX_GENERATIONS, BACKUP_KEEP_SESSIONS, BACKUP_KEEP_DAYS,
+    nowstamp, write_text, short, human_bytes,
+    EMPTY_URLS, load_profile, save_profile, normalize_paths, django_project, parsed_source,
+    project_backup_store, backup_into, idempotent_add_settings, idempotent_add_urls,
+    deploy_front, plan_deploy, plan_summary, PLAN_STATUSES, PLAN_LABELS, watch_dist, rollback_deploy, gc_static, native_collectstatic, OperationCancelled, run_manage, manage_cmd,
+    DjangoWorker, prebuilt_storage_backend, ensure_wizard_support, detect_locales, has_index,
+    project_static_url, preload_middleware_path, index_no_cache_middleware_path,
+    support_module_for, project_url_prefixes, diff_hunks, hunk_header, hunk_context,
+    load_projects, save_projects, discover_dist, batch_deploy, batch_summary, BATCH_STEPS, BATCH_WORKERS, PROFILE_KEYS,
+)
+
+# ---------- Tâches de fond ----------
+class TaskRunner:
+    """
+    Exécute une opération longue dans un thread de travail, une à la fois.
+    Le thread ne touche jamais Tk : il poste des callables dans une file
+    thread-safe, vidée côté Tk par after() polling.
+    """
+    POLL_MS = 50
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.queue = queue.Queue()
+        self.latest = {}
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def busy(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def post(self, fn, *args):
+        """Appelable depuis n'importe quel thread : fn(*args) sera exécuté dans le thread Tk."""
+        self.queue.put((fn, args))
+
+    def post_latest(self, key, fn, *args):
+        """Comme post(), mais seule la dernière valeur par clé est appliquée (progression)."""
+        self.latest[key] = (fn, args)
+
+    def run(self, job, on_done, on_error):
+        """job(cancel_event) dans le thread ; on_done(résultat) / on_error(exc) dans le thread Tk."""
+        if self.busy():
+            return False
+        self.cancel_event = threading.Event()
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = job(self.cancel_event)
+            except BaseException as e:
+                outcome["error"] = e
+
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+        self.widget.after(self.POLL_MS, self._poll, on_done, on_error, outcome)
+        return True
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _drain(self):
+        while True:
+            try:
+                fn, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            fn(*args)
+        for key in list(self.latest):
+            fn, args = self.latest.pop(key)
+            fn(*args)
+
+    def _poll(self, on_done, on_error, outcome):
+        self._drain()
+        if self.thread.is_alive():
+            self.widget.after(self.POLL_MS, self._poll, on_done, on_error, outcome)
+            return
+        self._drain()
+        if "error" in outcome:
+            on_error(outcome["error"])
+        else:
+            on_done(outcome.get("result"))
+
+# ---------- Journal ----------
+class LogSink:
+    """
+    Journal tamponné pour un Text : write() est O(1) et thread-safe, le widget
+    n'est mis à jour qu'une fois par FLUSH_MS (un seul insert, un seul see()).
+    Le widget est un anneau borné : au-delà de max_lines, les plus anciennes
+    lignes sont supprimées. file_fn optionnel : reçoit chaque message (journal complet).
+    """
+    FLUSH_MS = 100
+    MAX_LINES = 5000
+
+    def __init__(self, tk_root, scroll_text, status_var=None, max_lines=MAX_LINES):
+        self.root = tk_root
+        self.text = scroll_text
+        self.status_var = status_var
+        self.max_lines = max_lines
+        self.file_fn = None
+        self.pending = deque()
+        self.root.after(self.FLUSH_MS, self._flush)
+
+    def write(self, msg: str):
+        self.pending.append(msg)
+        if self.file_fn:
+            self.file_fn(msg)
+
+    def _flush(self):
+        lines = []
+        while self.pending:
+            lines.append(self.pending.popleft())
+        if lines:
+            # tampon déjà plus long que l'anneau : inutile d'insérer ce qui serait supprimé
+            self.text.insert("end", "\n".join(lines[-self.max_lines:]) + "\n")
+            excess = int(self.text.widget().index("end-1c").split(".")[0]) - 1 - self.max_lines
+            if excess > 0:
+                self.text.delete("1.0", f"{excess + 1}.0")
+            self.text.see("end")
+            if self.status_var is not None:
+                self.status_var.set(lines[-1])
+        self.root.after(self.FLUSH_MS, self._flush)
+
+# ---------- Plan de déploiement ----------
+PLAN_PAGE = 500  # fichiers insérés à la fois dans un dossier de l'arbre
+PLAN_SIGNS = {"new": "+", "changed": "~", "unchanged": "=", "orphaned": "−"}
+PLAN_COLORS = {"new": "#1a7f37", "changed": "#9a6700", "unchanged": "#57606a", "orphaned": "#cf222e"}
+
+def plan_index(entries: dict) -> dict:
+    """
+    {dossier: {"dirs", "files", "counts", "bytes"}} depuis les entrées de plan_deploy :
+    calculé une fois (thread de travail), l'arbre n'insère ensuite que les dossiers dépliés.
+    Fichiers triés par statut (nouveaux et modifiés d'abord) puis par nom.
+    """
+    index = {}
+    def node(folder):
+        return index.setdefault(folder, {"dirs": set(), "files": [], "counts": dict.fromkeys(PLAN_STATUSES, 0), "bytes": 0})
+    for rel, (status, size) in entries.items():
+        folder, _, name = rel.rpartition("/")
+        node(folder)["files"].append((name, status, size))
+    node("")
+    order = {s: i for i, s in enumerate(PLAN_STATUSES)}
+    for folder in list(index):
+        files = index[folder]["files"]
+        files.sort(key=lambda f: (order[f[1]], f[0]))
+        counts, nbytes = dict.fromkeys(PLAN_STATUSES, 0), 0
+        for _, status, size in files:
+            counts[status] += 1
+            nbytes += size
+        # totaux du dossier reportés sur lui-même et ses ancêtres (une fois par dossier, pas par fichier)
+        parts = folder.split("/") if folder else []
+        for k in range(len(parts) + 1):
+            n = node("/".join(parts[:k]))
+            if k < len(parts):
+                n["dirs"].add(parts[k])
+            n["bytes"] += nbytes
+            for status, c in counts.items():
+                n["counts"][status] += c
+    return index
+
+# ---------- Widgets helper ----------
+class ScrollText(tk.Frame):
+    """Text + scrollbar verticale, simple."""
+    def __init__(self, master, **kwargs):
+        super().__init__(master)
+        self.text = tk.Text(self, **kwargs)
+        sb = ttk.Scrollbar(self, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=sb.set)
+        self.text.pack(side="left", fill="both", expand=True)
+        sb.pack(side="right", fill="y")
+
+    def insert(self, *a, **k): self.text.insert(*a, **k)
+    def delete(self, *a, **k): self.text.delete(*a, **k)
+    def see(self, *a, **k): self.text.see(*a, **k)
+    def get(self, *a, **k): return self.text.get(*a, **k)
+    def widget(self): return self.text
+
+class DiffView(tk.Frame):
+    """
+    Visionneuse de diff virtualisée : la scrollbar couvre toutes les lignes du diff,
+    mais seuls les hunks dans le viewport sont matérialisés et insérés (un seul insert).
+    Unifié ou côte à côte (side_by_side), en-têtes de hunk colorés avec contexte façon git.
+    """
+    MARGIN = 10  # lignes rendues au-delà du viewport
+    MAX_COL = 100  # largeur max d'une colonne en côte à côte
+
+    def __init__(self, master, side_by_side=None, **kwargs):
+        super().__init__(master)
+        self.side_by_side = side_by_side or tk.BooleanVar(value=False)
+        self.text = tk.Text(self, wrap="none", **kwargs)
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        hbar = ttk.Scrollbar(self, orient="horizontal", command=self.text.xview)
+        self.text.configure(xscrollcommand=hbar.set)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        hbar.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1); self.columnconfigure(0, weight=1)
+        self.text.tag_configure("file", font=("Consolas", 10, "bold"))
+        self.text.tag_configure("hunk", foreground="#0550ae", background="#ddf4ff")
+        self.text.tag_configure("ctx", foreground="#8250df", background="#ddf4ff")
+        self.text.tag_configure("add", background="#e6ffec")
+        self.text.tag_configure("del", background="#ffebe9")
+        self.text.tag_configure("lno", foreground="#8c959f")
+        self.linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        self.a, self.b, self.files, self.hunks = [], [], ("", ""), []
+        self.starts, self.total, self.top, self.width, self.rows = [], 0, 0, 0, {}
+        for seq, step in (("<Button-4>", -3), ("<Button-5>", 3), ("<Up>", -1), ("<Down>", 1)):
+            self.text.bind(seq, lambda e, s=step: self._scroll(s))
+        self.text.bind("<Prior>", lambda e: self._scroll(-self._visible()))
+        self.text.bind("<Next>", lambda e: self._scroll(self._visible()))
+        self.text.bind("<MouseWheel>", lambda e: self._scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Configure>", lambda e: self._render())
+        self.side_by_side.trace_add("write", lambda *_: self._layout())
+        self._layout()
+
+    def show(self, a: list, b: list, fromfile: str, tofile: str):
+        self.a, self.b, self.files = a, b, (fromfile, tofile)
+        self.hunks = diff_hunks(a, b)
+        self.top = 0
+        self._layout()
+
+    # hauteurs cumulées (bon marché : tailles des opcodes), lignes rendues à la demande
+    def _layout(self):
+        side = self.side_by_side.get()
+        self.rows.clear()
+        self.starts, pos = [], 2  # ---/+++
+        for hunk in self.hunks:
+            self.starts.append(pos)
+            pos += 1 + sum(i2 - i1 if tag == "equal" else max(i2 - i1, j2 - j1) if side else i2 - i1 + j2 - j1
+                           for tag, i1, i2, j1, j2 in hunk)
+        self.total = pos if self.hunks else 1
+        if side:
+            widths = [len(self.a[i].rstrip("\n").expandtabs(4)) for h in self.hunks for _, i1, i2, _, _ in h for i in range(i1, i2)]
+            self.width = min(self.MAX_COL, max(widths, default=1))
+        self._render()
+
+    def _hunk_rows(self, k: int) -> list:
+        """Lignes du hunk k : listes de segments (texte, tag)."""
+        rows = self.rows.get(k)
+        if rows is not None:
+            return rows
+        hunk = self.hunks[k]
+        context = hunk_context(self.a, hunk[0][1])
+        rows = [[(hunk_header(hunk), "hunk"), (" " + context if context else "", "ctx")]]
+        side = self.side_by_side.get()
+        for tag, i1, i2, j1, j2 in hunk:
+            left, right = self.a[i1:i2], self.b[j1:j2]
+            if not side:
+                if tag == "equal":
+                    rows.extend([(" " + line.rstrip("\n"), "")] for line in left)
+                else:
+                    rows.extend([("-" + line.rstrip("\n"), "del")] for line in left)
+                    rows.extend([("+" + line.rstrip("\n"), "add")] for line in right)
+                continue
+            for t in range(max(len(left), len(right))):
+                la = left[t].rstrip("\n").expandtabs(4) if t < len(left) else None
+                lb = right[t].rstrip("\n").expandtabs(4) if t < len(right) else None
+                rows.append([
+                    (f"{i1 + t + 1:>5} " if la is not None else " " * 6, "lno"),
+                    (self._fit(la or ""), "" if tag == "equal" or la is None else "del"),
+                    (" │", "lno"),
+                    (f"{j1 + t + 1:>5} " if lb is not None else " " * 6, "lno"),
+                    (lb or "", "" if tag == "equal" or lb is None else "add"),
+                ])
+        self.rows[k] = rows
+        return rows
+
+    def _fit(self, s: str) -> str:
+        return s[:self.width - 1] + "…" if len(s) > self.width else s.ljust(self.width)
+
+    def _visible(self) -> int:
+        h = self.text.winfo_height()
+        return max(1, h // self.linespace if h > 1 else int(self.text.cget("height")))
+
+    def _render(self):
+        t = self.text
+        t.configure(state="normal")
+        t.delete("1.0", "end")
+        if not self.hunks:
+            t.insert("1.0", "Aucune modification requise.")
+            self.vbar.set(0, 1)
+            t.configure(state="disabled")
+            return
+        vis = self._visible()
+        self.top = max(0, min(self.top, self.total - vis))
+        first, last = self.top, min(self.total, self.top + vis + self.MARGIN)
+        rows = [[(f"--- {self.files[0]}", "file")], [(f"+++ {self.files[1]}", "file")]][first:last]
+        k = max(0, bisect.bisect_right(self.starts, first) - 1)
+        while k < len(self.hunks) and self.starts[k] < last:
+            start = self.starts[k]
+            rows.extend(self._hunk_rows(k)[max(0, first - start):last - start])
+            k += 1
+        args = []
+        for row in rows:
+            for text, tag in row:
+                args += [text, tag]
+            args += ["\n", ""]
+        t.insert("end", *args[:-2])
+        t.yview_moveto(0)
+        t.configure(state="disabled")
+        self.vbar.set(first / self.total, min(1.0, (first + vis) / self.total))
+
+    def _scroll(self, lines: int):
+        self.top += lines
+        self._render()
+        return "break"
+
+    def _yview(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self._visible() if args[2] == "pages" else 1)
+        self._render()
+
+class CollapsibleSection(ttk.Frame):
+    """Section repliable : header avec bouton, body scrollable optionnel."""
+    def __init__(self, master, title="Section", initially_open=True):
+        super().__init__(master)
+        self._open = initially_open
+        self.header = ttk.Frame(self)
+        self.header.pack(fill="x")
+        self.btn = ttk.Button(self.header, text=f"{title} ⯆" if self._open else f"{title} ⯈", command=self.toggle)
+        self.btn.pack(side="left", padx=(0,6))
+        self.body = ttk.Frame(self)
+        if self._open:
+            self.body.pack(fill="x")
+
+    def toggle(self):
+        self._open = not self._open
+        self.btn.configure(text=self.btn.cget("text").replace("⯆","⯈") if not self._open else self.btn.cget("text").replace("⯈","⯆"))
+        if self._open:
+            self.body.pack(fill="x")
+        else:
+            self.body.forget()
+
+    def open(self):
+        if not self._open:
+            self.toggle()
+
+    def close(self):
+        if self._open:
+            self.toggle()
+
+# ---------- UI principale ----------
+class Wizard(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Angular → Django Wizard")
+        self.geometry("1120x760")
+
+        # Mode
+        self.mode = tk.StringVar(value="install")
+
+        # State (paths)
+        self.project_root = tk.StringVar()
+        self.manage_py    = tk.StringVar()
+        self.dist_folder  = tk.StringVar()
+        self.templates_dir= tk.StringVar()
+        self.static_dir   = tk.StringVar()
+
+        # GC des anciennes générations de bundles
+        self.gc_keep = tk.IntVar(value=GC_KEEP_GENERATIONS)
+        self.gc_after_deploy = tk.BooleanVar(value=False)
+        self.staged = tk.BooleanVar(value=False)
+        self.precompress = tk.BooleanVar(value=False)
+        self.static_manifest = tk.BooleanVar(value=False)  # staticfiles.json pré-calculé (settings + déploiement)
+        self.modulepreload = tk.BooleanVar(value=False)    # <link rel=modulepreload> + middleware Link
+        self.production = tk.BooleanVar(value=False)       # WhiteNoise : immutable + compression
+        self.cached_index = tk.BooleanVar(value=False)     # SpaIndexView : index en mémoire, ETag/304
+        self.diff_side_by_side = tk.BooleanVar(value=False)  # visionneuse de diff côte à côte
+        self.watching = False                              # mode watch en cours (TaskRunner occupé)
+        self.project = None                                # DjangoProject mémorisé (voir project_model)
+
+        # Refs UI
+        self.logs = None
+        self.settings_diff = None
+        self.urls_diff = None
+        self.collect_out = None
+        self.paths_section = None
+        self.status_var = tk.StringVar(value="Prêt.")
+        self.log_sink = None
+        self.collect_sink = None
+        self.log_to_file = tk.BooleanVar(value=False)
+        self.progress = None
+        self.progress_var = tk.StringVar(value="")
+        self.tasks = TaskRunner(self)
+        self.use_worker = tk.BooleanVar(value=False)
+        self.worker = None
+
+        # Backups session
+        self.run_stamp = nowstamp()
+        self.backup_store = None  # set après confirmation des chemins
+
+        self._build_menu()
+        self._build_layout()
+
+        # Charger profil local (si dispo) et décider visibilité chemins
+        self._load_state(DEFAULT_PROFILE, quiet=True)
+        self.detect_dist(quiet=True)  # instantané grâce au cache (mtimes des dossiers)
+        self._auto_paths_visibility()
+
+    # ----- Menu -----
+    def _build_menu(self):
+        menubar = tk.Menu(self); self.config(menu=menubar)
+        m_file = tk.Menu(menubar, tearoff=0)
+        m_file.add_command(label="Quitter", command=self.destroy)
+        menubar.add_cascade(label="Fichier", menu=m_file)
+
+        m_cfg = tk.Menu(menubar, tearoff=0)
+        m_cfg.add_command(label="Charger depuis JSON…", command=self.menu_load_json)
+        m_cfg.add_command(label="Sauver vers JSON…", command=self.menu_save_json)
+        m_cfg.add_separator()
+        m_cfg.add_command(label="Basculer Chemins (afficher/masquer)", command=self.toggle_paths)
+        m_cfg.add_checkbutton(label=f"Journal sur disque ({short(DEFAULT_LOG_FILE)})",
+                              variable=self.log_to_file, command=self.toggle_log_file)
+        menubar.add_cascade(label="Config", menu=m_cfg)
+
+        m_bak = tk.Menu(menubar, tearoff=0)
+        m_bak.add_command(label="Restaurer une session…", command=self.menu_restore_backup)
+        m_bak.add_command(label="Appliquer la rétention", command=self.menu_prune_backups)
+        menubar.add_cascade(label="Backups", menu=m_bak)
+
+        m_proj = tk.Menu(menubar, tearoff=0)
+        m_proj.add_command(label="Déploiement multi-projets (batch)…", command=self.menu_batch)
+        menubar.add_cascade(label="Projets", menu=m_proj)
+
+        m_help = tk.Menu(menubar, tearoff=0)
+        m_help.add_command(label="À propos", command=lambda: messagebox.showinfo(
+            "À propos",
+            "Angular → Django Wizard\nUI compacte, chemins auto-hide, JSON config.\nStdlib only."
+        ))
+        menubar.add_cascade(label="Aide", menu=m_help)
+
+    # ----- Layout -----
+    def _build_layout(self):
+        root = ttk.Frame(self, padding=10)
+        root.pack(fill="both", expand=True)
+
+        # topbar
+        bar = ttk.Frame(root)
+        bar.pack(fill="x")
+        ttk.Label(bar, text="Mode :", font=("Segoe UI", 10, "bold")).pack(side="left")
+        ttk.Radiobutton(bar, text="Installation", variable=self.mode, value="install").pack(side="left", padx=8)
+        ttk.Radiobutton(bar, text="Mise à jour", variable=self.mode, value="update").pack(side="left", padx=8)
+        ttk.Button(bar, text="Chemins ⯈/⯆", command=self.toggle_paths).pack(side="right")
+
+        # Chemins (collapsible)
+        self.paths_section = CollapsibleSection(root, title="Chemins", initially_open=True)
+        self.paths_section.pack(fill="x", pady=(8,0))
+        self._build_paths_body(self.paths_section.body)
+
+        # Notebook
+        nb = ttk.Notebook(root)
+        nb.pack(fill="both", expand=True, pady=(8,0))
+
+        # settings
+        p1 = ttk.Frame(nb, padding=8)
+        nb.add(p1, text="1) settings.py")
+        self._build_settings_page(p1)
+
+        # urls
+        p2 = ttk.Frame(nb, padding=8)
+        nb.add(p2, text="2) urls.py")
+        self._build_urls_page(p2)
+
+        # deploy
+        p3 = ttk.Frame(nb, padding=8)
+        nb.add(p3, text="3) Déploiement Angular")
+        self._build_deploy_page(p3)
+
+        # collectstatic
+        p4 = ttk.Frame(nb, padding=8)
+        nb.add(p4, text="4) collectstatic (optionnel)")
+        self._build_collectstatic_page(p4)
+
+        # logs
+        p5 = ttk.Frame(nb, padding=8)
+        nb.add(p5, text="Logs")
+        self._build_logs_page(p5)
+
+        # status bar
+        status = ttk.Frame(root)
+        status.pack(fill="x", pady=(6,0))
+        ttk.Label(status, textvariable=self.status_var, anchor="w").pack(fill="x")
+
+    def _build_paths_body(self, parent):
+        def row(lbl, var, pick_cmd, hint=None):
+            fr = ttk.Frame(parent); fr.pack(fill="x", pady=4)
+            ttk.Label(fr, text=lbl).pack(anchor="w")
+            ed = ttk.Entry(fr, textvariable=var)
+            ed.pack(side="left", fill="x", expand=True, padx=(0,8))
+            ttk.Button(fr, text="Parcourir…", command=pick_cmd).pack(side="left")
+            if hint:
+                ttk.Label(parent, text=hint).pack(anchor="w", padx=(4,0))
+
+        row("Projet Django (sélectionne un fichier DANS le dossier) :", self.project_root, self.pick_project_root)
+        row("manage.py :", self.manage_py, self.pick_manage)
+        fr = ttk.Frame(parent); fr.pack(fill="x", pady=4)
+        ttk.Label(fr, text="dist Angular (builds détectés via angular.json / project.json, le plus récent en tête) :").pack(anchor="w")
+        self.dist_combo = ttk.Combobox(fr, textvariable=self.dist_folder)
+        self.dist_combo.pack(side="left", fill="x", expand=True, padx=(0,8))
+        ttk.Button(fr, text="Détecter", command=self.detect_dist).pack(side="left", padx=(0,6))
+        ttk.Button(fr, text="Parcourir…", command=self.pick_dist).pack(side="left")
+        ttk.Label(parent, text="Astuce: sinon, choisis index.html DANS dist/<app>/browser.").pack(anchor="w", padx=(4,0))
+        row("templates/ :", self.templates_dir, lambda: self.pick_dir_into_var(self.templates_dir))
+        row("static/ :", self.static_dir, lambda: self.pick_dir_into_var(self.static_dir))
+
+        act = ttk.Frame(parent); act.pack(fill="x", pady=(6,0))
+        ttk.Button(act, text="Charger JSON…", command=self.menu_load_json).pack(side="left")
+        ttk.Button(act, text="Sauver JSON…", command=self.menu_save_json).pack(side="left", padx=6)
+        ttk.Button(act, text="Confirmer les chemins", command=self.confirm_paths).pack(side="right")
+
+    # ----- Pages -----
+    def _build_settings_page(self, parent):
+        ttk.Label(parent, text="Prévisualiser et appliquer les modifications idempotentes à settings.py").pack(anchor="w")
+        controls = ttk.Frame(parent); controls.pack(fill="x", pady=6)
+        ttk.Button(controls, text="Prévisualiser diff", command=self.preview_settings_diff).pack(side="left")
+        ttk.Button(controls, text="Appliquer", command=self.apply_settings).pack(side="left", padx=6)
+        ttk.Checkbutton(controls, text="Stockage staticfiles.json pré-calculé (sans post-traitement)",
+                        variable=self.static_manifest).pack(side="left", padx=12)
+        ttk.Checkbutton(controls, text="Middleware Link: modulepreload",
+                        variable=self.modulepreload).pack(side="left")
+        ttk.Checkbutton(controls, text="Production (WhiteNoise, bundles immuables)",
+                        variable=self.production).pack(side="left", padx=12)
+        ttk.Checkbutton(controls, text="Côte à côte", variable=self.diff_side_by_side).pack(side="right")
+        st = DiffView(parent, self.diff_side_by_side, height=22); st.pack(fill="both", expand=True)
+        self.settings_diff = st
+
+    def _build_urls_page(self, parent):
+        ttk.Label(parent, text="Prévisualiser et appliquer les modifications idempotentes à urls.py").pack(anchor="w")
+        controls = ttk.Frame(parent); controls.pack(fill="x", pady=6)
+        ttk.Button(controls, text="Prévisualiser diff", command=self.preview_urls_diff).pack(side="left")
+        ttk.Button(controls, text="Appliquer", command=self.apply_urls).pack(side="left", padx=6)
+        ttk.Checkbutton(controls, text="Index en mémoire (ETag/304)",
+                        variable=self.cached_index).pack(side="left", padx=12)
+        ttk.Checkbutton(controls, text="Côte à côte", variable=self.diff_side_by_side).pack(side="right")
+        st = DiffView(parent, self.diff_side_by_side, height=22); st.pack(fill="both", expand=True)
+        self.urls_diff = st
+
+    def _build_deploy_page(self, parent):
+        ttk.Label(parent, text="Transformer index.html et copier les assets vers static/").pack(anchor="w")
+        run = ttk.Frame(parent); run.pack(fill="x", pady=6)
+        ttk.Button(run, text="Planifier…", command=self.plan_deploy_preview).pack(side="left", padx=(0,6))
+        ttk.Button(run, text="Exécuter le déploiement", command=self.do_deploy).pack(side="left")
+        ttk.Checkbutton(run, text="Déploiement atomique (staging + bascule)", variable=self.staged).pack(side="left", padx=12)
+        ttk.Checkbutton(run, text="Précompresser (.gz/.br)", variable=self.precompress).pack(side="left", padx=(0,12))
+        ttk.Checkbutton(run, text="staticfiles.json", variable=self.static_manifest).pack(side="left", padx=(0,12))
+        ttk.Checkbutton(run, text="modulepreload", variable=self.modulepreload).pack(side="left", padx=(0,12))
+        ttk.Button(run, text="Rollback", command=self.do_rollback).pack(side="left")
+        self.watch_btn = ttk.Button(run, text="Watch (ng build --watch)", command=self.toggle_watch)
+        self.watch_btn.pack(side="left", padx=6)
+
+        prog = ttk.Frame(parent); prog.pack(fill="x", pady=(0,6))
+        self.progress = ttk.Progressbar(prog, mode="determinate", maximum=1)
+        self.progress.pack(side="left", fill="x", expand=True)
+        ttk.Label(prog, textvariable=self.progress_var, width=36).pack(side="left", padx=8)
+        ttk.Button(prog, text="Annuler", command=self.tasks.cancel).pack(side="left")
+        ttk.Label(parent, text="Assure-toi d’avoir buildé Angular (ng build --configuration production).").pack(anchor="w")
+
+        gc = ttk.LabelFrame(parent, text="Nettoyage des anciens bundles (GC)", padding=6)
+        gc.pack(fill="x", pady=(12,0))
+        ttk.Label(gc, text="Générations conservées :").pack(side="left")
+        ttk.Spinbox(gc, from_=1, to=MAX_GENERATIONS, width=4, textvariable=self.gc_keep).pack(side="left", padx=(4,12))
+        ttk.Checkbutton(gc, text="GC après déploiement", variable=self.gc_after_deploy).pack(side="left")
+        ttk.Button(gc, text="Supprimer", command=lambda: self.do_gc(dry_run=False)).pack(side="right")
+        ttk.Button(gc, text="Simulation", command=lambda: self.do_gc(dry_run=True)).pack(side="right", padx=6)
+
+    def _build_collectstatic_page(self, parent):
+        ttk.Label(parent, text="Lancer python manage.py collectstatic --noinput").pack(anchor="w")
+        run = ttk.Frame(parent); run.pack(fill="x", pady=6)
+        ttk.Button(run, text="Lancer collectstatic", command=self.do_collectstatic).pack(side="left")
+        ttk.Button(run, text="Annuler", command=self.tasks.cancel).pack(side="left", padx=6)
+        ttk.Button(run, text="Collecte native (static/ → STATIC_ROOT)",
+                   command=self.do_native_collectstatic).pack(side="left", padx=(18,0))
+        ttk.Label(parent, text="Collecte native : copie incrémentale des seuls assets Angular modifiés, sans lancer Django "
+                               "(collectstatic reste nécessaire pour les statics des apps).").pack(anchor="w")
+        warm = ttk.Frame(parent); warm.pack(fill="x", pady=6)
+        ttk.Checkbutton(warm, text="Worker Django persistant (Django reste initialisé entre les commandes)",
+                        variable=self.use_worker, command=self._toggle_worker).pack(side="left")
+        ttk.Button(warm, text="check", command=lambda: self.do_manage("check")).pack(side="left", padx=(12,0))
+        ttk.Button(warm, text="showmigrations", command=lambda: self.do_manage("showmigrations")).pack(side="left", padx=6)
+        st = ScrollText(parent, height=22, wrap="word"); st.pack(fill="both", expand=True)
+        self.collect_out = st
+        self.collect_sink = LogSink(self, st)
+
+    def _build_logs_page(self, parent):
+        ttk.Label(parent, text="Journal d’exécution").pack(anchor="w")
+        st = ScrollText(parent, height=24, wrap="word"); st.pack(fill="both", expand=True)
+        self.logs = st
+        self.log_sink = LogSink(self, st, status_var=self.status_var)
+
+    # ----- Status & logs -----
+    def set_status(self, msg: str):
+        self.status_var.set(msg)
+
+    def log(self, msg: str):
+        """Thread-safe : le message est affiché au prochain flush du journal."""
+        if self.log_sink:
+            self.log_sink.write(msg)
+        else:
+            self.set_status(msg)
+
+    def toggle_log_file(self):
+        self.log_sink.file_fn = open_log_file(DEFAULT_LOG_FILE) if self.log_to_file.get() else None
+        self.log(f"Journal sur disque {'activé' if self.log_to_file.get() else 'désactivé'}: {short(DEFAULT_LOG_FILE)}")
+
+    # ----- Backups centralisés -----
+    def backup(self, file_path: Path) -> Path | None:
+        """
+        Sauvegarde file_path dans le store centralisé, session = timestamp du lancement:
+        <parent>/<projectname>_backups/objects/… + sessions/<timestamp>.json
+        """
+        return self.backup_fn()(file_path)
+
+    def backup_fn(self):
+        """
+        backup pour un job : racine et store résolus ici, sur le thread Tk ; le thread du job
+        n'appelle que backup_into sur ces valeurs (ses erreurs remontent à l'échec du job).
+        """
+        root = Path(self.project_root.get() or "")
+        if not self.backup_store:
+            self.backup_store = project_backup_store(root)
+        return functools.partial(backup_into, self.backup_store, root, self.run_stamp)
+
+    def menu_prune_backups(self):
+        store = self.backup_store or project_backup_store(Path(self.project_root.get() or ""))
+        msg = (f"Conserver les {BACKUP_KEEP_SESSIONS} dernières sessions "
+               f"et celles de moins de {BACKUP_KEEP_DAYS} jours ?")
+        if not messagebox.askyesno("Rétention des backups", msg):
+            return
+        report = store.prune()
+        self.log(f"Rétention : {len(report['sessions'])} sessions, {report['blobs']} blobs, "
+                 f"{human_bytes(report['bytes'])} supprimés.")
+
+    def menu_restore_backup(self):
+        root = Path(self.project_root.get() or "")
+        if not root.exists():
+            messagebox.showerror("Erreur", "Projet Django invalide.")
+            return
+        store = self.backup_store or project_backup_store(root)
+        sessions = store.sessions()
+        if not sessions:
+            messagebox.showinfo("Backups", f"Aucune session dans {short(store.root)}")
+            return
+
+        win = tk.Toplevel(self); win.title("Restaurer une session de backup")
+        lb = tk.Listbox(win, width=60, height=min(15, len(sessions)))
+        lb.pack(fill="both", expand=True, padx=8, pady=8)
+        for name in reversed(sessions):
+            files = store.load_session(name)["files"]
+            lb.insert("end", f"{name}  ({len(files)} fichiers)")
+
+        def do_restore():
+            sel = lb.curselection()
+            if not sel:
+                return
+            name = lb.get(sel[0]).split()[0]
+            if not messagebox.askyesno("Restaurer", f"Restaurer la session {name} dans {short(root)} ?", parent=win):
+                return
+            try:
+                restored = store.restore(name, root, before_write=self.backup)
+                for rel in restored:
+                    self.log(f"Restauré: {rel}")
+                self.log(f"Session {name} restaurée ({len(restored)} fichiers).")
+                win.destroy()
+            except Exception as e:
+                messagebox.showerror("Erreur", str(e), parent=win)
+
+        ttk.Button(win, text="Restaurer", command=do_restore).pack(pady=(0,8))
+
+    # ----- Batch multi-projets -----
+    def menu_batch(self):
+        catalogue = load_projects(DEFAULT_PROFILE)
+        win = tk.Toplevel(self); win.title("Déploiement multi-projets (batch)")
+        lb = tk.Listbox(win, width=70, height=10, selectmode="extended", exportselection=False)
+        lb.pack(fill="both", expand=True, padx=8, pady=8)
+
+        def refresh():
+            lb.delete(0, "end")
+            for name, cfg in sorted(catalogue.items()):
+                lb.insert("end", f"{name}  —  {cfg['project_root']}")
+            lb.select_set(0, "end")
+
+        def selected() -> list:
+            return [lb.get(i).split("  —  ")[0] for i in lb.curselection()]
+
+        def add_current():
+            root = Path(self.project_root.get() or "")
+            if not root.exists():
+                messagebox.showerror("Erreur", "Projet Django courant invalide.", parent=win)
+                return
+            name = simpledialog.askstring("Catalogue", "Nom du projet :", initialvalue=root.name, parent=win)
+            if name:
+                paths, _ = normalize_paths({k: getattr(self, k).get() for k in PROFILE_KEYS})
+                catalogue[name] = {k: str(v) for k, v in paths.items()}
+                save_projects(DEFAULT_PROFILE, catalogue)
+                refresh()
+
+        def remove():
+            names = selected()
+            if names and messagebox.askyesno("Catalogue", f"Retirer {', '.join(names)} ?", parent=win):
+                for name in names:
+                    catalogue.pop(name, None)
+                save_projects(DEFAULT_PROFILE, catalogue)
+                refresh()
+
+        bar = ttk.Frame(win); bar.pack(fill="x", padx=8)
+        ttk.Button(bar, text="Ajouter le projet courant…", command=add_current).pack(side="left")
+        ttk.Button(bar, text="Retirer", command=remove).pack(side="left", padx=6)
+        opts = ttk.Frame(win); opts.pack(fill="x", padx=8, pady=6)
+        steps = {step: tk.BooleanVar(value=True) for step in BATCH_STEPS}
+        for step, var in steps.items():
+            ttk.Checkbutton(opts, text=step, variable=var).pack(side="left")
+        workers = tk.IntVar(value=BATCH_WORKERS)
+        ttk.Label(opts, text="Projets en parallèle :").pack(side="left", padx=(12, 4))
+        ttk.Spinbox(opts, from_=1, to=16, width=4, textvariable=workers).pack(side="left")
+        summary = ScrollText(win, height=8, wrap="none"); summary.pack(fill="both", expand=True, padx=8)
+
+        def done(rows):
+            text = batch_summary(rows)
+            for line in text.splitlines():
+                self.log(line)
+            if summary.winfo_exists():
+                summary.delete("1.0", "end")
+                summary.insert("1.0", text)
+            failed = sum(not r["ok"] for r in rows)
+            self.set_status(f"Batch terminé : {len(rows) - failed} OK, {failed} en échec.")
+
+        def failed(e):
+            messagebox.showerror("Erreur", str(e))
+            self.set_status("Échec du batch.")
+            self.log(f"ERREUR: {e}")
+
+        def run():
+            if self.tasks.busy():
+                messagebox.showwarning("Occupé", "Une opération est déjà en cours.", parent=win)
+                return
+            chosen = {name: catalogue[name] for name in selected()}
+            todo = [step for step, var in steps.items() if var.get()]
+            if not chosen or not todo:
+                messagebox.showwarning("Batch", "Sélectionnez au moins un projet et une étape.", parent=win)
+                return
+            options = {"mode": self.mode.get(), "staged": self.staged.get(), "precompress": self.precompress.get(),
+                       "static_manifest": self.static_manifest.get(), "modulepreload": self.modulepreload.get()}
+            count = max(1, workers.get())
+            job = lambda cancel: batch_deploy(chosen, todo, count, self.log, options, cancel)
+            if self.tasks.run(job, done, failed):
+                self.set_status(f"Batch en cours : {len(chosen)} projets, {count} en parallèle…")
+
+        run_bar = ttk.Frame(win); run_bar.pack(fill="x", padx=8, pady=8)
+        ttk.Button(run_bar, text="Lancer", command=run).pack(side="left")
+        ttk.Button(run_bar, text="Annuler", command=self.tasks.cancel).pack(side="left", padx=6)
+        ttk.Label(run_bar, text="Journaux et backups isolés par projet.").pack(side="right")
+        refresh()
+
+    # ----- JSON -----
+    def _load_state(self, path: str, quiet=False):
+        p = Path(path)
+        if not p.exists():
+            if not quiet:
+                messagebox.showwarning("Info", f"Aucun fichier trouvé: {short(path)}")
+            return
+        try:
+            data = load_profile(p)
+            self.project_root.set(data.get("project_root",""))
+            self.dist_folder.set(data.get("dist_folder",""))
+            self.manage_py.set(data.get("manage_py",""))
+            self.static_dir.set(data.get("static_dir",""))
+            self.templates_dir.set(data.get("templates_dir",""))
+            if not quiet:
+                messagebox.showinfo("OK", f"Config chargée depuis {short(path)}")
+            self.log(f"Config chargée: {short(path)}")
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Impossible de charger {short(path)}:\n{e}")
+            self.set_status("Erreur de chargement JSON.")
+
+    def _save_state(self, path: str):
+        data = {
+            "project_root": self.project_root.get(),
+            "dist_folder": self.dist_folder.get(),
+            "manage_py": self.manage_py.get(),
+            "static_dir": self.static_dir.get(),
+            "templates_dir": self.templates_dir.get()
+        }
+        save_profile(path, data)
+        messagebox.showinfo("OK", f"Config sauvegardée dans {short(path)}")
+        self.log(f"Config sauvegardée: {short(path)}")
+
+    def menu_load_json(self):
+        p = filedialog.askopenfilename(title="Charger config JSON",
+                                       filetypes=[("JSON","*.json"),("Tous fichiers","*.*")])
+        if p:
+            self._load_state(p)
+            self._auto_paths_visibility()
+
+    def menu_save_json(self):
+        p = filedialog.asksaveasfilename(title="Sauver config JSON",
+                                         defaultextension=".json",
+                                         filetypes=[("JSON","*.json")])
+        if p:
+            self._save_state(p)
+
+    # ----- Chemins -----
+    def _paths_complete(self) -> bool:
+        try:
+            pr = Path(self.project_root.get() or "")
+            mp = Path(self.manage_py.get() or "")
+            df = Path(self.dist_folder.get() or "")
+            ok = pr.exists() and mp.exists() and df.exists()
+            return ok
+        except Exception:
+            return False
+
+    def _auto_paths_visibility(self):
+        # Si profil local chargeable et chemins plausibles -> replier
+        if self._paths_complete():
+            self.paths_section.close()
+            self.set_status("Chemins OK (profil).")
+        else:
+            self.paths_section.open()
+            self.set_status("Veuillez renseigner les chemins puis confirmer.")
+
+    def confirm_paths(self):
+        # corrections & validations douces
+        try:
+            paths, problems = normalize_paths({
+                "project_root": self.project_root.get(), "dist_folder": self.dist_folder.get(),
+                "manage_py": self.manage_py.get(), "templates_dir": self.templates_dir.get(),
+                "static_dir": self.static_dir.get(),
+            })
+            self.project_root.set(str(paths["project_root"]))
+            self.dist_folder.set(str(paths["dist_folder"]))
+            if paths["manage_py"].exists():
+                self.manage_py.set(str(paths["manage_py"]))
+
+            # templates/static
+            paths["templates_dir"].mkdir(parents=True, exist_ok=True)
+            paths["static_dir"].mkdir(parents=True, exist_ok=True)
+            self.templates_dir.set(str(paths["templates_dir"]))
+            self.static_dir.set(str(paths["static_dir"]))
+
+            # checks essentiels
+            if problems:
+                messagebox.showwarning("Chemins à vérifier", "\n".join(problems))
+                self.set_status("Chemins incomplets. Corrige puis reconfirme.")
+                return
+
+            # Projet Django : DJANGO_SETTINGS_MODULE de manage.py -> settings -> ROOT_URLCONF
+            self.project = None  # re-résolu à chaque confirmation
+            project = self.project_model()
+            self.log(f"Projet Django : settings {short(project.settings_py) if project.settings_py else '(introuvable)'}"
+                     f", urls {short(project.urls_py) if project.urls_py else '(à créer)'}")
+
+            # auto-save profil local
+            try:
+                self._save_state(DEFAULT_PROFILE)
+            except Exception:
+                pass
+
+            # Store de backups centralisé: <parent>/<projectname>_backups/ (rétention : menu Backups)
+            self.backup_store = project_backup_store(Path(self.project_root.get()))
+            self.log(f"Backups: {short(self.backup_store.root)} (session {self.run_stamp})")
+
+            # auto-hide
+            self.paths_section.close()
+            self.set_status("Chemins confirmés.")
+            self.log("Chemins confirmés (section repliée).")
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
+            self.set_status("Erreur lors de la confirmation des chemins.")
+
+    def toggle_paths(self):
+        self.paths_section.toggle()
+
+    # Selectors
+    def pick_project_root(self):
+        p = filedialog.askopenfilename(title="Choisir un fichier DANS le dossier du projet Django",
+                                       filetypes=[("Tous fichiers", "*.*")])
+        if p:
+            folder = str(Path(p).parent)
+            self.project_root.set(folder)
+            mp = Path(folder) / "manage.py"
+            if mp.exists():
+                self.manage_py.set(str(mp))
+
+    def pick_manage(self):
+        p = filedialog.askopenfilename(title="Sélectionner manage.py",
+                                       filetypes=[("Python", "*.py"), ("Tous fichiers", "*.*")])
+        if p:
+            if Path(p).name != "manage.py":
+                messagebox.showwarning("Attention", "Ce fichier n'est pas 'manage.py'.")
+            self.manage_py.set(p)
+
+    def detect_dist(self, quiet=False):
+        """Builds Angular trouvés près du projet Django, proposés dans la liste du dist."""
+        root = Path(self.project_root.get() or "")
+        if not root.is_dir():
+            if not quiet:
+                messagebox.showerror("Erreur", "Renseigne d'abord le projet Django.")
+            return
+        found = discover_dist(root)
+        self.dist_combo.configure(values=[c["dist"] for c in found])
+        if not quiet:
+            for c in found:
+                when = time.strftime("%d/%m/%Y %H:%M", time.localtime(c["built"])) if c["built"] else "pas encore buildé"
+                self.log(f"Build {c['project']} : {short(c['dist'])} ({when})")
+            self.set_status(f"{len(found)} build(s) Angular détecté(s).")
+        if found and found[0]["built"] and not has_index(Path(self.dist_folder.get() or "")):
+            self.dist_folder.set(found[0]["dist"])
+
+    def pick_dist(self):
+        p = filedialog.askopenfilename(title="Choisir un fichier DANS dist/<app>/browser (ex: index.html)",
+                                       filetypes=[("Tous fichiers", "*.*")])
+        if p:
+            self.dist_folder.set(str(Path(p).parent))
+
+    def pick_dir_into_var(self, var: tk.StringVar):
+        d = filedialog.askdirectory(title="Choisir un dossier")
+        if d:
+            var.set(d)
+
+    # ----- settings.py -----
+    def project_model(self):
+        """
+        Projet Django (settings/urls résolus), construit à la confirmation puis mémorisé sur self ;
+        reconstruit seulement si les chemins saisis ne sont plus ceux du modèle.
+        """
+        root = Path(self.project_root.get() or "")
+        manage = Path(self.manage_py.get()) if self.manage_py.get() else root / "manage.py"
+        if self.project is None or (self.project.root, self.project.manage) != (root, manage):
+            self.project = django_project(root, manage)
+        return self.project
+
+    def project_settings_py(self) -> Path | None:
+        return self.project_model().settings_py
+
+    def settings_options(self, settings_py: Path) -> tuple:
+        """(stockage, middlewares, production) des options cochées, pour idempotent_add_settings."""
+        root = Path(self.project_root.get() or "")
+        backend = prebuilt_storage_backend(settings_py, root) if self.static_manifest.get() else None
+        middleware = [preload_middleware_path(settings_py, root)] if self.modulepreload.get() else []
+        if self.production.get():
+            middleware.append(index_no_cache_middleware_path(settings_py, root))
+        return backend, middleware, self.production.get()
+
+    def preview_settings_diff(self):
+        p = self.project_settings_py()
+        if not p:
+            messagebox.showerror("Erreur", "settings.py introuvable dans le projet Django.")
+            return
+        src = parsed_source(p)[0]
+        current = src.splitlines(keepends=True)
+        try:
+            proposed = idempotent_add_settings(src, *self.settings_options(p)).splitlines(keepends=True)
+        except SyntaxError as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        self.settings_diff.show(current, proposed, short(p), f"{short(p)} (proposé)")
+
+    def apply_settings(self):
+        p = self.project_settings_py()
+        if not p:
+            messagebox.showerror("Erreur", "settings.py introuvable.")
+            return
+        src = parsed_source(p)[0]
+        backend, middleware, production = self.settings_options(p)
+        try:
+            new = idempotent_add_settings(src, backend, middleware, production)
+        except SyntaxError as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        if backend or middleware:
+            support = ensure_wizard_support(p, self.backup)
+            if support:
+                self.log(f"Module wizard_support écrit → {short(support)}")
+        if src == new:
+            messagebox.showinfo("OK", "Aucune modification à appliquer.")
+            self.set_status("settings.py déjà conforme.")
+            return
+        bak = self.backup(p)
+        self.log(f"Backup settings.py → {short(bak)}")
+        write_text(p, new)
+        messagebox.showinfo("OK", f"settings.py mis à jour: {short(p)}")
+        self.set_status("settings.py mis à jour.")
+
+    # ----- urls.py -----
+    def project_urls_py(self) -> Path | None:
+        return self.project_model().urls_py
+
+    def dist_locales(self) -> list:
+        dist = Path(self.dist_folder.get() or "")
+        return detect_locales(dist.parent if dist.is_file() else dist)
+
+    def urls_index_view(self) -> str | None:
+        """Module wizard_support pour SpaIndexView si l'option est cochée (et settings.py trouvé)."""
+        settings_py = self.project_settings_py() if self.cached_index.get() else None
+        return support_module_for(settings_py, Path(self.project_root.get() or "")) if settings_py else None
+
+    def urls_options(self) -> tuple:
+        """(locales, vue des index, préfixes STATIC_URL/MEDIA_URL) pour idempotent_add_urls."""
+        return self.dist_locales(), self.urls_index_view(), project_url_prefixes(self.project_settings_py())
+
+    def preview_urls_diff(self):
+        p = self.project_urls_py()
+        if not p:
+            current_text = EMPTY_URLS
+            current = current_text.splitlines(keepends=True)
+            proposed = idempotent_add_urls(current_text, *self.urls_options()).splitlines(keepends=True)
+            self.urls_diff.show(current, proposed, "(nouveau urls.py)", "(proposé)")
+        else:
+            src = parsed_source(p)[0]
+            current = src.splitlines(keepends=True)
+            proposed = idempotent_add_urls(src, *self.urls_options()).splitlines(keepends=True)
+            self.urls_diff.show(current, proposed, short(p), f"{short(p)} (proposé)")
+
+    def apply_urls(self):
+        p = self.project_urls_py()
+        index_view = self.urls_index_view()
+        if index_view:
+            support = ensure_wizard_support(self.project_settings_py(), self.backup)
+            if support:
+                self.log(f"Module wizard_support écrit → {short(support)}")
+        elif self.cached_index.get():
+            messagebox.showerror("Erreur", "settings.py introuvable : wizard_support.py s'écrit à côté.")
+            return
+        if not p:
+            root = Path(self.project_root.get() or "")
+            if not root.exists():
+                messagebox.showerror("Erreur", "Projet Django invalide.")
+                return
+            p = self.project_model().default_urls_path()
+            proposed = idempotent_add_urls(EMPTY_URLS, *self.urls_options())
+            write_text(p, proposed)
+            self.project = None  # urls.py existe désormais : le modèle le résoudra
+            messagebox.showinfo("OK", f"urls.py créé et mis à jour: {short(p)}")
+            self.log(f"Créé urls.py → {short(p)}")
+            self.set_status("urls.py créé.")
+            return
+
+        src = parsed_source(p)[0]
+        new = idempotent_add_urls(src, *self.urls_options())
+        if src == new:
+            messagebox.showinfo("OK", "Aucune modification à appliquer.")
+            self.set_status("urls.py déjà conforme.")
+            return
+        bak = self.backup(p)
+        self.log(f"Backup urls.py → {short(bak)}")
+        write_text(p, new)
+        messagebox.showinfo("OK", f"urls.py mis à jour: {short(p)}")
+        self.set_status("urls.py mis à jour.")
+
+    # ----- Déploiement -----
+    def deploy_targets(self) -> tuple | None:
+        """(dist, templates, static) validés pour un déploiement ; None (erreur affichée) sinon."""
+        try:
+            dist = Path(self.dist_folder.get() or "")
+            if dist.is_file():
+                dist = dist.parent
+            if not dist.exists() or not has_index(dist):
+                raise RuntimeError("Le dossier dist sélectionné n'est pas valide (index.html introuvable).")
+            tpls = Path(self.templates_dir.get() or "")
+            sttc = Path(self.static_dir.get() or "")
+            if not tpls:
+                root = Path(self.project_root.get() or "")
+                tpls = root / "templates"; self.templates_dir.set(str(tpls))
+            if not sttc:
+                root = Path(self.project_root.get() or "")
+                sttc = root / "static"; self.static_dir.set(str(sttc))
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
+            self.set_status("Échec du déploiement.")
+            self.log(f"ERREUR: {e}")
+            return None
+        return dist, tpls, sttc
+
+    def do_deploy(self):
+        if self.tasks.busy():
+            messagebox.showwarning("Occupé", "Une opération est déjà en cours.")
+            return
+        targets = self.deploy_targets()
+        if not targets:
+            return
+        dist, tpls, sttc = targets
+        mode, staged, precompress = self.mode.get(), self.staged.get(), self.precompress.get()
+        static_manifest, modulepreload = self.static_manifest.get(), self.modulepreload.get()
+        static_url = project_static_url(self.project_settings_py())  # chunks JS résolus sous STATIC_URL
+        gc_keep = self.gc_keep.get() if self.gc_after_deploy.get() else None
+        progress = lambda *counts: self.tasks.post_latest("progress", self._show_progress, *counts)
+        backup_fn = self.backup_fn()
+        job = lambda cancel: deploy_front(dist, tpls, sttc, self.log, backup_fn=backup_fn, mode=mode,
+                                          gc_keep=gc_keep, staged=staged, precompress=precompress,
+                                          static_manifest=static_manifest, static_url=static_url,
+                                          modulepreload=modulepreload,
+                                          progress=progress, cancel=cancel)
+        self.set_status("Déploiement en cours…")
+        self.tasks.run(job, self._deploy_done, self._deploy_failed)
+
+    def plan_deploy_preview(self):
+        """Pré-passe stat seule (plan_deploy) puis arbre des assets, avant de lancer la copie."""
+        if self.tasks.busy():
+            messagebox.showwarning("Occupé", "Une opération est déjà en cours.")
+            return
+        targets = self.deploy_targets()
+        if not targets:
+            return
+        dist, _, sttc = targets
+        mode, static_url = self.mode.get(), project_static_url(self.project_settings_py())
+
+        def job(cancel):
+            plan = plan_deploy(dist, sttc, mode=mode, static_url=static_url)
+            return plan, plan_index(plan["entries"])
+
+        self.set_status("Plan du déploiement…")
+        self.tasks.run(job, lambda result: self._show_plan(*result), self._deploy_failed)
+
+    def _show_plan(self, plan, index):
+        self.log(f"Plan : {plan_summary(plan)}")
+        self.set_status("Plan prêt.")
+        win = tk.Toplevel(self); win.title("Plan du déploiement")
+        win.geometry("820x560")
+        ttk.Label(win, text=plan_summary(plan), wraplength=780).pack(anchor="w", padx=8, pady=(8, 2))
+        ttk.Label(win, text="Dossiers : + nouveaux  ~ modifiés  = inchangés  − orphelins").pack(anchor="w", padx=8)
+        frame = ttk.Frame(win); frame.pack(fill="both", expand=True, padx=8, pady=6)
+        tree = ttk.Treeview(frame, columns=("status", "size"))
+        tree.heading("#0", text="Fichier"); tree.heading("status", text="Statut"); tree.heading("size", text="Taille")
+        tree.column("#0", width=460); tree.column("status", width=200); tree.column("size", width=100, anchor="e")
+        for status, color in PLAN_COLORS.items():
+            tree.tag_configure(status, foreground=color)
+        sb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=sb.set)
+        tree.pack(side="left", fill="both", expand=True); sb.pack(side="right", fill="y")
+
+        def fill(folder, parent, offset=0):
+            """Enfants directs d'un dossier ; les fichiers par pages de PLAN_PAGE."""
+            node = index[folder]
+            if offset == 0:
+                for name in sorted(node["dirs"]):
+                    rel = f"{folder}/{name}" if folder else name
+                    sub = index[rel]
+                    counts = "  ".join(f"{PLAN_SIGNS[s]}{sub['counts'][s]}" for s in PLAN_STATUSES if sub["counts"][s])
+                    tree.insert(parent, "end", iid=rel + "/", text=name + "/", values=(counts, human_bytes(sub["bytes"])))
+                    tree.insert(rel + "/", "end", iid="\0" + rel)  # enfant factice : rend le nœud dépliable
+            files = node["files"]
+            for name, status, size in files[offset:offset + PLAN_PAGE]:
+                tree.insert(parent, "end", text=name, values=(PLAN_LABELS[status], human_bytes(size)), tags=(status,))
+            if len(files) > offset + PLAN_PAGE:
+                tree.insert(parent, "end", iid=f"\1{offset + PLAN_PAGE}\1{folder}",
+                            text=f"… {len(files) - offset - PLAN_PAGE} fichiers de plus (double-clic)")
+
+        def on_open(_event):
+            item = tree.focus()
+            if tree.exists("\0" + item[:-1]):
+                tree.delete("\0" + item[:-1])
+                fill(item[:-1], item)
+
+        def on_double(_event):
+            item = tree.focus()
+            if item.startswith("\1"):
+                _, offset, folder = item.split("\1", 2)
+                parent = tree.parent(item)
+                tree.delete(item)
+                fill(folder, parent, int(offset))
+
+        tree.bind("<<TreeviewOpen>>", on_open)
+        tree.bind("<Double-1>", on_double)
+        fill("", "")
+
+        def run():
+            win.destroy()
+            self.do_deploy()
+
+        bar = ttk.Frame(win); bar.pack(fill="x", padx=8, pady=(0, 8))
+        ttk.Button(bar, text="Annuler", command=win.destroy).pack(side="right")
+        ttk.Button(bar, text=f"Exécuter ({plan['copy'][0]} fichiers, {human_bytes(plan['copy'][1])})",
+                   command=run).pack(side="right", padx=6)
+
+    def toggle_watch(self):
+        """Démarre le mode watch (ng build --watch) ou l'arrête s'il tourne."""
+        if self.watching:
+            self.tasks.cancel()
+            return
+        if self.tasks.busy():
+            messagebox.showwarning("Occupé", "Une opération est déjà en cours.")
+            return
+        targets = self.deploy_targets()
+        if not targets:
+            return
+        dist, tpls, sttc = targets
+        static_url = project_static_url(self.project_settings_py())
+        modulepreload = self.modulepreload.get()
+        backup_fn = self.backup_fn()
+        job = lambda cancel: watch_dist(dist, tpls, sttc, self.log, cancel, backup_fn=backup_fn,
+                                        static_url=static_url, modulepreload=modulepreload)
+        if self.tasks.run(job, self._watch_done, self._watch_done):
+            self.watching = True
+            self.watch_btn.configure(text="Arrêter le watch")
+            self.set_status("Watch actif : les rebuilds Angular sont reportés dans Django.")
+
+    def _watch_done(self, outcome):
+        self.watching = False
+        self.watch_btn.configure(text="Watch (ng build --watch)")
+        if isinstance(outcome, BaseException):
+            messagebox.showerror("Erreur", str(outcome))
+            self.log(f"ERREUR: {outcome}")
+            self.set_status("Watch interrompu.")
+        else:
+            self.set_status("Watch arrêté.")
+
+    def _show_progress(self, files, files_total, nbytes, bytes_total):
+        self.progress.configure(maximum=max(bytes_total, 1), value=nbytes)
+        self.progress_var.set(f"{files}/{files_total} fichiers — {human_bytes(nbytes)}/{human_bytes(bytes_total)}")
+
+    def _deploy_done(self, stats):
+        messagebox.showinfo("OK", "Déploiement frontend terminé.")
+        self.set_status("Déploiement OK.")
+
+    def _deploy_failed(self, e):
+        if isinstance(e, OperationCancelled):
+            self.set_status("Déploiement annulé.")
+            self.log("Déploiement annulé (les fichiers déjà copiés sont complets ; "
+                     "en mode atomique le live n'a pas été modifié).")
+            return
+        messagebox.showerror("Erreur", str(e))
+        self.set_status("Échec du déploiement.")
+        self.log(f"ERREUR: {e}")
+
+    def do_rollback(self):
+        tpls = Path(self.templates_dir.get() or "")
+        sttc = Path(self.static_dir.get() or "")
+        if not messagebox.askyesno("Rollback", "Revenir à la génération précédente (index.html + static/) ?"):
+            return
+        try:
+            strategy = rollback_deploy(tpls, sttc)
+            self.log(f"Rollback ({strategy}) : génération précédente restaurée.")
+            self.set_status("Rollback OK.")
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
+            self.set_status("Échec du rollback.")
+            self.log(f"ERREUR: {e}")
+
+    def do_gc(self, dry_run=True):
+        sttc = Path(self.static_dir.get() or "")
+        if not sttc.exists():
+            messagebox.showerror("Erreur", "static/ introuvable.")
+            return
+        try:
+            keep = self.gc_keep.get()
+            report = gc_static(sttc, keep=keep, dry_run=True)
+            if not report["files"]:
+                messagebox.showinfo("GC", f"Rien à supprimer ({keep} générations conservées).")
+                self.set_status("GC : rien à faire.")
+                return
+            for rel in report["files"]:
+                self.log(f"GC {'(simulation) ' if dry_run else ''}{rel}")
+            summary = f"{len(report['files'])} fichiers, {human_bytes(report['bytes'])}"
+            if dry_run:
+                self.log(f"GC simulation : {summary} récupérables.")
+                messagebox.showinfo("GC (simulation)", f"{summary} récupérables.")
+                return
+            if not messagebox.askyesno("GC", f"Supprimer {summary} de {short(sttc)} ?"):
+                return
+            report = gc_static(sttc, keep=keep, dry_run=False)
+            self.log(f"GC : {report['deleted']} fichiers supprimés, {human_bytes(report['bytes'])} libérés.")
+            self.set_status("GC OK.")
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
+            self.log(f"ERREUR GC: {e}")
+
+    # ----- collectstatic -----
+    def do_collectstatic(self):
+        self.do_manage("collectstatic", "--noinput")
+
+    def do_manage(self, *argv):
+        """manage.py <argv> en tâche de fond (worker persistant si activé), sortie en direct."""
+        manage = Path(self.manage_py.get() or "")
+        if not manage.exists():
+            messagebox.showerror("Erreur", "manage.py introuvable.")
+            self.set_status("manage.py manquant.")
+            return
+        if self.tasks.busy():
+            messagebox.showwarning("Occupé", "Une opération est déjà en cours.")
+            return
+        worker = self._get_worker(manage)
+        prefix = "[worker] " if worker else ""
+        self.collect_sink.write(f"{prefix}$ {' '.join(manage_cmd(manage, *argv))}")
+        job = lambda cancel: run_manage(manage, argv, self.collect_sink.write, cancel=cancel, worker=worker)
+        self.set_status(f"{argv[0]} en cours…")
+        self.tasks.run(job, lambda code: self._collect_done(code, argv[0]), self._collect_failed)
+
+    def _get_worker(self, manage: Path):
+        if not self.use_worker.get():
+            return None
+        if self.worker is None or self.worker.manage != manage:
+            self._stop_worker()
+            self.worker = DjangoWorker(manage, self.project_settings_py())
+        return self.worker
+
+    def _stop_worker(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
+    def _toggle_worker(self):
+        if not self.use_worker.get() and not self.tasks.busy():
+            self._stop_worker()
+
+    def destroy(self):
+        self._stop_worker()
+        super().destroy()
+
+    def do_native_collectstatic(self):
+        settings_py = self.project_settings_py()
+        if not settings_py:
+            messagebox.showerror("Erreur", "settings.py introuvable dans le projet Django.")
+            return
+        if self.tasks.busy():
+            messagebox.showwarning("Occupé", "Une opération est déjà en cours.")
+            return
+        sttc = Path(self.static_dir.get() or "")
+        job = lambda cancel: native_collectstatic(settings_py, sttc, self.collect_sink.write, cancel=cancel)
+        self.set_status("Collecte native en cours…")
+        self.tasks.run(job, lambda stats: self._collect_done(0), self._collect_failed)
+
+    def _collect_done(self, returncode, command="collectstatic"):
+        if returncode == 0:
+            if command == "collectstatic":
+                messagebox.showinfo("OK", "collectstatic terminé.")
+            self.set_status(f"{command} OK.")
+            self.log(f"{command} OK")
+        else:
+            messagebox.showerror("Erreur", f"{command} a échoué.")
+            self.set_status(f"{command} KO.")
+            self.log(f"{command} a échoué")
+
+    def _collect_failed(self, e):
+        if isinstance(e, OperationCancelled):
+            self.collect_sink.write("[annulé]")
+            self.set_status("collectstatic annulé.")
+            self.log("collectstatic annulé")
+            return
+        messagebox.showerror("Erreur", str(e))
+        self.set_status("collectstatic KO.")
+        self.log(f"ERREUR: {e}")